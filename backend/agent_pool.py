@@ -0,0 +1,97 @@
+"""Pool of pre-built, reusable agent instances.
+
+Constructing an ``IntraMindAgent`` compiles its graph and sets up clients, so
+doing it on the request path adds that cost to every call. :class:`AgentPool`
+builds a fixed number of agents up front (in worker threads, off the event
+loop), hands them out for the duration of one call, and takes them back.
+
+Only agents without per-instance conversation memory (``thread_id=False``)
+may be pooled: a pooled agent serves many unrelated callers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+
+class AgentPool:
+    """Fixed-size pool of interchangeable agents built by ``factory``."""
+
+    def __init__(self, factory: Callable[[], Any], size: int = 4) -> None:
+        self._factory = factory
+        self._size = max(1, size)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+        self._building = 0
+        self._construction_seconds = 0.0
+        self._last_construction_seconds: float | None = None
+        self._checkouts = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    async def _build(self) -> Any:
+        self._building += 1
+        started = time.perf_counter()
+        try:
+            agent = await asyncio.to_thread(self._factory)
+        finally:
+            self._building -= 1
+        elapsed = time.perf_counter() - started
+        self._created += 1
+        self._construction_seconds += elapsed
+        self._last_construction_seconds = elapsed
+        return agent
+
+    async def warm(self) -> None:
+        """Build agents until the pool is full (call at startup)."""
+        missing = self._size - self._created - self._building
+        results = await asyncio.gather(
+            *(self._build() for _ in range(missing)), return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        for agent in results:
+            if not isinstance(agent, BaseException):
+                self._idle.put_nowait(agent)
+        if errors:
+            # Missing agents are built on demand by checkout().
+            raise errors[0]
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[Any]:
+        """Borrow an agent for the duration of the block.
+
+        Builds one on demand while the pool is below ``size`` (e.g. before
+        warm-up finishes); otherwise waits for one to be returned.
+        """
+        started = time.perf_counter()
+        if self._idle.empty() and self._created + self._building < self._size:
+            agent = await self._build()
+        else:
+            agent = await self._idle.get()
+        waited = time.perf_counter() - started
+        self._checkouts += 1
+        self._wait_seconds += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        try:
+            yield agent
+        finally:
+            self._idle.put_nowait(agent)
+
+    def stats(self) -> dict:
+        return {
+            "size": self._size,
+            "created": self._created,
+            "available": self._idle.qsize(),
+            "in_use": self._created - self._idle.qsize(),
+            "checkouts": self._checkouts,
+            "avg_checkout_wait_ms": round(self._wait_seconds / self._checkouts * 1000, 3)
+            if self._checkouts else None,
+            "max_checkout_wait_ms": round(self._max_wait_seconds * 1000, 3),
+            "avg_construction_ms": round(self._construction_seconds / self._created * 1000, 3)
+            if self._created else None,
+            "last_construction_ms": round(self._last_construction_seconds * 1000, 3)
+            if self._last_construction_seconds is not None else None,
+        }
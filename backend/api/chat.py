@@ -1,11 +1,17 @@
 """Chat API endpoints - Proxies to AI Agent (tenant-scoped)."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, AsyncIterator, Optional, List
+from dataclasses import dataclass
+import asyncio
+import inspect
+import json
 import os
 import sys
 import logging
+import time
 
 # Add AI Agent to Python path
 AI_AGENT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..", "ai-agent", "src")
@@ -20,17 +26,29 @@ except ImportError as e:
     logging.warning(f"AI Agent not available: {e}. Chat will return mock responses.")
     AI_AGENT_AVAILABLE = False
 
-from auth import require_tenant
+from auth import authenticate, charge_batch, get_cost_model, require_tenant
+from concurrency import get_concurrency_limiter
+from config import get_settings
+from conversation_state import get_conversation_backend
+from conversations import get_conversation_store
+from deadlines import DeadlineExceededError, get_request_canceller
+from response_cache import ChatResponseCache, get_response_cache, normalize_query
+from serialization import ModelJSONResponse
+from singleflight import SingleFlight
 from tenancy import Tenant
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
-# Active conversation threads, keyed by "<tenant_id>:<conversationId>" so one
-# tenant can never resume or read another tenant's conversation memory.
-conversation_threads = {}
+# Identical concurrent first turns (same tenant, collection and normalized
+# query) share one agent call when chat_coalesce_enabled is on.
+_chat_flights = SingleFlight()
+
+# Set once the "agent cannot stream" warning has been logged.
+_stream_fallback_warned = False
 
 
 def _thread_key(tenant: Tenant, conversation_id: str) -> str:
+    """Key of a conversation, scoped so no tenant can resume another's thread."""
     return f"{tenant.tenant_id}:{conversation_id}"
 
 
@@ -69,107 +87,550 @@ class ChatResponse(BaseModel):
     safetyFlag: Optional[SafetyFlag] = None
 
 
-@router.post("", response_model=ChatResponse)
-async def chat(
+class BatchChatRequest(BaseModel):
+    requests: List[ChatRequest]
+
+
+class BatchChatItem(BaseModel):
+    """Outcome of one batch entry; exactly one of response / error is set."""
+
+    index: int
+    response: Optional[ChatResponse] = None
+    error: Optional[str] = None
+
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatItem]
+
+
+def _new_conversation_id() -> str:
+    return f"conv_{os.urandom(8).hex()}"
+
+
+@dataclass
+class _Conversation:
+    agent: Any
+    # Turns of shared history this worker's agent has seen.
+    turns: int = 0
+    # Shared history the agent has not been given yet (see _search_kwargs).
+    history: Optional[List[dict]] = None
+
+
+def _accepts_history(search: Any) -> bool:
+    """Whether ``search`` takes a ``conversation_history`` keyword."""
+    try:
+        parameters = inspect.signature(search).parameters
+    except (TypeError, ValueError):
+        return False
+    return "conversation_history" in parameters
+
+
+def check_history_support() -> None:
+    """Log at startup when shared conversation history cannot reach the agent.
+
+    History from the shared backend is handed to the agent as
+    ``search(conversation_history=[{"query", "response"}, ...])``. An agent
+    without that keyword answers a conversation resumed on another worker
+    from empty memory.
+    """
+    if not AI_AGENT_AVAILABLE or get_conversation_backend() is None:
+        return
+    if not _accepts_history(IntraMindAgent.search):
+        logging.warning(
+            "WEB_UI_CONVERSATION_BACKEND is shared, but IntraMindAgent.search takes "
+            "no conversation_history: conversations resumed on another worker "
+            "will start without their earlier turns."
+        )
+
+
+async def _conversation_agent(
+    tenant: Tenant, conversation_id: str, resume: bool = True
+) -> _Conversation:
+    """Get or create the tenant-isolated agent for ``conversation_id``.
+
+    With ``resume=False`` (a new, stateless conversation) the shared backend
+    is not consulted.
+    """
+    thread_key = _thread_key(tenant, conversation_id)
+    conversations = get_conversation_store()
+    backend = get_conversation_backend() if resume else None
+    conversation = conversations.get(thread_key)
+    if conversation is not None:
+        # Another worker may have answered a turn since this agent last ran.
+        if backend is None or conversation.turns >= await asyncio.to_thread(
+            backend.turn_count, thread_key
+        ):
+            return conversation
+
+    # Prefix the agent's checkpoint thread_id with the tenant so the
+    # underlying LangGraph memory is isolated per tenant as well.
+    conversation = _Conversation(IntraMindAgent(thread_id=thread_key))
+    stored = await asyncio.to_thread(backend.load, thread_key) if backend is not None else None
+    if stored is not None:
+        conversation.history, conversation.turns = stored
+        logging.info(f"Resumed conversation thread: {thread_key} ({conversation.turns} turns)")
+    else:
+        logging.info(f"Created new conversation thread: {thread_key}")
+    conversations.put(thread_key, tenant.tenant_id, conversation)
+    return conversation
+
+
+async def _starts_conversation(tenant: Tenant, request: ChatRequest) -> bool:
+    """Whether ``request`` is the first turn of its conversation.
+
+    True without a conversationId, and also for an id nothing has been
+    stored under yet: the widget generates its id client-side and sends it
+    from the very first message. Such a turn has no history to answer from,
+    so it may share an answer with identical questions.
+    """
+    if not request.conversationId:
+        return True
+    thread_key = _thread_key(tenant, request.conversationId)
+    if thread_key in get_conversation_store():
+        return False
+    backend = get_conversation_backend()
+    return backend is None or await asyncio.to_thread(backend.turn_count, thread_key) == 0
+
+
+async def _record_turn(
+    tenant: Tenant, conversation: Optional[_Conversation], request: ChatRequest,
+    conversation_id: str, response: str,
+) -> None:
+    """Append one answered turn to the shared backend, if one is configured.
+
+    Every turn is recorded, including a first turn whose conversationId was
+    generated here and one answered from the cache or another request's
+    search (``conversation`` is None then): its follow-up may land on any
+    worker. A worker without a local agent for the conversation can only
+    pass these turns on as ``search(conversation_history=...)``; an agent
+    that lacks the keyword answers the follow-up from empty memory (see
+    :func:`check_history_support`).
+    """
+    if conversation is not None:
+        conversation.history = None
+    backend = get_conversation_backend()
+    if backend is None:
+        return
+    turns = await asyncio.to_thread(
+        backend.append_turn,
+        _thread_key(tenant, conversation_id),
+        tenant.tenant_id,
+        {"query": request.query, "response": response},
+    )
+    if conversation is not None:
+        conversation.turns = turns
+
+
+def _search_kwargs(
     request: ChatRequest,
-    tenant: Tenant = Depends(require_tenant),
-):
-    """Send a chat message and get an AI-powered response.
+    namespaced_collection: str,
+    conversation: Optional[_Conversation] = None,
+    search: Any = None,
+) -> dict:
+    """Keyword arguments for ``search``; history goes along once after a resume."""
+    kwargs = dict(
+        query=request.query,
+        collection_name=namespaced_collection,
+        num_results=5,
+        min_score=0.3
+    )
+    if conversation is not None and conversation.history and _accepts_history(search):
+        kwargs["conversation_history"] = conversation.history
+    return kwargs
+
+
+def _mock_response(request: ChatRequest) -> ChatResponse:
+    return ChatResponse(
+        response=f"Thank you for your query: '{request.query}'. AI Agent is not currently available. Please ensure the AI Agent is properly configured.",
+        citations=[],
+        conversationId=request.conversationId or "demo-conversation-id",
+        queryComplexity="simple"
+    )
+
+
+def _error_response(request: ChatRequest, error: Exception) -> ChatResponse:
+    return ChatResponse(
+        response=f"I apologize, but I encountered an error processing your request: {str(error)}. Please ensure the IntraMind services are running and try again.",
+        citations=[],
+        conversationId=request.conversationId or "error-conversation",
+        queryComplexity="error"
+    )
+
+
+async def _response_cache_for(
+    tenant: Tenant, request: ChatRequest
+) -> Optional[ChatResponseCache]:
+    """The answer cache, if enabled and ``request`` starts its conversation.
+
+    A cache hit skips the agent entirely, so no conversation thread exists
+    for the conversationId it returns; a follow-up on that id starts with
+    empty memory, exactly as a new conversation would.
+    """
+    cache = get_response_cache()
+    if cache is None or not await _starts_conversation(tenant, request):
+        return None
+    return cache
+
+
+def _to_chat_response(result: dict, request: ChatRequest, conversation_id: str) -> ChatResponse:
+    """Map an ``agent.search`` result onto the public ChatResponse."""
+    # Extract response and citations
+    response_text = result.get("final_response", "I couldn't find relevant information for your query.")
+    search_results = result.get("search_results", [])
+    query_complexity = result.get("query_classification", {}).get("complexity", "unknown")
+
+    # Map search results to citations (display the un-namespaced collection)
+    citations = []
+    for doc in search_results:
+        citations.append(SearchResult(
+            id=doc.get("id", "unknown"),
+            title=doc.get("metadata", {}).get("title", "Document"),
+            content=doc.get("content", "")[:200],  # Limit content length
+            score=doc.get("score", 0.0),
+            metadata={
+                "collection": request.collection,
+                "source": doc.get("metadata", {}).get("source", "Unknown"),
+                "chunk_id": doc.get("metadata", {}).get("chunk_id", ""),
+            }
+        ))
+
+    logging.info(f"Search completed: {len(citations)} citations found")
+
+    # Surface output safety metadata (Step 4: Llama Guard). When flagged,
+    # the agent has already replaced the response with a templated
+    # fallback and discarded citations - we just expose the metadata so
+    # clients can render a generic banner if desired.
+    safety_flag_payload: Optional[SafetyFlag] = None
+    sf = result.get("safety_flag")
+    if isinstance(sf, dict):
+        safety_flag_payload = SafetyFlag(
+            flagged=bool(sf.get("flagged", False)),
+            categories=list(sf.get("categories") or []),
+            checked_at=sf.get("checked_at"),
+        )
 
-    The request is authenticated and rate-limited by ``require_tenant`` and is
-    scoped to the calling tenant's collection namespace.
+    return ChatResponse(
+        response=response_text,
+        citations=citations,
+        conversationId=conversation_id,
+        queryComplexity=query_complexity,
+        safetyFlag=safety_flag_payload,
+    )
+
+
+async def _answer(request: ChatRequest, tenant: Tenant) -> ChatResponse:
+    """Produce the ChatResponse for one (already authenticated) request.
+
+    Stateless requests may be answered from the response cache, or share an
+    identical in-flight request's agent call when they start a conversation
+    (see ``_starts_conversation``); either way the caller gets its own
+    conversationId. Follow-ups in a conversation always run their own
+    search against that conversation's memory. Agent failures
+    propagate (see ``_answer_or_apologize``).
     """
     namespaced_collection = tenant.namespaced(request.collection)
 
     # If AI Agent is not available, return mock response
     if not AI_AGENT_AVAILABLE:
-        return ChatResponse(
-            response=f"Thank you for your query: '{request.query}'. AI Agent is not currently available. Please ensure the AI Agent is properly configured.",
-            citations=[],
-            conversationId=request.conversationId or "demo-conversation-id",
-            queryComplexity="simple"
+        return _mock_response(request)
+
+    # Get or create a tenant-isolated conversation thread.
+    conversation_id = request.conversationId or _new_conversation_id()
+
+    cache = await _response_cache_for(tenant, request)
+    if cache is not None:
+        cached = cache.get(tenant.tenant_id, namespaced_collection, request.query)
+        if cached is not None:
+            await _record_turn(tenant, None, request, conversation_id, cached.response)
+            return cached.model_copy(update={"conversationId": conversation_id})
+        # An upload or delete during the search makes its answer stale.
+        generation = cache.generation(namespaced_collection)
+
+    async def run_search() -> ChatResponse:
+        conversation = await _conversation_agent(
+            tenant, conversation_id, resume=bool(request.conversationId)
         )
-
-    try:
-        # Get or create a tenant-isolated conversation thread.
-        conversation_id = request.conversationId or f"conv_{os.urandom(8).hex()}"
-        thread_key = _thread_key(tenant, conversation_id)
-
-        if thread_key in conversation_threads:
-            agent = conversation_threads[thread_key]
-        else:
-            # Prefix the agent's checkpoint thread_id with the tenant so the
-            # underlying LangGraph memory is isolated per tenant as well.
-            agent = IntraMindAgent(thread_id=thread_key)
-            conversation_threads[thread_key] = agent
-            logging.info(f"Created new conversation thread: {thread_key}")
-
         logging.info(
             f"Processing query for tenant '{tenant.tenant_id}': {request.query} "
             f"(collection: {namespaced_collection})"
         )
-        result = await agent.search(
-            query=request.query,
-            collection_name=namespaced_collection,
-            num_results=5,
-            min_score=0.3
-        )
-
-        # Extract response and citations
-        response_text = result.get("final_response", "I couldn't find relevant information for your query.")
-        search_results = result.get("search_results", [])
-        query_complexity = result.get("query_classification", {}).get("complexity", "unknown")
-
-        # Map search results to citations (display the un-namespaced collection)
-        citations = []
-        for doc in search_results:
-            citations.append(SearchResult(
-                id=doc.get("id", "unknown"),
-                title=doc.get("metadata", {}).get("title", "Document"),
-                content=doc.get("content", "")[:200],  # Limit content length
-                score=doc.get("score", 0.0),
-                metadata={
-                    "collection": request.collection,
-                    "source": doc.get("metadata", {}).get("source", "Unknown"),
-                    "chunk_id": doc.get("metadata", {}).get("chunk_id", ""),
-                }
-            ))
-
-        logging.info(f"Search completed: {len(citations)} citations found")
-
-        # Surface output safety metadata (Step 4: Llama Guard). When flagged,
-        # the agent has already replaced the response with a templated
-        # fallback and discarded citations - we just expose the metadata so
-        # clients can render a generic banner if desired.
-        safety_flag_payload: Optional[SafetyFlag] = None
-        sf = result.get("safety_flag")
-        if isinstance(sf, dict):
-            safety_flag_payload = SafetyFlag(
-                flagged=bool(sf.get("flagged", False)),
-                categories=list(sf.get("categories") or []),
-                checked_at=sf.get("checked_at"),
+        search = conversation.agent.search
+        async with get_concurrency_limiter().slot(tenant):
+            result = await search(
+                **_search_kwargs(request, namespaced_collection, conversation, search)
             )
-
-        return ChatResponse(
-            response=response_text,
-            citations=citations,
-            conversationId=conversation_id,
-            queryComplexity=query_complexity,
-            safetyFlag=safety_flag_payload,
+        response = _to_chat_response(result, request, conversation_id)
+        await _record_turn(tenant, conversation, request, conversation_id, response.response)
+        return response
+
+    if not get_settings().chat_coalesce_enabled or not await _starts_conversation(
+        tenant, request
+    ):
+        response = await run_search()
+    else:
+        flight_key = (tenant.tenant_id, namespaced_collection, normalize_query(request.query))
+        response, shared = await _chat_flights.do(flight_key, run_search)
+        if shared:
+            await _record_turn(tenant, None, request, conversation_id, response.response)
+            return response.model_copy(update={"conversationId": conversation_id})
+    if cache is not None:
+        cache.put(
+            tenant.tenant_id, namespaced_collection, request.query, response, generation
         )
+    return response
+
 
+async def _answer_or_apologize(request: ChatRequest, tenant: Tenant) -> ChatResponse:
+    """``_answer``, with an agent failure turned into an apologetic ChatResponse."""
+    try:
+        return await _answer(request, tenant)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error processing chat request: {e}", exc_info=True)
 
         # Return error response with helpful message
-        return ChatResponse(
-            response=f"I apologize, but I encountered an error processing your request: {str(e)}. Please ensure the IntraMind services are running and try again.",
-            citations=[],
-            conversationId=request.conversationId or "error-conversation",
-            queryComplexity="error"
+        return _error_response(request, e)
+
+
+@router.post("", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest,
+    http_request: Request,
+    tenant: Tenant = Depends(require_tenant),
+):
+    """Send a chat message and get an AI-powered response.
+
+    The request is authenticated and rate-limited by ``require_tenant`` and is
+    scoped to the calling tenant's collection namespace. The agent call holds
+    one of the tenant's in-flight slots (503 if none frees up in time), and is
+    cancelled if the client disconnects or the tenant's deadline passes (504).
+    """
+    response = await get_request_canceller().run(
+        "chat", _answer_or_apologize(request, tenant), http_request, tenant.request_timeout_seconds
+    )
+    return ModelJSONResponse(response)
+
+
+@router.post("/batch", response_model=BatchChatResponse)
+async def chat_batch(
+    batch: BatchChatRequest,
+    http_request: Request,
+    ordered: bool = True,
+    tenant: Tenant = Depends(authenticate),
+):
+    """Answer many chat requests in one round trip.
+
+    Items run concurrently, at most ``chat_batch_max_parallelism`` at a time
+    (and never more than the tenant's in-flight cap). The whole batch is
+    charged up front as one chat per item, so it is admitted or rejected
+    (429) as a unit; a batch costing more than the tenant's whole per-minute
+    budget gets a 413 instead, as waiting would never let it through.
+    Each item is held to the tenant's request deadline, as ``POST /api/chat``
+    is. Failures and timeouts are reported in the item's ``error`` and never
+    abort the rest; a client that disconnects cancels every item still running.
+
+    With ``ordered=true`` (default) the response lists results in request
+    order. With ``ordered=false`` results are streamed as NDJSON, one
+    ``BatchChatItem`` per line, as soon as each completes.
+    """
+    settings = get_settings()
+    items = batch.requests
+    if len(items) > settings.chat_batch_max_items:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch has {len(items)} requests; the maximum is {settings.chat_batch_max_items}",
+        )
+
+    await charge_batch(tenant, len(items) * get_cost_model().route_cost(router.prefix))
+
+    parallelism = max(1, settings.chat_batch_max_parallelism)
+    if tenant.max_concurrent_requests > 0:
+        parallelism = min(parallelism, tenant.max_concurrent_requests)
+    semaphore = asyncio.Semaphore(parallelism)
+
+    canceller = get_request_canceller()
+
+    async def run(index: int, item: ChatRequest) -> BatchChatItem:
+        async with semaphore:
+            try:
+                # Each item gets the deadline a single chat would (504 detail
+                # in its error); the wait for a batch slot does not count.
+                response = await canceller.run(
+                    "chat_batch_item", _answer(item, tenant), None,
+                    tenant.request_timeout_seconds,
+                )
+                return BatchChatItem(index=index, response=response)
+            except HTTPException as e:
+                return BatchChatItem(index=index, error=str(e.detail))
+            except Exception as e:
+                logging.error(f"Batch item {index} failed: {e}", exc_info=True)
+                return BatchChatItem(index=index, error=str(e))
+
+    tasks = [run(index, item) for index, item in enumerate(items)]
+    if ordered:
+        # No deadline for the batch as a whole (each item has its own), but
+        # stop every item if the client goes away before the response is ready.
+        results = await canceller.run(
+            "chat_batch", asyncio.gather(*tasks), http_request
+        )
+        return ModelJSONResponse(BatchChatResponse(results=results))
+
+    async def completed() -> AsyncIterator[str]:
+        pending = [asyncio.ensure_future(task) for task in tasks]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield (await next_done).model_dump_json() + "\n"
+        finally:
+            # Client went away mid-stream: stop the remaining agent calls.
+            for task in pending:
+                task.cancel()
+
+    return StreamingResponse(completed(), media_type="application/x-ndjson")
+
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _warn_stream_fallback() -> None:
+    global _stream_fallback_warned
+    if not _stream_fallback_warned:
+        _stream_fallback_warned = True
+        logging.warning(
+            "IntraMindAgent has no stream_search(); /api/chat/stream sends each answer "
+            "as one delta after the full search, so time to first token does not improve"
         )
 
 
+async def _chat_events(request: ChatRequest, tenant: Tenant) -> AsyncIterator[str]:
+    """Yield the SSE frames for one streamed chat turn.
+
+    Event order: ``start`` (conversationId, sent before any agent work so the
+    first byte goes out immediately), zero or more ``token`` deltas, then the
+    trailing ``citations`` and ``metadata`` events and a final ``done`` that
+    carries the authoritative ``response`` text. Clients should replace the
+    streamed text with it: when output safety flags an answer, the agent swaps
+    in a templated fallback after generation. Failures end the stream with an
+    ``error`` event.
+    """
+    conversation_id = request.conversationId or _new_conversation_id()
+    yield _sse("start", {"conversationId": conversation_id})
+
+    namespaced_collection = tenant.namespaced(request.collection)
+    cache = await _response_cache_for(tenant, request) if AI_AGENT_AVAILABLE else None
+    cached = (
+        cache.get(tenant.tenant_id, namespaced_collection, request.query)
+        if cache is not None else None
+    )
+    generation = cache.generation(namespaced_collection) if cache is not None else None
+
+    try:
+        if not AI_AGENT_AVAILABLE:
+            response = _mock_response(request)
+            response.conversationId = conversation_id
+            yield _sse("token", {"text": response.response})
+        elif cached is not None:
+            response = cached.model_copy(update={"conversationId": conversation_id})
+            yield _sse("token", {"text": response.response})
+            await _record_turn(tenant, None, request, conversation_id, response.response)
+        else:
+            canceller = get_request_canceller()
+            timeout = tenant.request_timeout_seconds
+            started = time.monotonic()
+
+            def remaining() -> Optional[float]:
+                # wait_for() timeout left before the tenant's deadline.
+                return max(0.0, started + timeout - time.monotonic()) if timeout > 0 else None
+
+            try:
+                conversation = await _conversation_agent(
+                    tenant, conversation_id, resume=bool(request.conversationId)
+                )
+                agent = conversation.agent
+                logging.info(
+                    f"Streaming query for tenant '{tenant.tenant_id}': {request.query} "
+                    f"(collection: {namespaced_collection})"
+                )
+                stream_search = getattr(agent, "stream_search", None)
+                kwargs = _search_kwargs(
+                    request, namespaced_collection, conversation, stream_search or agent.search
+                )
+                async with get_concurrency_limiter().slot(tenant):
+                    if stream_search is None:
+                        # Agent cannot stream tokens: send the whole answer as
+                        # a single delta once it is ready.
+                        _warn_stream_fallback()
+                        result = await asyncio.wait_for(agent.search(**kwargs), remaining())
+                        response = _to_chat_response(result, request, conversation_id)
+                        yield _sse("token", {"text": response.response})
+                    else:
+                        result = {}
+                        events = aiter(stream_search(**kwargs))
+                        try:
+                            while True:
+                                try:
+                                    event = await asyncio.wait_for(anext(events), remaining())
+                                except StopAsyncIteration:
+                                    break
+                                if event.get("type") == "token":
+                                    yield _sse("token", {"text": event.get("content", "")})
+                                elif event.get("type") == "result":
+                                    result = event.get("result") or {}
+                        finally:
+                            aclose = getattr(events, "aclose", None)
+                            if aclose is not None:
+                                await aclose()
+                        response = _to_chat_response(result, request, conversation_id)
+            except TimeoutError:
+                canceller.record("chat_stream", "deadline", time.monotonic() - started)
+                raise DeadlineExceededError(timeout)
+            except (asyncio.CancelledError, GeneratorExit):
+                canceller.record("chat_stream", "disconnect", time.monotonic() - started)
+                raise
+            canceller.record("chat_stream", "completed", time.monotonic() - started)
+            await _record_turn(tenant, conversation, request, conversation_id, response.response)
+            if cache is not None:
+                cache.put(
+                    tenant.tenant_id, namespaced_collection, request.query, response, generation
+                )
+
+        yield _sse("citations", [c.model_dump() for c in response.citations])
+        yield _sse("metadata", {
+            "queryComplexity": response.queryComplexity,
+            "safetyFlag": response.safetyFlag.model_dump() if response.safetyFlag else None,
+        })
+        yield _sse("done", {"response": response.response, "conversationId": conversation_id})
+
+    except HTTPException as e:
+        yield _sse("error", {"status": e.status_code, "error": e.detail})
+    except Exception as e:
+        logging.error(f"Error streaming chat response: {e}", exc_info=True)
+        yield _sse("error", {"status": 500, "error": _error_response(request, e).response})
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    tenant: Tenant = Depends(require_tenant),
+):
+    """Stream a chat answer as Server-Sent Events (see ``_chat_events``).
+
+    Token deltas need an agent ``stream_search`` async iterator
+    (``{"type": "token", "content": ...}`` deltas followed by a
+    ``{"type": "result", "result": ...}`` event shaped like ``search()``).
+    The AI Agent does not provide one yet, so until it does the full answer
+    arrives as one delta after the search: the framing is in place, but time
+    to first token is the same as ``POST /api/chat`` (a warning is logged).
+    """
+    return StreamingResponse(
+        _chat_events(request, tenant),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.delete("/conversation/{conversation_id}")
 async def clear_conversation(
     conversation_id: str,
@@ -177,8 +638,11 @@ async def clear_conversation(
 ):
     """Clear one of the calling tenant's conversation threads."""
     thread_key = _thread_key(tenant, conversation_id)
-    if thread_key in conversation_threads:
-        del conversation_threads[thread_key]
+    removed = get_conversation_store().pop(thread_key)
+    backend = get_conversation_backend()
+    if backend is not None:
+        removed = await asyncio.to_thread(backend.delete, thread_key) or removed
+    if removed:
         return {"status": "success", "message": f"Conversation {conversation_id} cleared"}
 
     return {"status": "not_found", "message": f"Conversation {conversation_id} not found"}
@@ -187,8 +651,14 @@ async def clear_conversation(
 @router.get("/health")
 async def chat_health():
     """Health check for chat endpoint (unauthenticated)."""
+    conversations = get_conversation_store()
+    cache = get_response_cache()
     return {
         "status": "healthy",
         "ai_agent_available": AI_AGENT_AVAILABLE,
-        "active_conversations": len(conversation_threads)
+        "active_conversations": len(conversations),
+        "conversation_store": conversations.stats(),
+        "conversation_backend": get_settings().conversation_backend,
+        "response_cache": cache.stats() if cache is not None else {"enabled": False},
+        "coalescing": _chat_flights.stats(),
     }
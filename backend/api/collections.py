@@ -1,26 +1,42 @@
 """Collections API endpoints (tenant-scoped, proxied to the API Gateway)."""
 
+import asyncio
 import os
 import sys
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Optional, List
 import logging
 
 # Add AI Agent to Python path
 AI_AGENT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..", "ai-agent", "src")
 sys.path.insert(0, AI_AGENT_PATH)
 
-from tools.api_client import APIGatewayClient
+# Only needed for annotations here (gateway.py builds the client), so the
+# routers still import without the AI Agent checkout.
+try:
+    from tools.api_client import APIGatewayClient
+except ImportError as e:
+    logging.warning(f"API Gateway client not available: {e}. Collections calls will fail.")
+    APIGatewayClient = Any
 import httpx
 
 from auth import require_tenant
+from collection_cache import get_collection_cache
+from collection_index import CollectionIndex, decode_cursor, encode_cursor
+from gateway import gateway_client
+from response_cache import get_response_cache
+from serialization import ModelJSONResponse
 from tenancy import Tenant
+from upload_dedup import get_content_index
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/collections", tags=["collections"])
 
+# Largest page a client may ask for with ``limit``.
+MAX_PAGE_SIZE = 500
+
 
 class Collection(BaseModel):
     name: str
@@ -35,31 +51,48 @@ class CreateCollectionRequest(BaseModel):
 
 
 @router.get("", response_model=List[Collection])
-async def list_collections(tenant: Tenant = Depends(require_tenant)):
+async def list_collections(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    tenant: Tenant = Depends(require_tenant),
+    client: APIGatewayClient = Depends(gateway_client),
+):
     """List the calling tenant's collections (proxied to the API Gateway).
 
-    Only collections owned by this tenant are returned, and the tenant prefix
-    is stripped from the names before they leave the backend.
+    Only collections owned by this tenant are returned, sorted by name, and
+    the tenant prefix is stripped from the names before they leave the
+    backend. With ``limit`` the list is paged: when more collections follow,
+    the ``X-Next-Cursor`` response header holds the ``cursor`` for the next
+    page. Pages are read from the shared collection index when it is enabled.
     """
     try:
-        async with APIGatewayClient() as client:
-            collections_response = await client.list_collections()
-
-            collections = [
-                Collection(
-                    name=tenant.display(col.collection_name),
-                    documentCount=col.vector_count,
-                    createdAt=col.created_at or "2025-01-01T00:00:00Z",
-                    description=col.description
-                )
-                for col in collections_response
-                if tenant.owns(col.collection_name)
-            ]
-
-            logger.info(
-                "Listed %d collections for tenant '%s'", len(collections), tenant.tenant_id
+        after = decode_cursor(cursor) if cursor else ""
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid collections cursor")
+
+    try:
+        cache = get_collection_cache()
+        if cache is not None:
+            records, more = await cache.page(tenant, client.list_collections, after, limit)
+        else:
+            index = CollectionIndex(await client.list_collections())
+            records, more = index.page(tenant.gateway_prefix, after, limit)
+
+        collections = [
+            Collection(
+                name=tenant.display(col.collection_name),
+                documentCount=col.vector_count,
+                createdAt=col.created_at or "2025-01-01T00:00:00Z",
+                description=col.description
             )
-            return collections
+            for col in records
+        ]
+
+        logger.info(
+            "Listed %d collections for tenant '%s'", len(collections), tenant.tenant_id
+        )
+        headers = {"X-Next-Cursor": encode_cursor(collections[-1].name)} if more else None
+        return ModelJSONResponse(collections, headers=headers)
 
     except httpx.HTTPStatusError as e:
         logger.error(f"Failed to list collections: {e}")
@@ -79,27 +112,31 @@ async def list_collections(tenant: Tenant = Depends(require_tenant)):
 async def create_collection(
     request: CreateCollectionRequest,
     tenant: Tenant = Depends(require_tenant),
+    client: APIGatewayClient = Depends(gateway_client),
 ):
     """Create a collection within the calling tenant's namespace."""
     namespaced = tenant.namespaced(request.name)
     try:
-        async with APIGatewayClient() as client:
-            collection_response = await client.create_collection(
-                name=namespaced,
-                description=request.description
-            )
+        collection_response = await client.create_collection(
+            name=namespaced,
+            description=request.description
+        )
 
-            collection = Collection(
-                name=tenant.display(collection_response.collection_name),
-                documentCount=collection_response.vector_count,
-                createdAt=collection_response.created_at or "2025-01-01T00:00:00Z",
-                description=collection_response.description
-            )
+        collection = Collection(
+            name=tenant.display(collection_response.collection_name),
+            documentCount=collection_response.vector_count,
+            createdAt=collection_response.created_at or "2025-01-01T00:00:00Z",
+            description=collection_response.description
+        )
 
-            logger.info(
-                "Created collection '%s' for tenant '%s'", namespaced, tenant.tenant_id
-            )
-            return collection
+        list_cache = get_collection_cache()
+        if list_cache is not None:
+            list_cache.upsert(collection_response)
+
+        logger.info(
+            "Created collection '%s' for tenant '%s'", namespaced, tenant.tenant_id
+        )
+        return ModelJSONResponse(collection)
 
     except httpx.HTTPStatusError as e:
         logger.error(f"Failed to create collection: {e}")
@@ -119,17 +156,30 @@ async def create_collection(
 async def delete_collection(
     collection_name: str,
     tenant: Tenant = Depends(require_tenant),
+    client: APIGatewayClient = Depends(gateway_client),
 ):
     """Delete one of the calling tenant's collections."""
     namespaced = tenant.namespaced(collection_name)
     try:
-        async with APIGatewayClient() as client:
-            await client.delete_collection(namespaced)
+        await client.delete_collection(namespaced)
 
-            logger.info(
-                "Deleted collection '%s' for tenant '%s'", namespaced, tenant.tenant_id
-            )
-            return {"success": True, "message": f"Collection '{collection_name}' deleted"}
+        cache = get_response_cache()
+        if cache is not None:
+            cache.invalidate_collection(namespaced)
+
+        list_cache = get_collection_cache()
+        if list_cache is not None:
+            list_cache.remove(namespaced)
+
+        # Its documents are gone, so re-uploading them must ingest again.
+        index = get_content_index()
+        if index is not None:
+            await asyncio.to_thread(index.forget_collection, namespaced)
+
+        logger.info(
+            "Deleted collection '%s' for tenant '%s'", namespaced, tenant.tenant_id
+        )
+        return {"success": True, "message": f"Collection '{collection_name}' deleted"}
 
     except httpx.HTTPStatusError as e:
         logger.error(f"Failed to delete collection: {e}")
@@ -2,9 +2,12 @@
 Document upload API endpoints - Integrates with AI Agent ingestion workflow
 """
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Form
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+from datetime import datetime, timezone
+import asyncio
+import hashlib
 import os
 import sys
 import logging
@@ -23,17 +26,95 @@ except ImportError as e:
     logging.warning(f"AI Agent not available: {e}. Upload will return mock responses.")
     AI_AGENT_AVAILABLE = False
 
-from auth import require_tenant
+from auth import authenticate, charge_batch, charge_unmetered_body, get_cost_model, require_tenant
+from collection_cache import get_collection_cache
+from config import get_settings
+from deadlines import get_request_canceller
+from ingestion_executor import IngestionExecutor, build_ingestion_agent
+from ingestion_jobs import SUCCEEDED, IngestionJob, get_ingestion_queue
+from response_cache import get_response_cache
+from resumable_uploads import UploadSession, get_resumable_store
 from tenancy import Tenant
+from upload_dedup import get_content_index
+from upload_limits import UploadTooLargeError, spool_upload
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
+# Ingestion agents carry no conversation memory, so they are built once per
+# executor worker (or agent pool slot) and reused across uploads. The
+# executor keeps parsing and OCR off the event loop that serves chat.
+_ingestion_executor: Optional[IngestionExecutor] = None
+
+
+def get_ingestion_executor() -> Optional[IngestionExecutor]:
+    """Return the ingestion executor, or None when the AI Agent is missing."""
+    global _ingestion_executor
+    if not AI_AGENT_AVAILABLE:
+        return None
+    if _ingestion_executor is None:
+        settings = get_settings()
+        _ingestion_executor = IngestionExecutor(
+            build_ingestion_agent,
+            mode=settings.ingestion_executor,
+            workers=settings.ingestion_workers,
+            pool_size=settings.agent_pool_size,
+        )
+    return _ingestion_executor
+
 
 class UploadResponse(BaseModel):
     success: bool
     documentId: Optional[str] = None
     chunksStored: Optional[int] = None
     error: Optional[str] = None
+    jobId: Optional[str] = None
+    status: Optional[str] = None
+    # True when identical content was already in the collection; documentId
+    # (or jobId, while the first copy is still ingesting) refers to it.
+    duplicate: bool = False
+
+
+class BatchUploadItem(UploadResponse):
+    index: int
+    filename: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    results: List[BatchUploadItem]
+
+
+class UploadJobResponse(BaseModel):
+    jobId: str
+    status: str
+    progress: int
+    filename: str
+    collection: str
+    chunksStored: Optional[int] = None
+    documentId: Optional[str] = None
+    error: Optional[str] = None
+    createdAt: str
+    finishedAt: Optional[str] = None
+
+
+class UploadSessionRequest(BaseModel):
+    filename: str
+    collection: str
+    size: int
+
+
+class UploadSessionResponse(BaseModel):
+    sessionId: str
+    filename: str
+    collection: str
+    size: int
+    offset: int
+    expiresAt: Optional[str] = None
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
 
 
 # Allowed file extensions
@@ -51,17 +132,214 @@ def validate_file_type(filename: str) -> bool:
     return ext in ALLOWED_EXTENSIONS
 
 
-@router.post("", response_model=UploadResponse)
-async def upload_document(
-    file: UploadFile = File(...),
-    collection: str = Form(...),
-    tenant: Tenant = Depends(require_tenant),
-):
+def _progress_reporter(job: IngestionJob):
+    """Callback mapping the agent's completed fraction (0.0-1.0) onto ``job``.
+
+    Agents that don't report progress (or run in worker processes) jump
+    from 0 to 100 instead.
     """
-    Upload a document for ingestion
 
-    This endpoint proxies to the AI Agent ingestion workflow and stores the
-    document inside the calling tenant's collection namespace.
+    def report(fraction: float) -> None:
+        job.progress = max(job.progress, min(99, int(fraction * 100)))
+
+    return report
+
+
+async def _ingested(
+    tenant: Tenant, namespaced_collection: str, content_hash: str, job: IngestionJob, result: dict
+) -> None:
+    """Record a stored file's hash and drop what its new vectors made stale."""
+    index = get_content_index()
+    if index is not None:
+        await asyncio.to_thread(
+            index.record,
+            tenant.tenant_id,
+            namespaced_collection,
+            content_hash,
+            result.get("document_id", job.filename),
+            job.filename,
+        )
+
+    # Cached chat answers for this collection are now stale.
+    cache = get_response_cache()
+    if cache is not None:
+        cache.invalidate_collection(namespaced_collection)
+    # So is the document count in the collection list (and the upload may
+    # have created the collection).
+    list_cache = get_collection_cache()
+    if list_cache is not None:
+        list_cache.add_vectors(namespaced_collection, result.get("chunks_stored", 0))
+
+
+# Bookkeeping for files whose job hit its deadline after a worker had
+# already started them; held so the tasks are not garbage-collected.
+_late_ingestions: set[asyncio.Task] = set()
+
+
+def _ingestion_runner(tenant: Tenant, namespaced_collection: str, content_hash: str):
+    """Build the job runner that ingests one uploaded file for ``tenant``."""
+
+    async def run(job: IngestionJob) -> dict:
+        def finished_late(result: dict) -> None:
+            # The job failed on its deadline, but the worker went on to store
+            # the file; record it so a re-upload is not ingested twice.
+            logging.warning(
+                f"Ingestion job {job.job_id} timed out but {job.filename} was "
+                f"stored afterwards ({result.get('chunks_stored', 0)} chunks)"
+            )
+            task = asyncio.ensure_future(
+                _ingested(tenant, namespaced_collection, content_hash, job, result)
+            )
+            _late_ingestions.add(task)
+            task.add_done_callback(_late_ingestions.discard)
+
+        async def ingest() -> dict:
+            return await get_ingestion_executor().ingest(
+                progress=_progress_reporter(job),
+                on_late_result=finished_late,
+                file_path=job.file_path,
+                collection_name=namespaced_collection,
+                original_filename=job.filename,
+            )
+
+        # The job outlives the request, so only the tenant's upload deadline
+        # (not a client disconnect) cancels it.
+        index = get_content_index()
+        try:
+            result = await get_request_canceller().run(
+                "ingest", ingest(), timeout=tenant.upload_timeout_seconds
+            )
+            await _ingested(tenant, namespaced_collection, content_hash, job, result)
+        finally:
+            if index is not None:
+                index.end(tenant.tenant_id, namespaced_collection, content_hash, job.job_id)
+
+        logging.info(
+            f"✅ Ingestion job {job.job_id} finished: {job.filename} - "
+            f"{result.get('chunks_stored', 0)} chunks stored"
+        )
+        return result
+
+    return run
+
+
+async def _find_duplicate(
+    tenant: Tenant, namespaced_collection: str, content_hash: str
+) -> Optional[tuple[UploadResponse, Optional[IngestionJob]]]:
+    """Answer an upload whose content is already (being) ingested, if it is."""
+    index = get_content_index()
+    if index is None:
+        return None
+
+    def in_flight() -> Optional[tuple[UploadResponse, IngestionJob]]:
+        job_id = index.pending(tenant.tenant_id, namespaced_collection, content_hash)
+        if job_id is None:
+            return None
+        job = get_ingestion_queue().get(job_id, tenant.tenant_id)
+        if job is None or job.finished:
+            return None
+        return UploadResponse(
+            success=True, jobId=job.job_id, status=job.status, duplicate=True
+        ), job
+
+    if (pending := in_flight()) is not None:
+        return pending
+    document_id = await asyncio.to_thread(
+        index.lookup, tenant.tenant_id, namespaced_collection, content_hash
+    )
+    if document_id is None:
+        # Check again: the same content may have been queued during the
+        # lookup. Nothing awaits between here and the caller's begin().
+        return in_flight()
+    return UploadResponse(
+        success=True, documentId=document_id, chunksStored=0, duplicate=True
+    ), None
+
+
+async def _queue_file(
+    tenant: Tenant,
+    collection: str,
+    filename: str,
+    file_path: str,
+    content_hash: str,
+    force: bool = False,
+    keep_rejected: bool = False,
+) -> tuple[UploadResponse, Optional[IngestionJob]]:
+    """Queue ingestion of a file already saved at ``file_path``.
+
+    The file is consumed: a queued job takes it over, otherwise it is deleted
+    here. With ``keep_rejected``, a file the queue turns away (503 / 429) is
+    left in place for the caller instead. Content already in the collection
+    (or being ingested into it) is answered from the dedup index unless
+    ``force`` is set.
+    """
+    namespaced_collection = tenant.namespaced(collection)
+    try:
+        if not force:
+            duplicate = await _find_duplicate(tenant, namespaced_collection, content_hash)
+            if duplicate is not None:
+                logging.info(
+                    f"Skipping duplicate upload for tenant '{tenant.tenant_id}': "
+                    f"{filename} already in '{namespaced_collection}'"
+                )
+                return duplicate
+
+        # If AI Agent is not available, return mock response
+        if not AI_AGENT_AVAILABLE:
+            logging.warning("AI Agent not available - returning mock response")
+            return UploadResponse(
+                success=True,
+                documentId=f"mock-{filename}",
+                chunksStored=5  # Mock value
+            ), None
+
+        # Hand the file to the background ingestion queue; from here on the
+        # job owns (and eventually deletes) it.
+        job = IngestionJob(
+            job_id=f"job_{os.urandom(8).hex()}",
+            tenant_id=tenant.tenant_id,
+            filename=filename,
+            collection=collection,
+            file_path=file_path,
+        )
+        try:
+            get_ingestion_queue().submit(
+                job, _ingestion_runner(tenant, namespaced_collection, content_hash)
+            )
+        except HTTPException:
+            if keep_rejected:
+                file_path = None
+            raise
+        file_path = None
+        index = get_content_index()
+        if index is not None:
+            index.begin(tenant.tenant_id, namespaced_collection, content_hash, job.job_id)
+        logging.info(f"Queued ingestion job {job.job_id} for {filename}")
+        return UploadResponse(success=True, jobId=job.job_id, status=job.status), job
+    finally:
+        if file_path is not None:
+            try:
+                os.unlink(file_path)
+            except OSError:
+                pass
+
+
+async def _queue_upload(
+    file: UploadFile,
+    collection: str,
+    tenant: Tenant,
+    request: Request,
+    force: bool = False,
+) -> tuple[UploadResponse, Optional[IngestionJob]]:
+    """Validate and save one uploaded file, then queue its ingestion.
+
+    Returns the immediate UploadResponse and the queued job (None when the
+    file was rejected, already ingested or the AI Agent is unavailable). A
+    file identical to one still being ingested returns that job instead of
+    queueing another, unless ``force`` is set. A full ingestion queue raises
+    IngestionQueueFullError (503); a tenant with too many outstanding jobs
+    gets TenantIngestionLimitError (429). A body sent without ``Content-Length`` is
+    charged for the file's size once it has been received (429 if over).
     """
     namespaced_collection = tenant.namespaced(collection)
 
@@ -70,7 +348,7 @@ async def upload_document(
         return UploadResponse(
             success=False,
             error="No file provided"
-        )
+        ), None
 
     # Validate file type
     if not validate_file_type(file.filename):
@@ -78,90 +356,350 @@ async def upload_document(
         return UploadResponse(
             success=False,
             error=f"File type '{ext}' not allowed. Supported: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
-        )
+        ), None
 
-    # Read file content
+    # Stream the file to a temporary location in fixed-size chunks, checking
+    # the tenant's size limit and hashing the content as it goes; memory
+    # stays bounded by the chunk.
+    tmp_file_path = None
+    digest = hashlib.sha256()
     try:
-        content = await file.read()
-        file_size = len(content)
-
-        # Validate file size (10MB default limit)
-        max_size = 10 * 1024 * 1024  # 10MB
-        if file_size > max_size:
-            return UploadResponse(
-                success=False,
-                error=f"File size ({file_size / 1024 / 1024:.2f}MB) exceeds maximum allowed size (10MB)"
+        with tempfile.NamedTemporaryFile(delete=False, suffix=get_file_extension(file.filename)) as tmp_file:
+            tmp_file_path = tmp_file.name
+            file_size = await spool_upload(
+                file,
+                tmp_file,
+                tenant.max_upload_bytes,
+                get_settings().upload_chunk_size_bytes,
+                digest=digest,
             )
+        await charge_unmetered_body(request, tenant, file_size)
 
         logging.info(
             f"Processing upload for tenant '{tenant.tenant_id}': {file.filename} "
             f"({file_size} bytes) to collection '{namespaced_collection}'"
         )
+        file_path, tmp_file_path = tmp_file_path, None
+        return await _queue_file(
+            tenant, collection, file.filename, file_path, digest.hexdigest(), force
+        )
 
-        # If AI Agent is not available, return mock response
-        if not AI_AGENT_AVAILABLE:
-            logging.warning("AI Agent not available - returning mock response")
-            return UploadResponse(
-                success=True,
-                documentId=f"mock-{file.filename}",
-                chunksStored=5  # Mock value
-            )
+    except UploadTooLargeError as e:
+        return UploadResponse(
+            success=False,
+            error=e.detail
+        ), None
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Upload processing error: {e}", exc_info=True)
+        return UploadResponse(
+            success=False,
+            error=f"Error processing file: {str(e)}"
+        ), None
+    finally:
+        # Clean up temporary file
+        if tmp_file_path is not None:
+            try:
+                os.unlink(tmp_file_path)
+            except OSError:
+                pass
 
-        # Save file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=get_file_extension(file.filename)) as tmp_file:
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
 
-        try:
-            # Create agent instance (without conversation memory for ingestion)
-            agent = IntraMindAgent(thread_id=False)
+async def _job_result(job: IngestionJob, duplicate: bool = False) -> UploadResponse:
+    """Wait for ``job`` to finish and describe its outcome."""
+    await job.done.wait()
+    if job.status != SUCCEEDED:
+        return UploadResponse(
+            success=False, jobId=job.job_id, status=job.status, error=job.error, duplicate=duplicate
+        )
+    return UploadResponse(
+        success=True,
+        documentId=job.document_id,
+        chunksStored=job.chunks_stored,
+        jobId=job.job_id,
+        status=job.status,
+        duplicate=duplicate,
+    )
 
-            # Call AI Agent ingestion workflow
-            logging.info(f"Starting ingestion for {file.filename}")
-            result = await agent.ingest_document(
-                file_path=tmp_file_path,
-                collection_name=namespaced_collection,
-                original_filename=file.filename
-            )
 
-            # Extract results
-            chunks_stored = result.get("chunks_stored", 0)
-            document_id = result.get("document_id", file.filename)
+@router.post("", response_model=UploadResponse)
+async def upload_document(
+    http_request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    collection: str = Form(...),
+    wait: bool = False,
+    force: bool = False,
+    tenant: Tenant = Depends(require_tenant),
+):
+    """
+    Upload a document for ingestion
 
-            logging.info(f"✅ Upload successful: {file.filename} - {chunks_stored} chunks stored")
+    The file is saved and queued for the AI Agent ingestion workflow, which
+    stores it inside the calling tenant's collection namespace. By default
+    the response is a 202 with a ``jobId`` to poll at
+    ``GET /api/upload/jobs/{jobId}``; with ``wait=true`` it is held until
+    ingestion finishes and carries the result. A full queue returns 503, and
+    a tenant already at its share of the queue gets 429.
 
-            return UploadResponse(
-                success=True,
-                documentId=document_id,
-                chunksStored=chunks_stored
-            )
+    Content already ingested into the collection is not ingested again: the
+    response has ``duplicate=true`` and the original ``documentId``.
+    ``force=true`` re-ingests it anyway.
+    """
+    result, job = await _queue_upload(file, collection, tenant, http_request, force)
+    if job is None:
+        return result
+    if not wait:
+        response.status_code = 202
+        return result
+    return await _job_result(job, result.duplicate)
+
+
+@router.post("/batch", response_model=BatchUploadResponse)
+async def upload_documents(
+    http_request: Request,
+    response: Response,
+    files: List[UploadFile] = File(...),
+    collection: str = Form(...),
+    wait: bool = False,
+    force: bool = False,
+    tenant: Tenant = Depends(authenticate),
+):
+    """
+    Upload several documents to one collection in a single request
+
+    Each file is validated and queued as its own ingestion job, so the files
+    are ingested concurrently by the background workers. Results are listed
+    per file in request order; a rejected file (bad type, too large, queue
+    full) is reported in its entry and never affects the others. As with
+    single uploads, ``wait=true`` holds the response until every job ends,
+    and duplicates (including repeats within the batch) are skipped unless
+    ``force=true``.
+
+    The batch is charged once, up front, as one upload per file plus its
+    declared size; a batch costing more than the tenant's whole per-minute
+    budget is rejected with 413, as retrying it would never succeed.
+    """
+    settings = get_settings()
+    if len(files) > settings.upload_batch_max_files:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch has {len(files)} files; the maximum is {settings.upload_batch_max_files}",
+        )
 
-        except Exception as e:
-            logging.error(f"Ingestion failed for {file.filename}: {e}", exc_info=True)
-            return UploadResponse(
-                success=False,
-                error=f"Ingestion failed: {str(e)}"
-            )
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(tmp_file_path)
-            except:
-                pass
+    await charge_batch(
+        tenant, len(files) * get_cost_model().route_cost(router.prefix), http_request
+    )
 
-    except Exception as e:
-        logging.error(f"Upload processing error: {e}", exc_info=True)
-        return UploadResponse(
-            success=False,
-            error=f"Error processing file: {str(e)}"
+    results: List[BatchUploadItem] = []
+    jobs: List[Optional[IngestionJob]] = []
+    for index, file in enumerate(files):
+        try:
+            result, job = await _queue_upload(file, collection, tenant, http_request, force)
+        except HTTPException as e:
+            result, job = UploadResponse(success=False, error=str(e.detail)), None
+        results.append(BatchUploadItem(index=index, filename=file.filename, **result.model_dump()))
+        jobs.append(job)
+
+    if any(job is not None for job in jobs):
+        if not wait:
+            response.status_code = 202
+        else:
+            finished = await asyncio.gather(*(
+                _job_result(job, results[index].duplicate)
+                for index, job in enumerate(jobs)
+                if job is not None
+            ))
+            outcomes = iter(finished)
+            for index, job in enumerate(jobs):
+                if job is not None:
+                    results[index] = BatchUploadItem(
+                        index=index,
+                        filename=results[index].filename,
+                        **next(outcomes).model_dump(),
+                    )
+    return BatchUploadResponse(results=results)
+
+
+def _require_session(session_id: str, tenant: Tenant) -> UploadSession:
+    session = get_resumable_store().get(session_id, tenant.tenant_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Upload session '{session_id}' not found")
+    return session
+
+
+def _session_response(session: UploadSession) -> UploadSessionResponse:
+    ttl = get_resumable_store().session_ttl
+    return UploadSessionResponse(
+        sessionId=session.session_id,
+        filename=session.filename,
+        collection=session.collection,
+        size=session.size,
+        offset=session.offset,
+        expiresAt=_iso(session.updated_at + ttl) if ttl > 0 else None,
+    )
+
+
+@router.post("/sessions", response_model=UploadSessionResponse, status_code=201)
+async def create_upload_session(
+    request: UploadSessionRequest,
+    tenant: Tenant = Depends(require_tenant),
+):
+    """
+    Start a resumable upload
+
+    For files too large to send reliably in one request. Send the bytes with
+    ``PUT /api/upload/sessions/{sessionId}?offset=N`` in order; after a
+    dropped connection, ``GET`` the session for the offset to resume from.
+    ``POST .../complete`` then queues ingestion like a normal upload.
+    Sessions idle for longer than the session TTL are discarded. The file
+    must fit the tenant's resumable size limit (413), and a tenant with too
+    many sessions or staged bytes open gets a 429.
+    """
+    if not request.filename or not validate_file_type(request.filename):
+        ext = get_file_extension(request.filename)
+        raise HTTPException(
+            status_code=422,
+            detail=f"File type '{ext}' not allowed. Supported: {', '.join(sorted(ALLOWED_EXTENSIONS))}",
+        )
+    session = await asyncio.to_thread(
+        get_resumable_store().create,
+        tenant.tenant_id,
+        request.filename,
+        request.collection,
+        request.size,
+        tenant.max_resumable_upload_bytes,
+    )
+    logging.info(
+        f"Started upload session {session.session_id} for tenant '{tenant.tenant_id}': "
+        f"{session.filename} ({session.size} bytes)"
+    )
+    return _session_response(session)
+
+
+@router.get("/sessions/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    session_id: str,
+    tenant: Tenant = Depends(require_tenant),
+):
+    """Offset (bytes received so far) of one of the tenant's upload sessions."""
+    session = await asyncio.to_thread(_require_session, session_id, tenant)
+    return _session_response(session)
+
+
+@router.put("/sessions/{session_id}", response_model=UploadSessionResponse)
+async def upload_session_chunk(
+    session_id: str,
+    offset: int,
+    http_request: Request,
+    tenant: Tenant = Depends(require_tenant),
+):
+    """
+    Append one chunk (the raw request body) to an upload session
+
+    ``offset`` must equal the session's current offset; otherwise the
+    response is a 409 whose ``Upload-Offset`` header gives the right one. A
+    chunk that is cut off is discarded whole, so resend it from the same
+    offset. A chunk sent without ``Content-Length`` is charged for its size
+    once stored; if that is over budget the 429 still leaves it stored, so
+    ``GET`` the session before resending.
+    """
+    session = await asyncio.to_thread(_require_session, session_id, tenant)
+    new_offset = await get_resumable_store().append(session, offset, http_request.stream())
+    await charge_unmetered_body(http_request, tenant, new_offset - offset)
+    return _session_response(session)
+
+
+@router.post("/sessions/{session_id}/complete", response_model=UploadResponse)
+async def complete_upload_session(
+    session_id: str,
+    response: Response,
+    wait: bool = False,
+    force: bool = False,
+    tenant: Tenant = Depends(require_tenant),
+):
+    """
+    Finish an upload session and queue the file for ingestion
+
+    Every byte must have been received (409 otherwise); a session that was
+    already completed is gone (404). If the ingestion queue turns the file
+    away (503, or 429 for a tenant at its share), the session is kept as it
+    was, so retry ``complete`` later. Responds like
+    ``POST /api/upload``: a 202 with a ``jobId``, the result with
+    ``wait=true``, or the original ``documentId`` for duplicate content.
+    """
+    store = get_resumable_store()
+    session = await asyncio.to_thread(_require_session, session_id, tenant)
+    # Refuse before hashing a large file only to have the queue reject it.
+    get_ingestion_queue().check_capacity(tenant.tenant_id)
+    file_path, content_hash = await asyncio.to_thread(store.complete, session)
+    logging.info(
+        f"Completed upload session {session.session_id} for tenant '{tenant.tenant_id}': "
+        f"{session.filename} ({session.size} bytes)"
+    )
+    try:
+        result, job = await _queue_file(
+            tenant, session.collection, session.filename, file_path, content_hash, force,
+            keep_rejected=True,
         )
+    except HTTPException:
+        # The queue filled up meanwhile: keep the upload for a retry.
+        await asyncio.to_thread(store.reopen, session, file_path)
+        raise
+    if job is None:
+        return result
+    if not wait:
+        response.status_code = 202
+        return result
+    return await _job_result(job, result.duplicate)
+
+
+@router.delete("/sessions/{session_id}")
+async def abort_upload_session(
+    session_id: str,
+    tenant: Tenant = Depends(require_tenant),
+):
+    """Cancel an upload session and discard the data received so far."""
+    store = get_resumable_store()
+    session = await asyncio.to_thread(_require_session, session_id, tenant)
+    await asyncio.to_thread(store.abort, session)
+    return {"success": True, "message": f"Upload session '{session_id}' cancelled"}
 
 
 @router.get("/health")
 async def upload_health():
     """Health check for upload endpoint"""
+    executor = get_ingestion_executor()
     return {
         "status": "healthy",
         "ai_agent_available": AI_AGENT_AVAILABLE,
-        "allowed_extensions": list(ALLOWED_EXTENSIONS)
+        "allowed_extensions": list(ALLOWED_EXTENSIONS),
+        "ingestion_executor": executor.stats() if executor is not None else None,
+        "ingestion_queue": get_ingestion_queue().stats(),
+        "resumable_sessions": get_resumable_store().stats(),
+        "dedup": index.stats() if (index := get_content_index()) is not None else None,
     }
+
+
+@router.get("/jobs/{job_id}", response_model=UploadJobResponse)
+async def get_upload_job(
+    job_id: str,
+    tenant: Tenant = Depends(require_tenant),
+):
+    """Status of one of the calling tenant's ingestion jobs."""
+    job = get_ingestion_queue().get(job_id, tenant.tenant_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Upload job '{job_id}' not found")
+    return UploadJobResponse(
+        jobId=job.job_id,
+        status=job.status,
+        progress=job.progress,
+        filename=job.filename,
+        collection=job.collection,
+        chunksStored=job.chunks_stored,
+        documentId=job.document_id,
+        error=job.error,
+        createdAt=_iso(job.created_at),
+        finishedAt=_iso(job.finished_at),
+    )
@@ -4,27 +4,45 @@ This module replaces the per-endpoint stub checks with a single FastAPI
 dependency, :func:`require_tenant`, that:
 
 1. Resolves the ``X-API-Key`` header to a configured :class:`Tenant`
-   (constant-time comparison; unknown keys are rejected with 401).
-2. Enforces a per-tenant request rate limit (429 when exceeded).
+   (one lookup in an HMAC-keyed digest index; unknown keys are rejected
+   with 401).
+2. Enforces a per-tenant rate limit (429 when exceeded) through the backend
+   configured in :mod:`ratelimit`, charging each request its cost in units
+   (see :class:`ratelimit.CostModel`).
 
 Key material is loaded from the environment (a JSON map or a JSON file) so the
 whole thing stays local and free. A dev-mode escape hatch preserves the legacy
 ``demo-api-key`` behavior for local demos.
+
+When keys come from ``WEB_UI_API_KEYS_FILE``, :class:`KeyFileWatcher` reloads
+the file on change (mtime poll) or on SIGHUP. The new tenant map is built and
+validated in a worker thread and swapped in with a single reference
+assignment, so requests never wait on a reload or observe a partial map.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import hmac
 import json
 import logging
+import os
 import secrets
-import threading
+import signal
 import time
-from collections import defaultdict, deque
 from pathlib import Path
 
-from fastapi import Header, HTTPException
+from fastapi import Header, HTTPException, Request
 
 from config import Settings, get_settings
+from ratelimit import (  # noqa: F401  (RateLimitError / SlidingWindowRateLimiter re-exported)
+    CostModel,
+    RateLimiter,
+    RateLimitError,
+    SlidingWindowRateLimiter,
+    build_rate_limiter,
+)
 from tenancy import Tenant
 
 logger = logging.getLogger(__name__)
@@ -42,49 +60,20 @@ class AuthError(HTTPException):
         super().__init__(status_code=401, detail=detail)
 
 
-class RateLimitError(HTTPException):
-    """429 raised when a tenant exceeds its per-minute request budget."""
-
-    def __init__(self, retry_after: int = 60) -> None:
-        super().__init__(
-            status_code=429,
-            detail="Rate limit exceeded. Please slow down and retry shortly.",
-            headers={"Retry-After": str(retry_after)},
-        )
-
-
-class SlidingWindowRateLimiter:
-    """In-memory per-tenant sliding-window rate limiter.
+class BatchOverBudgetError(HTTPException):
+    """413 raised for a batch that costs more than the tenant's whole budget.
 
-    Lightweight and dependency-free. Suitable for a single-process backend; for
-    multi-instance deployments this should be backed by Redis (noted in docs).
+    Unlike a 429, waiting never helps: the batch has to be split.
     """
 
-    WINDOW_SECONDS = 60
-
-    def __init__(self) -> None:
-        self._hits: dict[str, deque[float]] = defaultdict(deque)
-        self._lock = threading.Lock()
-
-    def check(self, tenant_id: str, limit_per_minute: int) -> None:
-        """Record a hit for ``tenant_id``; raise RateLimitError if over budget."""
-        if limit_per_minute <= 0:
-            return  # 0 / negative means "unlimited"
-        now = time.monotonic()
-        cutoff = now - self.WINDOW_SECONDS
-        with self._lock:
-            bucket = self._hits[tenant_id]
-            while bucket and bucket[0] < cutoff:
-                bucket.popleft()
-            if len(bucket) >= limit_per_minute:
-                oldest = bucket[0]
-                retry_after = max(1, int(self.WINDOW_SECONDS - (now - oldest)))
-                raise RateLimitError(retry_after=retry_after)
-            bucket.append(now)
-
-    def reset(self) -> None:
-        with self._lock:
-            self._hits.clear()
+    def __init__(self, cost: int, limit: int) -> None:
+        super().__init__(
+            status_code=413,
+            detail=(
+                f"Batch costs {cost} rate-limit units but the budget is {limit} per "
+                "minute. Split it into smaller batches."
+            ),
+        )
 
 
 class AuthManager:
@@ -92,8 +81,19 @@ class AuthManager:
 
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
-        self._tenants: dict[str, Tenant] = self._load_tenants(settings)
+        # Per-process secret for the key index. Keys are never stored or
+        # compared in the clear: each one is replaced by its HMAC digest, so a
+        # dict lookup's timing reveals nothing an attacker can steer toward a
+        # real key without knowing this secret.
+        self._index_secret = secrets.token_bytes(32)
+        self._tenants: dict[bytes, Tenant] = self._load_tenants(settings)
+        self._dev_digests = frozenset(self._digest(k) for k in _DEV_KEYS)
         self.settings = settings
+        self._reload_count = 0
+        self._reload_failures = 0
+        self._last_reload_at: float | None = None
+        self._last_reload_seconds: float | None = None
+        self._last_reload_error: str | None = None
         if not self._tenants and not settings.auth_dev_mode:
             logger.warning(
                 "No API keys configured and auth_dev_mode is off; the Web UI "
@@ -115,9 +115,15 @@ class AuthManager:
             return json.loads(settings.api_keys)
         return {}
 
-    def _load_tenants(self, settings: Settings) -> dict[str, Tenant]:
+    def _digest(self, api_key: str) -> bytes:
+        """Return the keyed digest used to index ``api_key``."""
+        return hmac.new(
+            self._index_secret, api_key.encode("utf-8"), hashlib.sha256
+        ).digest()
+
+    def _load_tenants(self, settings: Settings) -> dict[bytes, Tenant]:
         raw = self._load_raw_keys(settings)
-        tenants: dict[str, Tenant] = {}
+        tenants: dict[bytes, Tenant] = {}
         for api_key, cfg in raw.items():
             if not isinstance(cfg, dict):
                 raise ValueError(
@@ -129,7 +135,7 @@ class AuthManager:
             prefix = cfg.get("collection_prefix", tenant_id)
             if not settings.enable_tenant_namespacing:
                 prefix = ""
-            tenants[api_key] = Tenant(
+            tenants[self._digest(api_key)] = Tenant(
                 tenant_id=tenant_id,
                 name=cfg.get("name", tenant_id),
                 rate_limit_per_minute=int(
@@ -140,42 +146,168 @@ class AuthManager:
                 ),
                 collection_prefix=prefix,
                 namespace_separator=settings.tenant_namespace_separator,
+                max_concurrent_requests=int(
+                    cfg.get(
+                        "max_concurrent_requests",
+                        settings.default_max_concurrent_requests,
+                    )
+                ),
+                request_timeout_seconds=float(
+                    cfg.get("request_timeout_seconds", settings.default_request_timeout_seconds)
+                ),
+                upload_timeout_seconds=float(
+                    cfg.get("upload_timeout_seconds", settings.default_upload_timeout_seconds)
+                ),
+                max_upload_bytes=int(
+                    cfg.get("max_upload_bytes", settings.default_max_upload_bytes)
+                ),
+                max_resumable_upload_bytes=int(
+                    cfg.get("max_resumable_upload_bytes", settings.resumable_upload_max_bytes)
+                ),
             )
         return tenants
 
+    def reload(self) -> bool:
+        """Rebuild the tenant map from the key source and swap it in.
+
+        The new map is fully built and validated before it replaces the old
+        one; on any error the current map stays active and the failure is
+        recorded in :meth:`stats`. Safe to call from a worker thread.
+        """
+        started = time.perf_counter()
+        try:
+            tenants = self._load_tenants(self._settings)
+        except Exception as exc:
+            self._reload_failures += 1
+            self._last_reload_error = str(exc)
+            logger.error("API key reload failed; keeping previous keys: %s", exc)
+            return False
+        self._tenants = tenants
+        self._reload_count += 1
+        self._last_reload_at = time.time()
+        self._last_reload_seconds = time.perf_counter() - started
+        self._last_reload_error = None
+        logger.info(
+            "Reloaded %d API keys in %.1f ms",
+            len(tenants),
+            self._last_reload_seconds * 1000,
+        )
+        return True
+
+    def stats(self) -> dict:
+        """Key-count and reload metrics for monitoring."""
+        return {
+            "key_count": len(self._tenants),
+            "reload_count": self._reload_count,
+            "reload_failures": self._reload_failures,
+            "last_reload_at": self._last_reload_at,
+            "last_reload_seconds": self._last_reload_seconds,
+            "last_reload_error": self._last_reload_error,
+        }
+
     def resolve(self, api_key: str | None) -> Tenant | None:
         """Return the Tenant for ``api_key`` or None if unrecognized.
 
-        Uses constant-time comparison against every configured key to avoid
-        leaking which prefix matched via timing.
+        The key is HMAC'd with a per-process secret and looked up in a single
+        dict probe, so cost is O(1) in the number of configured keys. Because
+        the digest is unpredictable without the secret, lookup timing cannot
+        leak which prefix of a real key was guessed.
         """
         if not api_key:
             return None
 
-        matched: Tenant | None = None
-        for known_key, tenant in self._tenants.items():
-            if secrets.compare_digest(api_key, known_key):
-                matched = tenant
+        digest = self._digest(api_key)
+        matched = self._tenants.get(digest)
         if matched is not None:
             return matched
 
-        if self._settings.auth_dev_mode:
-            for dev_key in _DEV_KEYS:
-                if secrets.compare_digest(api_key, dev_key):
-                    return Tenant(
-                        tenant_id=_DEV_TENANT_ID,
-                        name="Local Dev",
-                        rate_limit_per_minute=self._settings.default_rate_limit_per_minute,
-                        collection_prefix="",  # no namespacing in dev
-                        namespace_separator=self._settings.tenant_namespace_separator,
-                        is_dev=True,
-                    )
+        if self._settings.auth_dev_mode and digest in self._dev_digests:
+            return Tenant(
+                tenant_id=_DEV_TENANT_ID,
+                name="Local Dev",
+                rate_limit_per_minute=self._settings.default_rate_limit_per_minute,
+                collection_prefix="",  # no namespacing in dev
+                namespace_separator=self._settings.tenant_namespace_separator,
+                max_concurrent_requests=self._settings.default_max_concurrent_requests,
+                request_timeout_seconds=self._settings.default_request_timeout_seconds,
+                upload_timeout_seconds=self._settings.default_upload_timeout_seconds,
+                max_upload_bytes=self._settings.default_max_upload_bytes,
+                max_resumable_upload_bytes=self._settings.resumable_upload_max_bytes,
+                is_dev=True,
+            )
         return None
 
 
+class KeyFileWatcher:
+    """Reload an :class:`AuthManager` when its key file changes or on SIGHUP.
+
+    Polls the file's mtime/size every ``interval`` seconds. The reload itself
+    runs via ``asyncio.to_thread`` so JSON parsing and HMAC'ing a large key
+    file never blocks the event loop.
+    """
+
+    def __init__(self, manager: AuthManager, path: str, interval: float) -> None:
+        self._manager = manager
+        self._path = path
+        self._interval = interval
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._signature = self._stat()
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def request_reload(self) -> None:
+        """Force a reload on the next loop iteration (SIGHUP handler)."""
+        self._wake.set()
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self.request_reload)
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            # No SIGHUP on Windows, or not running in the main thread.
+            logger.debug("SIGHUP key reload unavailable on this platform")
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            pass
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            forced = False
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+                forced = True
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            signature = self._stat()
+            if forced or (signature is not None and signature != self._signature):
+                self._signature = signature
+                await asyncio.to_thread(self._manager.reload)
+
+
 # --- Module-level singletons (rebuildable for tests) ------------------------
 _auth_manager: AuthManager | None = None
-_rate_limiter = SlidingWindowRateLimiter()
+_rate_limiter: RateLimiter | None = None
+_cost_model: CostModel | None = None
+_key_watcher: KeyFileWatcher | None = None
+_maintenance_task: asyncio.Task | None = None
 
 
 def get_auth_manager() -> AuthManager:
@@ -185,18 +317,151 @@ def get_auth_manager() -> AuthManager:
     return _auth_manager
 
 
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = build_rate_limiter(get_settings())
+    return _rate_limiter
+
+
+def get_cost_model() -> CostModel:
+    global _cost_model
+    if _cost_model is None:
+        _cost_model = CostModel.from_settings(get_settings())
+    return _cost_model
+
+
+async def start_key_reloader() -> None:
+    """Start watching ``WEB_UI_API_KEYS_FILE`` (no-op if unset or disabled)."""
+    global _key_watcher
+    manager = get_auth_manager()
+    settings = manager.settings
+    if not settings.api_keys_file or settings.api_keys_reload_interval_seconds <= 0:
+        return
+    _key_watcher = KeyFileWatcher(
+        manager, settings.api_keys_file, settings.api_keys_reload_interval_seconds
+    )
+    _key_watcher.start()
+
+
+async def stop_key_reloader() -> None:
+    global _key_watcher
+    if _key_watcher is not None:
+        await _key_watcher.stop()
+        _key_watcher = None
+
+
+async def _maintain_rate_limiter(limiter: RateLimiter) -> None:
+    while True:
+        await asyncio.sleep(limiter.maintenance_interval)
+        try:
+            await limiter.maintain()
+        except Exception as exc:
+            logger.warning("Rate limiter maintenance failed: %s", exc)
+
+
+def start_rate_limit_maintenance() -> None:
+    """Run the rate limiter's periodic housekeeping (eviction / lease returns)."""
+    global _maintenance_task
+    limiter = get_rate_limiter()
+    if limiter.maintenance_interval <= 0 or _maintenance_task is not None:
+        return
+    _maintenance_task = asyncio.get_running_loop().create_task(
+        _maintain_rate_limiter(limiter)
+    )
+
+
+async def stop_rate_limit_maintenance() -> None:
+    global _maintenance_task
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+        try:
+            await _maintenance_task
+        except asyncio.CancelledError:
+            pass
+        _maintenance_task = None
+
+
 def configure(settings: Settings) -> None:
     """Rebuild auth state from explicit settings (used by tests)."""
-    global _auth_manager
+    global _auth_manager, _rate_limiter, _cost_model
     _auth_manager = AuthManager(settings)
-    _rate_limiter.reset()
+    _rate_limiter = build_rate_limiter(settings)
+    _cost_model = CostModel.from_settings(settings)
+
+
+async def charge(tenant: Tenant, cost: int) -> None:
+    """Charge ``cost`` extra units to ``tenant``'s budget (429 if over).
+
+    For handlers whose true cost is only known after the body is parsed,
+    e.g. the per-item cost of a chat batch.
+    """
+    if cost > 0 and get_auth_manager().settings.rate_limit_enabled:
+        await get_rate_limiter().acquire(
+            tenant.tenant_id, tenant.rate_limit_per_minute, cost
+        )
+
+
+def _content_length(request: Request) -> int | None:
+    try:
+        return int(request.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+async def charge_unmetered_body(request: Request, tenant: Tenant, size: int) -> None:
+    """Charge ``size`` received body bytes that ``require_tenant`` could not price.
+
+    ``require_tenant`` prices uploads by their declared ``Content-Length``; a
+    chunked body declares none and would otherwise pay only the route weight.
+    Call once the body has been read (429 if it does not fit the budget).
+    """
+    if _content_length(request) is None:
+        await charge(tenant, get_cost_model().size_cost(request.url.path, size))
+
+
+async def charge_batch(tenant: Tenant, cost: int, request: Request | None = None) -> None:
+    """Charge a whole batch (priced by the handler) in one go.
+
+    With ``request``, its declared upload size is priced on top of ``cost``,
+    as :func:`require_tenant` would price it.
+
+    A batch that costs more than the tenant's whole per-minute budget could
+    never be admitted. It raises :class:`BatchOverBudgetError` (413) instead
+    of a 429, which retrying could not clear. Use this with
+    :func:`authenticate`, which charges nothing itself.
+    """
+    if request is not None:
+        cost += get_cost_model().size_cost(request.url.path, _content_length(request))
+    if cost <= 0 or not get_auth_manager().settings.rate_limit_enabled:
+        return
+    limit = tenant.rate_limit_per_minute
+    if 0 < limit < cost:
+        raise BatchOverBudgetError(cost, limit)
+    await get_rate_limiter().acquire(tenant.tenant_id, limit, cost)
+
+
+async def authenticate(x_api_key: str = Header(..., alias="X-API-Key")) -> Tenant:
+    """FastAPI dependency: resolve the caller's tenant without charging it.
+
+    For batch endpoints, which only know their cost once the body is parsed
+    and then charge it with :func:`charge_batch`.
+    """
+    tenant = get_auth_manager().resolve(x_api_key)
+    if tenant is None:
+        raise AuthError()
+    return tenant
 
 
 async def require_tenant(
+    request: Request,
     x_api_key: str = Header(..., alias="X-API-Key"),
 ) -> Tenant:
     """FastAPI dependency: authenticate the caller and enforce rate limits.
 
+    The request is charged its :class:`CostModel` price (route weight plus
+    declared upload size) against the tenant's per-minute unit budget.
+
     Returns the resolved :class:`Tenant`, which downstream handlers use to
     namespace collections and isolate conversation state.
     """
@@ -206,6 +471,9 @@ async def require_tenant(
         raise AuthError()
 
     if manager.settings.rate_limit_enabled:
-        _rate_limiter.check(tenant.tenant_id, tenant.rate_limit_per_minute)
+        cost = get_cost_model().cost(request.url.path, _content_length(request))
+        await get_rate_limiter().acquire(
+            tenant.tenant_id, tenant.rate_limit_per_minute, cost
+        )
 
     return tenant
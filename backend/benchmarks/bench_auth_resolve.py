@@ -0,0 +1,42 @@
+"""Benchmark: AuthManager.resolve latency as the number of API keys grows.
+
+Run from the backend directory::
+
+    python benchmarks/bench_auth_resolve.py
+
+Resolve time should stay flat from 10 to 100k keys, since lookup is a single
+HMAC + dict probe rather than a scan over every configured key.
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from auth import AuthManager  # noqa: E402
+from config import Settings  # noqa: E402
+
+KEY_COUNTS = (10, 100, 1_000, 10_000, 100_000)
+LOOKUPS = 20_000
+
+
+def _manager(n_keys: int) -> AuthManager:
+    keys = {f"sk-tenant-{i:06d}-{'x' * 24}": {"tenant_id": f"t{i}"} for i in range(n_keys)}
+    return AuthManager(Settings(api_keys=json.dumps(keys), api_keys_file=None))
+
+
+def main() -> None:
+    print(f"{'keys':>8}  {'hit us/op':>10}  {'miss us/op':>10}")
+    for n in KEY_COUNTS:
+        mgr = _manager(n)
+        hit = f"sk-tenant-{n // 2:06d}-{'x' * 24}"
+        miss = "sk-unknown-key-" + "y" * 24
+        hit_s = timeit.timeit(lambda: mgr.resolve(hit), number=LOOKUPS)
+        miss_s = timeit.timeit(lambda: mgr.resolve(miss), number=LOOKUPS)
+        print(f"{n:>8}  {hit_s / LOOKUPS * 1e6:>10.2f}  {miss_s / LOOKUPS * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
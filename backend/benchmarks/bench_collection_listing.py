@@ -0,0 +1,81 @@
+"""Benchmark: one tenant's collection page, filtered scan vs. prefix index.
+
+Run from the backend directory::
+
+    python benchmarks/bench_collection_listing.py
+
+Builds gateway listings of ``COLLECTIONS_PER_TENANT`` collections for each
+of 100, 1,000 and 10,000 tenants and times one tenant's listing two ways:
+
+* ``scan`` - ``tenant.owns`` over every gateway collection, as
+  ``list_collections`` used to do on each request;
+* ``index`` - ``CollectionIndex.page`` with the tenant's prefix (binary
+  search, then read the page).
+
+Also times refreshing the index from a new gateway listing (``sync``) with
+no names changed and with a tenant's worth renamed, against building a new
+index from scratch.
+"""
+
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collection_index import CollectionIndex  # noqa: E402
+from tenancy import Tenant  # noqa: E402
+
+COLLECTIONS_PER_TENANT = 5
+RUNS = 200
+
+
+def _listing(tenants: int) -> list:
+    return [
+        SimpleNamespace(collection_name=f"tenant{t:05d}__docs{c}", vector_count=c)
+        for t in range(tenants)
+        for c in range(COLLECTIONS_PER_TENANT)
+    ]
+
+
+def main() -> None:
+    print(f"{'tenants':>8}  {'path':<8}  {'us/op':>10}  {'speedup':>7}")
+    for tenants in (100, 1_000, 10_000):
+        listing = _listing(tenants)
+        index = CollectionIndex(listing)
+        tenant = Tenant(
+            tenant_id="t", name="T", rate_limit_per_minute=60,
+            collection_prefix=f"tenant{tenants // 2:05d}",
+        )
+
+        paths = {
+            "scan": lambda: [c for c in listing if tenant.owns(c.collection_name)],
+            "index": lambda: index.page(tenant.gateway_prefix, limit=50)[0],
+        }
+        assert paths["scan"]() == paths["index"]()
+        baseline = None
+        for name, fn in paths.items():
+            seconds = timeit.timeit(fn, number=RUNS) / RUNS
+            baseline = baseline or seconds
+            print(f"{tenants:>8}  {name:<8}  {seconds * 1e6:>10.1f}  {baseline / seconds:>6.1f}x")
+
+        # Gateways list in their own order, not ours.
+        refreshed = sorted(listing, key=lambda c: c.collection_name[::-1])
+        renamed = (
+            refreshed[COLLECTIONS_PER_TENANT:]
+            + _listing(tenants + 1)[-COLLECTIONS_PER_TENANT:]
+        )
+        rebuild = timeit.timeit(lambda: CollectionIndex(refreshed), number=10) / 10
+        same = timeit.timeit(lambda: index.sync(refreshed), number=10) / 10
+        churn = timeit.timeit(
+            lambda: (index.sync(renamed), index.sync(refreshed)), number=5
+        ) / 10
+        print(
+            f"{'':>8}  refresh: rebuild {rebuild * 1e3:.2f} ms, sync {same * 1e3:.2f} ms, "
+            f"sync with {2 * COLLECTIONS_PER_TENANT} names changed {churn * 1e3:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark: per-request API Gateway clients vs. the shared pooled client.
+
+Run from the backend directory::
+
+    python benchmarks/bench_gateway_client.py
+
+Starts a local stub gateway (HTTP/1.1, keep-alive, a small JSON collection
+list after ``GATEWAY_LATENCY`` of simulated work) and issues the same calls
+two ways:
+
+* ``per-request`` - a new ``httpx.AsyncClient`` per call, as
+  ``async with APIGatewayClient()`` in each handler used to do;
+* ``shared`` - one ``gateway.SharedGatewayClient`` for the whole run.
+
+Each way is timed sequentially and with ``CONCURRENCY`` calls in flight,
+and the TCP connections the stub accepted are counted. Most of the
+per-request cost is building the client itself (httpx loads a TLS context
+even for plain HTTP URLs); the stub is on loopback without TLS, so the
+handshakes a remote gateway adds would only widen the gap.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx  # noqa: E402
+
+from gateway import SharedGatewayClient  # noqa: E402
+
+CALLS = 1_000
+CONCURRENCY = 16
+GATEWAY_LATENCY = 0.001
+BODY = json.dumps(
+    [{"collection_name": f"tenant__c{i}", "vector_count": i} for i in range(20)]
+).encode()
+
+
+class StubGateway:
+    def __init__(self) -> None:
+        self.connections = 0
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+
+    def close(self) -> None:
+        self._server.close()
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                await asyncio.sleep(GATEWAY_LATENCY)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(BODY)}\r\n\r\n".encode()
+                    + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class GatewayClient:
+    """Shaped like APIGatewayClient: owns an httpx client for its base URL."""
+
+    def __init__(self, url: str) -> None:
+        self._client = httpx.AsyncClient(base_url=url)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._client.aclose()
+
+    async def list_collections(self):
+        response = await self._client.get("/api/collections")
+        response.raise_for_status()
+        return response.json()
+
+
+async def _timed(call, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    remaining = iter(range(CALLS))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def _run(label: str, concurrency: int, url: str, server: StubGateway) -> None:
+    async def per_request():
+        async with GatewayClient(url) as client:
+            return await client.list_collections()
+
+    shared = SharedGatewayClient(
+        lambda: GatewayClient(url),
+        max_connections=CONCURRENCY,
+        max_keepalive_connections=CONCURRENCY,
+    )
+    pooled = await shared.open()
+
+    for name, call in (("per-request", per_request), ("shared", pooled.list_collections)):
+        before = server.connections
+        started = time.perf_counter()
+        latencies = sorted(await _timed(call, concurrency))
+        elapsed = time.perf_counter() - started
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{label:<12}  {name:<12}  {CALLS / elapsed:>8.0f}  "
+            f"{sum(latencies) / len(latencies) * 1e3:>8.2f}  {p99 * 1e3:>8.2f}  "
+            f"{server.connections - before:>6}"
+        )
+    stats = shared.stats()
+    await shared.close()
+    print(f"{'':<12}  pool: peak_in_flight={stats['peak_in_flight']} "
+          f"connections_open={stats['connections_open']}")
+
+
+async def main() -> None:
+    server = StubGateway()
+    url = await server.start()
+    print(f"{'load':<12}  {'client':<12}  {'req/s':>8}  {'mean ms':>8}  {'p99 ms':>8}  {'conns':>6}")
+    await _run("sequential", 1, url, server)
+    await _run(f"{CONCURRENCY} parallel", CONCURRENCY, url, server)
+    server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
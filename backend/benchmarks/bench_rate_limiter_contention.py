@@ -0,0 +1,79 @@
+"""Benchmark: rate limiter lock contention, single lock vs. sharded.
+
+Run from the backend directory::
+
+    python benchmarks/bench_rate_limiter_contention.py
+
+Several threads hammer ``check()`` across many tenants while an eviction
+sweep runs; per-call latency percentiles show how often callers queue behind
+another tenant's lock.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ratelimit import RateLimitError, SlidingWindowRateLimiter  # noqa: E402
+
+THREADS = 8
+CHECKS_PER_THREAD = 50_000
+TENANTS = 10_000
+
+
+def _worker(limiter, offset, latencies):
+    local = []
+    for i in range(CHECKS_PER_THREAD):
+        tenant_id = f"tenant-{(i * 7919 + offset) % TENANTS}"
+        started = time.perf_counter()
+        try:
+            limiter.check(tenant_id, 1_000)
+        except RateLimitError:
+            pass
+        local.append(time.perf_counter() - started)
+    latencies.extend(local)
+
+
+def _run(shards: int) -> None:
+    limiter = SlidingWindowRateLimiter(shards=shards)
+    latencies: list[float] = []
+    stop = threading.Event()
+
+    def sweeper():
+        while not stop.is_set():
+            limiter.evict_idle()
+
+    threads = [
+        threading.Thread(target=_worker, args=(limiter, n, latencies))
+        for n in range(THREADS)
+    ]
+    sweep = threading.Thread(target=sweeper)
+    started = time.perf_counter()
+    sweep.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stop.set()
+    sweep.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    total = THREADS * CHECKS_PER_THREAD
+    print(
+        f"shards={shards:>3}  {total / elapsed:>9.0f} checks/s  "
+        f"p50={p50:6.1f} us  p99={p99:7.1f} us"
+    )
+
+
+def main() -> None:
+    for shards in (1, 64):
+        _run(shards)
+
+
+if __name__ == "__main__":
+    main()
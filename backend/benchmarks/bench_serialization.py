@@ -0,0 +1,104 @@
+"""Benchmark: response serialization for chat answers and collection lists.
+
+Run from the backend directory (the AI Agent checkout must be importable,
+as for the app itself)::
+
+    python benchmarks/bench_serialization.py
+
+Compares, per response:
+
+* ``encoder+json`` - FastAPI's classic path: ``jsonable_encoder`` then
+  stdlib ``json`` (what FastAPI releases before the pydantic-core fast path
+  do for every ``response_model`` route);
+* ``validate+dump`` - newer FastAPI: re-validate against ``response_model``,
+  then dump with pydantic-core;
+* ``direct`` - ``serialization.dump_json``, used by the routes now.
+
+Every path must produce the same JSON document; the script checks that
+before timing.
+"""
+
+import json
+import os
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from api.chat import ChatResponse, SearchResult  # noqa: E402
+from api.collections import Collection  # noqa: E402
+from serialization import dump_json  # noqa: E402
+
+RUNS = 5_000
+
+
+def _chat_response(citations: int) -> ChatResponse:
+    return ChatResponse(
+        response="Our refund policy allows returns within 30 days. " * 8,
+        citations=[
+            SearchResult(
+                id=f"doc-{i}",
+                title=f"Refund policy, section {i}",
+                content="Customers may request a refund within thirty days … " * 4,
+                score=0.91 - i * 0.01,
+                metadata={"collection": "policies", "source": "policy.pdf", "chunk_id": f"c{i}"},
+            )
+            for i in range(citations)
+        ],
+        conversationId="conv_0123456789abcdef",
+        queryComplexity="simple",
+    )
+
+
+def _collections(n: int) -> List[Collection]:
+    return [
+        Collection(
+            name=f"collection-{i:04d}",
+            documentCount=i * 7,
+            createdAt="2025-01-01T00:00:00Z",
+            description=None if i % 3 else f"Collection number {i}",
+        )
+        for i in range(n)
+    ]
+
+
+def _paths(content, response_type):
+    adapter = TypeAdapter(response_type)
+    render = JSONResponse(None).render
+    return {
+        "encoder+json": lambda: render(jsonable_encoder(content)),
+        "validate+dump": lambda: adapter.dump_json(adapter.validate_python(content)),
+        "direct": lambda: dump_json(content),
+    }
+
+
+def main() -> None:
+    cases = [
+        ("chat, 5 citations", _chat_response(5), ChatResponse),
+        ("chat, 20 citations", _chat_response(20), ChatResponse),
+        ("collections, 100", _collections(100), List[Collection]),
+        ("collections, 1000", _collections(1000), List[Collection]),
+    ]
+    print(f"{'response':<20}  {'path':<14}  {'us/op':>9}  {'speedup':>7}")
+    for label, content, response_type in cases:
+        paths = _paths(content, response_type)
+        outputs = {name: fn() for name, fn in paths.items()}
+        documents = {name: json.loads(out) for name, out in outputs.items()}
+        assert all(doc == documents["encoder+json"] for doc in documents.values()), label
+        assert outputs["direct"] == outputs["validate+dump"], label
+
+        runs = RUNS if label.startswith("chat") else RUNS // 10
+        baseline = None
+        for name, fn in paths.items():
+            seconds = timeit.timeit(fn, number=runs) / runs
+            baseline = baseline or seconds
+            print(f"{label:<20}  {name:<14}  {seconds * 1e6:>9.1f}  {baseline / seconds:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
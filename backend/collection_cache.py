@@ -0,0 +1,221 @@
+"""Shared cache of the gateway's collection list with stale-while-revalidate.
+
+The widget lists collections every time it opens or switches tabs, and the
+gateway can only return its *global* collection list. Each worker keeps one
+copy of that list, as a :class:`~collection_index.CollectionIndex`, for all
+tenants; a tenant's page is read straight out of the index. The copy is:
+
+* younger than ``ttl`` - served as is;
+* older, but within ``stale_ttl`` more - served as is while one background
+  refresh fetches a new list, so the gateway round trip stays off the
+  request path;
+* older still, or missing - fetched on the request path (concurrent misses
+  share one fetch).
+
+Writes made through this worker keep it current: creating or deleting a
+collection updates the index in place, and an upload adds its chunks to the
+collection's ``vector_count``. When that is not possible (the upload created
+the collection, or a fetch is in flight) the list is marked stale instead, so
+it is still served while one refresh runs. Other workers catch up within
+``ttl``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from collection_index import CollectionIndex
+from config import Settings, get_settings
+from singleflight import SingleFlight
+from tenancy import Tenant
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[], Awaitable[list]]
+
+
+class CollectionListCache:
+    """Short-TTL, process-wide index of the gateway's collections."""
+
+    def __init__(
+        self,
+        ttl: float = 10.0,
+        stale_ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._clock = clock
+        self._index = CollectionIndex()
+        # None until the first fetch.
+        self._fetched_at: Optional[float] = None
+        self._fetches = SingleFlight()
+        self._refreshing: Optional[asyncio.Task] = None
+        # While a fetch is in flight, writes are recorded here and replayed
+        # on its result, which may predate them.
+        self._loading = False
+        self._replay: list[tuple[str, Any]] = []
+        self._expired_while_loading = False
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._refresh_errors = 0
+        self._refresh_changes = 0
+        self._invalidations = 0
+        self._count_updates = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "CollectionListCache":
+        return cls(
+            ttl=settings.collections_cache_ttl_seconds,
+            stale_ttl=settings.collections_cache_stale_seconds,
+        )
+
+    async def page(
+        self,
+        tenant: Tenant,
+        fetch: Fetch,
+        after: str = "",
+        limit: Optional[int] = None,
+    ) -> tuple[list, bool]:
+        """Return ``(records, more)``: ``tenant``'s gateway collections by name.
+
+        See :meth:`CollectionIndex.page` for ``after`` and ``limit``.
+        ``fetch`` is called only when the cached list is missing or old.
+        """
+        index = await self._current(fetch)
+        return index.page(tenant.gateway_prefix, after, limit)
+
+    async def _current(self, fetch: Fetch) -> CollectionIndex:
+        if self._fetched_at is not None:
+            age = self._clock() - self._fetched_at
+            if age < self._ttl:
+                self._hits += 1
+                return self._index
+            if age < self._ttl + self._stale_ttl:
+                self._stale_hits += 1
+                self._refresh_in_background(fetch)
+                return self._index
+        self._misses += 1
+        await self._fetches.do("collections", lambda: self._load(fetch))
+        return self._index
+
+    async def _load(self, fetch: Fetch) -> None:
+        self._loading = True
+        self._replay = []
+        self._expired_while_loading = False
+        try:
+            records = await fetch()
+        finally:
+            self._loading = False
+        self._refresh_changes += self._index.sync(records)
+        for op, arg in self._replay:
+            self._apply(op, arg)
+        self._replay = []
+        self._fetched_at = self._clock()
+        if self._expired_while_loading:
+            self._fetched_at -= self._ttl
+
+    def _refresh_in_background(self, fetch: Fetch) -> None:
+        if self._refreshing is not None:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._fetches.do("collections", lambda: self._load(fetch))
+            except Exception as exc:
+                # Keep serving the stale list; once it ages out, requests
+                # fetch on their own and surface the error.
+                self._refresh_errors += 1
+                logger.warning("Background refresh of collections failed: %s", exc)
+            finally:
+                self._refreshing = None
+
+        self._refreshing = asyncio.create_task(refresh())
+
+    def _apply(self, op: str, arg: Any) -> None:
+        if op == "upsert":
+            self._index.upsert(arg)
+        else:
+            self._index.remove(arg)
+
+    def _write(self, op: str, arg: Any) -> None:
+        if self._loading:
+            self._replay.append((op, arg))
+        self._apply(op, arg)
+
+    def upsert(self, record: Any) -> None:
+        """Add or replace a gateway collection record (write-through for creates)."""
+        self._write("upsert", record)
+
+    def remove(self, collection: str) -> None:
+        """Drop gateway ``collection`` (write-through for deletes)."""
+        self._write("remove", collection)
+
+    def add_vectors(self, collection: str, count: int) -> None:
+        """Add ``count`` to gateway ``collection``'s ``vector_count`` (write-through for uploads).
+
+        Falls back to :meth:`invalidate` when the collection is not indexed
+        yet or a fetch in flight may or may not include the new vectors.
+        """
+        record = self._index.get(collection)
+        if record is None or self._loading:
+            self.invalidate()
+            return
+        updated = copy.copy(record)
+        try:
+            updated.vector_count = (record.vector_count or 0) + count
+        except (AttributeError, TypeError, ValueError):
+            # Immutable record type: let a refresh bring the new count.
+            self.invalidate()
+            return
+        self._index.upsert(updated)
+        self._count_updates += 1
+
+    def invalidate(self) -> None:
+        """Mark the list stale, e.g. after a change this worker cannot apply.
+
+        The list is aged to just past ``ttl``: the next listing is still
+        served from it while one background refresh fetches a new copy, so
+        no request waits on the gateway.
+        """
+        if self._loading:
+            self._expired_while_loading = True
+        if self._fetched_at is not None:
+            self._fetched_at = min(self._fetched_at, self._clock() - self._ttl)
+        self._invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._stale_hits + self._misses
+        return {
+            "collections": len(self._index),
+            "ttl_seconds": self._ttl,
+            "stale_seconds": self._stale_ttl,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "hit_rate": round((self._hits + self._stale_hits) / lookups, 4) if lookups else None,
+            "refreshing": self._refreshing is not None,
+            "refresh_errors": self._refresh_errors,
+            "refresh_changes": self._refresh_changes,
+            "invalidations": self._invalidations,
+            "count_updates": self._count_updates,
+        }
+
+
+_cache: Optional[CollectionListCache] = None
+
+
+def get_collection_cache() -> Optional[CollectionListCache]:
+    """Return the process-wide cache, or None when it is disabled (TTL 0)."""
+    global _cache
+    settings = get_settings()
+    if settings.collections_cache_ttl_seconds <= 0:
+        return None
+    if _cache is None:
+        _cache = CollectionListCache.from_settings(settings)
+    return _cache
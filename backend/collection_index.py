@@ -0,0 +1,112 @@
+"""Sorted, prefix-indexed view of the API Gateway's collections.
+
+The gateway only lists *every* collection, for every tenant. Filtering that
+list with ``tenant.owns`` on each request makes one tenant's listing cost as
+much as everyone's. :class:`CollectionIndex` keeps the gateway's collections
+sorted by name, so all collections of a tenant (whose gateway names share
+``Tenant.gateway_prefix``) form one contiguous run: a page of them is found
+with a binary search and read in O(log n + page).
+
+Refreshing from a new gateway listing only inserts and removes the names
+that changed; creates and deletes made through this worker are applied one
+name at a time.
+
+Pages are linked by opaque cursors (:func:`encode_cursor`) that carry the
+last name returned, without the tenant prefix.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Iterable, Optional
+
+# Past this many changed names in one refresh, re-sorting the whole list is
+# cheaper than inserting / removing them one by one.
+_REBUILD_THRESHOLD = 64
+
+
+class CollectionIndex:
+    """Gateway collection records (anything with ``collection_name``), by name."""
+
+    def __init__(self, records: Iterable[Any] = ()) -> None:
+        self._records: dict[str, Any] = {r.collection_name: r for r in records}
+        self._names: list[str] = sorted(self._records)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def sync(self, records: Iterable[Any]) -> int:
+        """Make the index match a full gateway listing; return names changed."""
+        fresh = {r.collection_name: r for r in records}
+        changed = 0
+        # Usually only counts changed; then the sorted names stand as they are.
+        if fresh.keys() != self._records.keys():
+            added = fresh.keys() - self._records.keys()
+            removed = self._records.keys() - fresh.keys()
+            changed = len(added) + len(removed)
+            if changed > _REBUILD_THRESHOLD:
+                self._names = sorted(fresh)
+            else:
+                for name in removed:
+                    del self._names[bisect_left(self._names, name)]
+                for name in added:
+                    insort(self._names, name)
+        self._records = fresh
+        return changed
+
+    def upsert(self, record: Any) -> None:
+        """Add a collection, or replace the record of an existing one."""
+        name = record.collection_name
+        if name not in self._records:
+            insort(self._names, name)
+        self._records[name] = record
+
+    def get(self, name: str) -> Optional[Any]:
+        """The record of collection ``name``, or None if it is not indexed."""
+        return self._records.get(name)
+
+    def remove(self, name: str) -> bool:
+        """Drop a collection; return False if it was not indexed."""
+        if self._records.pop(name, None) is None:
+            return False
+        del self._names[bisect_left(self._names, name)]
+        return True
+
+    def page(
+        self, prefix: str, after: str = "", limit: Optional[int] = None
+    ) -> tuple[list, bool]:
+        """Return ``(records, more)`` for names starting with ``prefix``.
+
+        Records come in name order, starting after ``prefix + after`` when
+        ``after`` is given; ``more`` is True if further records match.
+        ``limit`` None returns every match.
+        """
+        names = self._names
+        if after:
+            start = bisect_right(names, prefix + after)
+        else:
+            start = bisect_left(names, prefix)
+        records: list = []
+        for i in range(start, len(names)):
+            if not names[i].startswith(prefix):
+                break
+            if limit is not None and len(records) == limit:
+                return records, True
+            records.append(self._records[names[i]])
+        return records, False
+
+
+def encode_cursor(name: str) -> str:
+    """Opaque cursor for the page after the collection displayed as ``name``."""
+    return base64.urlsafe_b64encode(name.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Inverse of :func:`encode_cursor`; ValueError if ``cursor`` is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b"-_", validate=True).decode()
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
@@ -0,0 +1,156 @@
+"""Per-tenant caps on in-flight agent work.
+
+The rate limiter bounds how many requests a tenant may *start* per minute,
+but not how many slow ``agent.search`` / ``ingest_document`` calls it may have
+running at once. :class:`TenantConcurrencyLimiter` caps that number per
+tenant. Callers beyond the cap wait in a bounded per-tenant queue; when the
+queue is full, or a caller's wait exceeds the deadline, it gets a fast 503
+with ``Retry-After`` instead of joining an ever-growing latency tail.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+from config import Settings, get_settings
+from tenancy import Tenant
+
+
+class OverloadedError(HTTPException):
+    """503 raised when a tenant has too much work in flight."""
+
+    def __init__(self, retry_after: int = 1) -> None:
+        super().__init__(
+            status_code=503,
+            detail="Too many requests in progress for this API key. Please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class _Slots:
+    """In-flight bookkeeping for one tenant."""
+
+    __slots__ = ("limit", "active", "waiters")
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self.waiters: list[asyncio.Future] = []
+
+
+class TenantConcurrencyLimiter:
+    """Bounded, deadline-aware concurrency cap per tenant.
+
+    Slots are handed directly from a finishing request to the oldest waiter,
+    so waiting requests are served FIFO and cannot be overtaken by new
+    arrivals. Tenants with nothing active or queued are dropped immediately,
+    so memory tracks only busy tenants.
+    """
+
+    def __init__(self, queue_size: int = 16, queue_timeout: float = 15.0) -> None:
+        self._queue_size = queue_size
+        self._queue_timeout = queue_timeout
+        self._tenants: dict[str, _Slots] = {}
+        self._rejected = 0
+        self._timed_out = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "TenantConcurrencyLimiter":
+        return cls(
+            queue_size=settings.concurrency_queue_size,
+            queue_timeout=settings.concurrency_queue_timeout_seconds,
+        )
+
+    @asynccontextmanager
+    async def slot(self, tenant: Tenant) -> AsyncIterator[None]:
+        """Hold one of ``tenant``'s in-flight slots for the duration of the block."""
+        limit = tenant.max_concurrent_requests
+        if limit <= 0:
+            yield  # 0 / negative means "unlimited"
+            return
+        await self._acquire(tenant.tenant_id, limit)
+        try:
+            yield
+        finally:
+            self._release(tenant.tenant_id)
+
+    async def _acquire(self, tenant_id: str, limit: int) -> None:
+        slots = self._tenants.get(tenant_id)
+        if slots is None:
+            slots = self._tenants[tenant_id] = _Slots(limit)
+        slots.limit = limit  # pick up changes from a key-file reload
+        if slots.active < slots.limit and not slots.waiters:
+            slots.active += 1
+            return
+        if len(slots.waiters) >= self._queue_size:
+            self._rejected += 1
+            raise OverloadedError(retry_after=self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        slots.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self._queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return  # handed a slot just as the deadline hit; keep it
+            waiter.cancel()
+            slots.waiters.remove(waiter)
+            self._timed_out += 1
+            self._discard_if_idle(tenant_id, slots)
+            raise OverloadedError(retry_after=self._retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(tenant_id)
+            else:
+                waiter.cancel()
+                slots.waiters.remove(waiter)
+                self._discard_if_idle(tenant_id, slots)
+            raise
+
+    def _release(self, tenant_id: str) -> None:
+        slots = self._tenants[tenant_id]
+        while slots.waiters and slots.active <= slots.limit:
+            waiter = slots.waiters.pop(0)
+            if not waiter.done():
+                # Transfer our slot to the waiter; ``active`` is unchanged.
+                waiter.set_result(None)
+                return
+        slots.active -= 1
+        self._discard_if_idle(tenant_id, slots)
+
+    def _discard_if_idle(self, tenant_id: str, slots: _Slots) -> None:
+        if slots.active == 0 and not slots.waiters:
+            self._tenants.pop(tenant_id, None)
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._queue_timeout / 2))
+
+    def stats(self) -> dict:
+        return {
+            "active": sum(s.active for s in self._tenants.values()),
+            "queued": sum(len(s.waiters) for s in self._tenants.values()),
+            "busy_tenants": len(self._tenants),
+            "rejected_queue_full": self._rejected,
+            "rejected_deadline": self._timed_out,
+        }
+
+
+_limiter: TenantConcurrencyLimiter | None = None
+
+
+def get_concurrency_limiter() -> TenantConcurrencyLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = TenantConcurrencyLimiter.from_settings(get_settings())
+    return _limiter
+
+
+def configure(settings: Settings) -> None:
+    """Rebuild the limiter from explicit settings (used by tests)."""
+    global _limiter
+    _limiter = TenantConcurrencyLimiter.from_settings(settings)
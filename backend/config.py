@@ -34,6 +34,9 @@ class Settings(BaseSettings):
     api_keys: str | None = None
     # Path to a JSON file with the same shape (takes precedence over api_keys).
     api_keys_file: str | None = None
+    # How often (seconds) to poll api_keys_file for changes and hot-reload it.
+    # SIGHUP also triggers a reload. 0 disables the watcher.
+    api_keys_reload_interval_seconds: float = 5.0
     # When true, the legacy permissive behavior is preserved: the well-known
     # demo keys are accepted and mapped to a non-namespaced "dev" tenant.
     # Secure-by-default: this is OFF unless explicitly enabled.
@@ -54,8 +57,144 @@ class Settings(BaseSettings):
 
     # --- Rate limiting ------------------------------------------------------
     rate_limit_enabled: bool = True
-    # Default requests-per-minute per tenant; individual tenants can override.
+    # Default budget per tenant, in cost units per minute (one unit per request
+    # unless route costs are configured); individual tenants can override.
     default_rate_limit_per_minute: int = 60
+    # JSON map of URL path prefix -> unit cost; longest prefix wins, others
+    # cost 1. Example: {"/api/chat": 5, "/api/upload": 10, "/api/validate": 1}
+    rate_limit_route_costs: dict[str, int] = {}
+    # When > 0, uploads also pay one unit per started N bytes of body size.
+    rate_limit_upload_bytes_per_unit: int = 0
+    # How often (seconds) idle tenants are evicted from the in-memory limiter.
+    rate_limit_eviction_interval_seconds: float = 60.0
+    # "memory" (per-process, default) or "redis" (shared across workers).
+    rate_limit_backend: str = "memory"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    # Tokens each worker reserves per round trip to the shared backend, and
+    # how long (seconds) it may hold unused ones before returning them.
+    rate_limit_lease_size: int = 5
+    rate_limit_lease_seconds: float = 5.0
+
+    # --- Concurrency --------------------------------------------------------
+    # Default cap on a tenant's concurrent chat agent calls; tenants can
+    # override with "max_concurrent_requests". 0 = unlimited. Ingestion is
+    # bounded by the queue's per-tenant cap instead (see below).
+    default_max_concurrent_requests: int = 8
+    # Requests beyond the cap wait in a per-tenant queue of this size, for at
+    # most this many seconds, before failing fast with 503 + Retry-After.
+    concurrency_queue_size: int = 16
+    concurrency_queue_timeout_seconds: float = 15.0
+
+    # --- Deadlines ----------------------------------------------------------
+    # Default seconds a chat / upload request may run before its agent work is
+    # cancelled (504); tenants can override with "request_timeout_seconds" /
+    # "upload_timeout_seconds". 0 = no deadline. Agent work is also cancelled
+    # when the client disconnects, checked every poll interval.
+    default_request_timeout_seconds: float = 120.0
+    default_upload_timeout_seconds: float = 600.0
+    disconnect_poll_interval_seconds: float = 0.25
+
+    # --- Uploads ------------------------------------------------------------
+    # Default upload size limit in bytes (tenants can override with
+    # "max_upload_bytes"; 0 = no limit). Uploads are copied to disk in chunks
+    # of this many bytes, which bounds their memory use.
+    default_max_upload_bytes: int = 10 * 1024 * 1024
+    upload_chunk_size_bytes: int = 1024 * 1024
+    # Background ingestion: worker tasks running jobs, jobs that may wait for
+    # a worker before uploads get 503, and seconds a finished job's status
+    # stays available at /api/upload/jobs/{id}.
+    ingestion_workers: int = 2
+    # Where ingestion runs, away from the event loop that serves chat:
+    # "thread" (default; keeps progress reporting), "process" (worker
+    # processes; a crash fails only that upload, progress jumps 0 -> 100), or
+    # "inline" (on the event loop with the agent pool below). Thread and
+    # process pools have ingestion_workers workers.
+    ingestion_executor: str = "thread"
+    ingestion_queue_size: int = 100
+    # Jobs one tenant may have queued or running at once, so a tenant
+    # uploading in bulk cannot fill the queue for everyone (429 beyond it;
+    # 0 = no per-tenant cap).
+    ingestion_queue_max_per_tenant: int = 20
+    ingestion_job_ttl_seconds: float = 3600.0
+    # Maximum files per POST /api/upload/batch (each within the size limit).
+    upload_batch_max_files: int = 20
+    # Skip re-ingesting a file whose content (SHA-256) is already in the
+    # collection and return the original documentId; ?force=true bypasses it.
+    # The index is in memory by default; a file path keeps it across restarts.
+    upload_dedup_enabled: bool = True
+    upload_dedup_index_path: str = ":memory:"
+    # Resumable uploads (/api/upload/sessions) for files too large to send in
+    # one request: staging directory (default: <tmp>/intramind-uploads),
+    # largest file (tenants can override with "max_resumable_upload_bytes"),
+    # largest chunk per request, and idle seconds before an abandoned
+    # session's staged data is deleted. Per tenant: open sessions, and bytes
+    # declared across them. 0 = no limit / no expiry.
+    resumable_upload_dir: str = ""
+    resumable_upload_max_bytes: int = 512 * 1024 * 1024
+    resumable_chunk_max_bytes: int = 8 * 1024 * 1024
+    resumable_session_ttl_seconds: float = 86400.0
+    resumable_max_sessions_per_tenant: int = 10
+    resumable_max_staged_bytes_per_tenant: int = 2 * 1024 * 1024 * 1024
+    # Seconds between sweeps that delete abandoned sessions' staged data
+    # (0 = only at startup and when a session is created).
+    resumable_purge_interval_seconds: float = 3600.0
+
+    # --- API Gateway client -------------------------------------------------
+    # Each worker shares one pooled connection to the API Gateway: maximum
+    # open connections, idle connections kept alive (and for how long), and
+    # HTTP/2 (needs the optional `h2` package). 0 = no limit.
+    gateway_max_connections: int = 20
+    gateway_max_keepalive_connections: int = 20
+    gateway_keepalive_expiry_seconds: float = 30.0
+    gateway_http2: bool = False
+
+    # --- Collections cache --------------------------------------------------
+    # Seconds the gateway's collection list (indexed by tenant prefix) is
+    # served from memory, and how much longer a stale list may still be served
+    # while it is refreshed in the background. A TTL of 0 disables the cache.
+    collections_cache_ttl_seconds: float = 10.0
+    collections_cache_stale_seconds: float = 60.0
+
+    # --- Conversations ------------------------------------------------------
+    # Bounds on the in-memory conversation store: total entries (LRU eviction),
+    # idle seconds before a conversation expires, and an optional per-tenant
+    # quota (0 = no quota).
+    conversation_max_entries: int = 1000
+    conversation_idle_ttl_seconds: float = 3600.0
+    conversation_max_per_tenant: int = 0
+    # Seconds between sweeps that drop expired conversations (0 = only when
+    # a lookup or eviction reaches them).
+    conversation_purge_interval_seconds: float = 60.0
+    # Where conversation history lives so any worker can resume any
+    # conversation: "memory" (this process only, default) or "sqlite" (a file
+    # shared by all workers on the host). Only the last N turns are kept.
+    # Another worker hands them to the agent as search(conversation_history=);
+    # an agent without that keyword resumes from empty memory.
+    conversation_backend: str = "memory"
+    conversation_sqlite_path: str = "conversations.db"
+    conversation_history_max_turns: int = 20
+
+    # --- Chat answer cache --------------------------------------------------
+    # Opt-in cache of answers to the first question of a conversation (no
+    # conversationId, or one with no turns yet), keyed on tenant, collection
+    # and normalized query. Entries are invalidated when the collection is
+    # uploaded to or deleted.
+    chat_cache_enabled: bool = False
+    chat_cache_max_entries: int = 1000
+    chat_cache_ttl_seconds: float = 300.0
+    # Let identical concurrent questions from one tenant that start a
+    # conversation (no conversationId, or one with no turns yet) share a
+    # single agent call instead of each running its own search.
+    chat_coalesce_enabled: bool = False
+    # /api/chat/batch: maximum requests per batch, and how many run at once.
+    chat_batch_max_items: int = 100
+    chat_batch_max_parallelism: int = 4
+
+    # Pre-built memory-less agents shared by uploads (inline ingestion; thread
+    # and process workers build one agent each). Built at startup when
+    # agent_pool_warm_on_startup is on, otherwise on first use.
+    agent_pool_size: int = 4
+    agent_pool_warm_on_startup: bool = True
 
     @property
     def cors_origins_list(self) -> list[str]:
@@ -0,0 +1,195 @@
+"""Durable conversation state shared by every worker.
+
+:class:`~conversations.ConversationStore` only lives in one process, so with
+several uvicorn workers a follow-up question that lands on another worker
+used to start from empty memory. A :class:`ConversationBackend` records each
+conversation's owner and recent turns under ``_thread_key(tenant, id)`` in
+storage every worker can reach. The in-process store acts as a read-through
+cache in front of it: the backend is only read when a worker has no local
+agent for the conversation, or when another worker has added turns since.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from config import Settings, get_settings
+
+
+class ConversationBackend(ABC):
+    """Interface for shared per-conversation history."""
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[tuple[list[dict], int]]:
+        """Return ``(recent_turns, turn_count)`` for ``key``, or None if unknown/expired."""
+
+    @abstractmethod
+    def turn_count(self, key: str) -> int:
+        """Total turns recorded for ``key`` (0 if unknown/expired)."""
+
+    @abstractmethod
+    def append_turn(self, key: str, tenant_id: str, turn: dict) -> int:
+        """Record one turn for ``key``; return the new turn count."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Forget ``key``; return True if it existed."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Drop conversations idle longer than the TTL; return how many."""
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class SQLiteConversationBackend(ConversationBackend):
+    """Conversation history in one SQLite file (WAL mode, safe across processes).
+
+    Only the last ``max_turns`` turns are kept per conversation; the total
+    count is kept separately so workers can tell when their copy is stale.
+    Expired rows are ignored on read and purged every ``purge_every`` appends.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        idle_ttl: float = 3600.0,
+        max_turns: int = 20,
+        purge_every: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._idle_ttl = idle_ttl
+        self._max_turns = max_turns
+        self._purge_every = purge_every
+        self._appends = 0
+        self._clock = clock
+        # Calls arrive from asyncio.to_thread workers; one connection guarded
+        # by a lock is plenty for short single-row statements.
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                " thread_key TEXT PRIMARY KEY,"
+                " tenant_id TEXT NOT NULL,"
+                " turns TEXT NOT NULL,"
+                " turn_count INTEGER NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS conversations_updated_at"
+                " ON conversations (updated_at)"
+            )
+
+    def _cutoff(self) -> float:
+        return self._clock() - self._idle_ttl if self._idle_ttl > 0 else float("-inf")
+
+    def load(self, key: str) -> Optional[tuple[list[dict], int]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT turns, turn_count FROM conversations"
+                " WHERE thread_key = ? AND updated_at > ?",
+                (key, self._cutoff()),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def turn_count(self, key: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT turn_count FROM conversations"
+                " WHERE thread_key = ? AND updated_at > ?",
+                (key, self._cutoff()),
+            ).fetchone()
+        return row[0] if row is not None else 0
+
+    def append_turn(self, key: str, tenant_id: str, turn: dict) -> int:
+        now = self._clock()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front so concurrent workers
+            # appending to the same conversation serialize instead of racing.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT turns, turn_count FROM conversations"
+                    " WHERE thread_key = ? AND updated_at > ?",
+                    (key, self._cutoff()),
+                ).fetchone()
+                turns, count = (json.loads(row[0]), row[1]) if row else ([], 0)
+                turns.append(turn)
+                if self._max_turns > 0:
+                    turns = turns[-self._max_turns:]
+                count += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO conversations"
+                    " (thread_key, tenant_id, turns, turn_count, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, tenant_id, json.dumps(turns), count, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._appends += 1
+            purge = self._purge_every > 0 and self._appends % self._purge_every == 0
+        if purge:
+            self.purge_expired()
+        return count
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM conversations WHERE thread_key = ?", (key,)
+            )
+        return cursor.rowcount > 0
+
+    def purge_expired(self) -> int:
+        if self._idle_ttl <= 0:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM conversations WHERE updated_at <= ?", (self._cutoff(),)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def build_conversation_backend(settings: Settings) -> Optional[ConversationBackend]:
+    """Construct the backend selected by ``settings`` (None for "memory")."""
+    backend = settings.conversation_backend.lower()
+    if backend == "memory":
+        return None
+    if backend == "sqlite":
+        return SQLiteConversationBackend(
+            settings.conversation_sqlite_path,
+            idle_ttl=settings.conversation_idle_ttl_seconds,
+            max_turns=settings.conversation_history_max_turns,
+        )
+    raise ValueError(f"Unknown WEB_UI_CONVERSATION_BACKEND: {settings.conversation_backend!r}")
+
+
+_backend: Optional[ConversationBackend] = None
+_backend_built = False
+
+
+def get_conversation_backend() -> Optional[ConversationBackend]:
+    """Return the process-wide backend, or None when state is process-local."""
+    global _backend, _backend_built
+    if not _backend_built:
+        _backend = build_conversation_backend(get_settings())
+        _backend_built = True
+    return _backend
@@ -0,0 +1,196 @@
+"""Bounded store for per-conversation agent state.
+
+``api/chat.py`` keeps one ``IntraMindAgent`` per conversation so follow-up
+questions share memory. :class:`ConversationStore` bounds that map: entries
+idle longer than ``idle_ttl`` expire, the least-recently-used entry is evicted
+once ``max_entries`` is reached, and an optional ``max_per_tenant`` quota
+stops one tenant from crowding everyone else out. A background task started
+with :func:`start_conversation_purge` sweeps out expired entries that no
+lookup would otherwise reach.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    tenant_id: str
+    value: Any
+    last_used: float
+
+
+class ConversationStore:
+    """LRU + idle-TTL map of thread key -> conversation state."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        idle_ttl: float = 3600.0,
+        max_per_tenant: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._idle_ttl = idle_ttl
+        self._max_per_tenant = max_per_tenant
+        self._clock = clock
+        # Ordered oldest -> most recently used, so expiry and LRU eviction
+        # both pop from the front.
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._by_tenant: dict[str, OrderedDict[str, None]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = {"lru": 0, "ttl": 0, "tenant_quota": 0}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ConversationStore":
+        return cls(
+            max_entries=settings.conversation_max_entries,
+            idle_ttl=settings.conversation_idle_ttl_seconds,
+            max_per_tenant=settings.conversation_max_per_tenant,
+        )
+
+    def get(self, key: str) -> Any | None:
+        """Return the state for ``key`` (refreshing its recency) or None."""
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            entry.last_used = now
+            self._entries.move_to_end(key)
+            self._by_tenant[entry.tenant_id].move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def put(self, key: str, tenant_id: str, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting as needed to stay in bounds."""
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            if key in self._entries:
+                self._remove(key)
+            tenant_keys = self._by_tenant.get(tenant_id)
+            if self._max_per_tenant > 0 and tenant_keys:
+                while len(tenant_keys) >= self._max_per_tenant:
+                    self._remove(next(iter(tenant_keys)))
+                    self._evictions["tenant_quota"] += 1
+            if self._max_entries > 0:
+                while len(self._entries) >= self._max_entries:
+                    self._remove(next(iter(self._entries)))
+                    self._evictions["lru"] += 1
+            self._entries[key] = _Entry(tenant_id, value, now)
+            self._by_tenant.setdefault(tenant_id, OrderedDict())[key] = None
+
+    def pop(self, key: str) -> bool:
+        """Remove ``key``; return True if it was present."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def purge_expired(self) -> int:
+        """Drop every entry idle longer than the TTL; return how many."""
+        with self._lock:
+            return self._expire(self._clock())
+
+    def _expire(self, now: float) -> int:
+        if self._idle_ttl <= 0:
+            return 0
+        expired = 0
+        cutoff = now - self._idle_ttl
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.last_used > cutoff:
+                break
+            self._remove(key)
+            expired += 1
+        self._evictions["ttl"] += expired
+        return expired
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        tenant_keys = self._by_tenant[entry.tenant_id]
+        del tenant_keys[key]
+        if not tenant_keys:
+            del self._by_tenant[entry.tenant_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "tenants": len(self._by_tenant),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+            "evictions": dict(self._evictions),
+        }
+
+
+_store: ConversationStore | None = None
+
+
+def get_conversation_store() -> ConversationStore:
+    global _store
+    if _store is None:
+        _store = ConversationStore.from_settings(get_settings())
+    return _store
+
+
+_purge_task: asyncio.Task | None = None
+
+
+async def _purge_conversations(store: ConversationStore, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = store.purge_expired()
+        except Exception as exc:
+            logger.warning("Conversation purge failed: %s", exc)
+        else:
+            if purged:
+                logger.info("Purged %d expired conversations", purged)
+
+
+def start_conversation_purge() -> None:
+    """Drop expired conversations every ``conversation_purge_interval_seconds``."""
+    global _purge_task
+    interval = get_settings().conversation_purge_interval_seconds
+    if interval <= 0 or _purge_task is not None:
+        return
+    _purge_task = asyncio.get_running_loop().create_task(
+        _purge_conversations(get_conversation_store(), interval)
+    )
+
+
+async def stop_conversation_purge() -> None:
+    global _purge_task
+    if _purge_task is not None:
+        _purge_task.cancel()
+        try:
+            await _purge_task
+        except asyncio.CancelledError:
+            pass
+        _purge_task = None
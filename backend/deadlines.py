@@ -0,0 +1,138 @@
+"""Request deadlines and client-disconnect cancellation for agent calls.
+
+``agent.search`` and ``ingest_document`` can run for tens of seconds. When the
+widget is closed mid-answer, or the request outlives its tenant's deadline,
+nobody will read the result, so :class:`RequestCanceller` cancels the work
+instead of letting it hold an agent, an LLM call and a concurrency slot to
+completion. It also counts cancellations and estimates the agent time they
+saved: the average duration of completed calls of the same kind minus the
+time the cancelled call had already run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Optional
+
+from fastapi import HTTPException, Request
+
+from config import get_settings
+
+
+class DeadlineExceededError(HTTPException):
+    """504 raised when a request runs past its tenant's deadline."""
+
+    def __init__(self, timeout: float) -> None:
+        super().__init__(
+            status_code=504,
+            detail=f"Request did not complete within {timeout:g} seconds",
+        )
+
+
+class ClientDisconnectedError(HTTPException):
+    """499 (client closed request) raised after abandoning a disconnected caller.
+
+    The status is never seen by the client; it only shows up in access logs.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(status_code=499, detail="Client disconnected")
+
+
+class _KindStats:
+    __slots__ = ("completed", "completed_seconds", "deadline", "disconnect", "saved_seconds")
+
+    def __init__(self) -> None:
+        self.completed = 0
+        self.completed_seconds = 0.0
+        self.deadline = 0
+        self.disconnect = 0
+        self.saved_seconds = 0.0
+
+
+class RequestCanceller:
+    """Run agent work under a deadline, cancelling it if the client leaves."""
+
+    def __init__(self, poll_interval: float = 0.25) -> None:
+        self._poll_interval = poll_interval
+        self._kinds: dict[str, _KindStats] = {}
+
+    def record(self, kind: str, outcome: str, elapsed: float) -> None:
+        """Count one call of ``kind`` ending as completed/deadline/disconnect."""
+        stats = self._kinds.setdefault(kind, _KindStats())
+        if outcome == "completed":
+            stats.completed += 1
+            stats.completed_seconds += elapsed
+            return
+        setattr(stats, outcome, getattr(stats, outcome) + 1)
+        if stats.completed:
+            average = stats.completed_seconds / stats.completed
+            stats.saved_seconds += max(0.0, average - elapsed)
+
+    async def run(
+        self,
+        kind: str,
+        work: Awaitable[Any],
+        request: Optional[Request] = None,
+        timeout: float = 0,
+    ) -> Any:
+        """Await ``work``; cancel it on deadline (504) or disconnect (499).
+
+        ``timeout`` <= 0 means no deadline. Without a ``request`` there is no
+        disconnect detection.
+        """
+        task = asyncio.ensure_future(work)
+        started = time.monotonic()
+        deadline = started + timeout if timeout > 0 else None
+        try:
+            while True:
+                wait = self._poll_interval if request is not None else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        await self._cancel(task)
+                        self.record(kind, "deadline", time.monotonic() - started)
+                        raise DeadlineExceededError(timeout)
+                    wait = remaining if wait is None else min(wait, remaining)
+                done, _ = await asyncio.wait({task}, timeout=wait)
+                if done:
+                    self.record(kind, "completed", time.monotonic() - started)
+                    return task.result()
+                if request is not None and await request.is_disconnected():
+                    await self._cancel(task)
+                    self.record(kind, "disconnect", time.monotonic() - started)
+                    raise ClientDisconnectedError()
+        except asyncio.CancelledError:
+            # The server cancelled us (e.g. shutdown): take the work with us.
+            task.cancel()
+            raise
+
+    @staticmethod
+    async def _cancel(task: asyncio.Future) -> None:
+        """Cancel ``task`` and wait until it has unwound (slots released)."""
+        task.cancel()
+        await asyncio.wait({task})
+
+    def stats(self) -> dict:
+        return {
+            kind: {
+                "completed": s.completed,
+                "avg_seconds": round(s.completed_seconds / s.completed, 3)
+                if s.completed else None,
+                "cancelled_deadline": s.deadline,
+                "cancelled_disconnect": s.disconnect,
+                "seconds_saved_estimate": round(s.saved_seconds, 3),
+            }
+            for kind, s in self._kinds.items()
+        }
+
+
+_canceller: RequestCanceller | None = None
+
+
+def get_request_canceller() -> RequestCanceller:
+    global _canceller
+    if _canceller is None:
+        _canceller = RequestCanceller(get_settings().disconnect_poll_interval_seconds)
+    return _canceller
@@ -0,0 +1,231 @@
+"""One pooled API Gateway client per worker.
+
+Handlers used to open ``async with APIGatewayClient()`` per request, so every
+collections call paid TCP (and, for a remote gateway, TLS) setup and threw
+the connection away afterwards. :class:`SharedGatewayClient` builds one
+``APIGatewayClient`` when the app starts, backs it with a single
+``httpx`` connection pool (configurable limits, keep-alive and optional
+HTTP/2), and hands that instance to the routers through the
+:func:`gateway_client` dependency. It is closed when the app shuts down.
+
+``APIGatewayClient`` lives in the AI Agent checkout, so the pool is attached
+without depending on its internals: passed as ``http_client`` if its
+constructor takes one, otherwise swapped in for the ``httpx.AsyncClient`` it
+created (keeping its base URL, headers and timeout).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from typing import Any, AsyncIterator, Callable, Optional
+
+import httpx
+
+from config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _default_client_factory(**kwargs: Any) -> Any:
+    from tools.api_client import APIGatewayClient
+
+    return APIGatewayClient(**kwargs)
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body that tells the transport when the request is finished."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]) -> None:
+        self._stream = stream
+        self._on_close: Optional[Callable[[], None]] = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """``httpx.AsyncHTTPTransport`` that also reports how busy its pool is."""
+
+    def __init__(self, limits: httpx.Limits, http2: bool = False) -> None:
+        self._limits = limits
+        self._http2 = http2
+        self._transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+        self._requests = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._pool_timeouts = 0
+        self._errors = 0
+
+    def _finished(self) -> None:
+        self._in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._requests += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.PoolTimeout:
+            self._pool_timeouts += 1
+            self._finished()
+            raise
+        except BaseException:
+            self._errors += 1
+            self._finished()
+            raise
+        response.stream = _TrackedStream(response.stream, self._finished)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def stats(self) -> dict:
+        # httpcore's pool lists its open connections; the attribute path is
+        # not public httpx API, so degrade to request counts without it.
+        pool = getattr(self._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for c in connections if c.is_idle())
+        max_connections = self._limits.max_connections
+        return {
+            "http2": self._http2,
+            "max_connections": max_connections,
+            "max_keepalive_connections": self._limits.max_keepalive_connections,
+            "keepalive_expiry_seconds": self._limits.keepalive_expiry,
+            "connections_open": len(connections),
+            "connections_idle": idle,
+            "connections_active": len(connections) - idle,
+            "requests": self._requests,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "utilization": round(self._in_flight / max_connections, 3) if max_connections else None,
+            "pool_timeouts": self._pool_timeouts,
+            "errors": self._errors,
+        }
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class SharedGatewayClient:
+    """Owns the worker's single ``APIGatewayClient`` and its connection pool."""
+
+    def __init__(
+        self,
+        client_factory: Callable[..., Any] = _default_client_factory,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+    ) -> None:
+        self._client_factory = client_factory
+        if http2 and not _http2_available():
+            logger.warning("WEB_UI_GATEWAY_HTTP2 is set but 'h2' is not installed; using HTTP/1.1")
+            http2 = False
+        self._limits = httpx.Limits(
+            max_connections=max_connections or None,
+            max_keepalive_connections=max_keepalive_connections or None,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http2 = http2
+        self._transport: Optional[PooledTransport] = None
+        self._client: Any = None
+        self._pooled = False
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SharedGatewayClient":
+        return cls(
+            max_connections=settings.gateway_max_connections,
+            max_keepalive_connections=settings.gateway_max_keepalive_connections,
+            keepalive_expiry=settings.gateway_keepalive_expiry_seconds,
+            http2=settings.gateway_http2,
+        )
+
+    async def open(self) -> Any:
+        """Create and enter the client (idempotent); return it."""
+        async with self._lock:
+            if self._client is None:
+                self._transport = PooledTransport(self._limits, http2=self._http2)
+                client = await self._build_client()
+                self._client = await client.__aenter__()
+        return self._client
+
+    async def _build_client(self) -> Any:
+        try:
+            parameters = inspect.signature(self._client_factory).parameters
+        except (TypeError, ValueError):
+            parameters = {}
+        if "http_client" in parameters:
+            self._pooled = True
+            return self._client_factory(http_client=httpx.AsyncClient(transport=self._transport))
+
+        client = self._client_factory()
+        for name, value in list(vars(client).items()):
+            if isinstance(value, httpx.AsyncClient):
+                setattr(client, name, httpx.AsyncClient(
+                    base_url=value.base_url,
+                    headers=value.headers,
+                    cookies=value.cookies,
+                    timeout=value.timeout,
+                    event_hooks=value.event_hooks,
+                    transport=self._transport,
+                ))
+                await value.aclose()
+                self._pooled = True
+        if not self._pooled:
+            logger.warning(
+                "APIGatewayClient exposes no httpx.AsyncClient; sharing it without pool limits"
+            )
+        return client
+
+    async def close(self) -> None:
+        async with self._lock:
+            client, self._client = self._client, None
+            transport, self._transport = self._transport, None
+            self._pooled = False
+        if client is not None:
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception as exc:
+                logger.warning("Error closing API Gateway client: %s", exc)
+        if transport is not None:
+            await transport.aclose()
+
+    def stats(self) -> dict:
+        if self._transport is None:
+            return {"open": False}
+        return {"open": True, "pooled": self._pooled, **self._transport.stats()}
+
+
+_shared: Optional[SharedGatewayClient] = None
+
+
+def get_shared_gateway() -> SharedGatewayClient:
+    global _shared
+    if _shared is None:
+        _shared = SharedGatewayClient.from_settings(get_settings())
+    return _shared
+
+
+async def gateway_client() -> Any:
+    """FastAPI dependency: the worker's shared ``APIGatewayClient``.
+
+    Opened at startup; opened here on first use if startup hooks did not run.
+    """
+    return await get_shared_gateway().open()
@@ -0,0 +1,308 @@
+"""Run document ingestion off the event loop that serves chat.
+
+``agent.ingest_document`` is a coroutine, but parsing, OCR and chunking
+inside it are largely synchronous. Awaited on the serving loop, every
+CPU-bound stretch stalls all chat requests on that worker.
+:class:`IngestionExecutor` runs ingestion in one of three modes
+(``WEB_UI_INGESTION_EXECUTOR``):
+
+* ``thread`` (default): a pool of worker threads, each with its own agent
+  and event loop. Parsers that release the GIL (PDF, OCR) run in parallel
+  with chat, and upload progress is reported as it happens.
+* ``process``: the same, with worker processes. CPU work never touches the
+  serving process, and a worker that crashes (segfault in a parser, OOM
+  kill) only fails the uploads it was running; the pool is rebuilt for the
+  next job. Progress jumps from 0 to 100.
+* ``inline``: the previous behaviour, pooled agents on the serving loop
+  (:class:`~agent_pool.AgentPool`, whose stats only exist in this mode).
+
+Work handed to a thread or process cannot be interrupted: when an upload
+deadline cancels the job, the job fails at once but the worker finishes the
+file in the background. Its vectors are stored all the same, so the result
+is handed to ``on_late_result`` for the caller to record.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from agent_pool import AgentPool
+
+logger = logging.getLogger(__name__)
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+
+ProgressCallback = Callable[[float], None]
+# Receives the result of a file whose job was cancelled while a worker ran it.
+LateResultCallback = Callable[[dict], None]
+
+
+class IngestionWorkerCrashedError(RuntimeError):
+    """An ingestion worker process died while a file was being ingested."""
+
+
+def build_ingestion_agent() -> Any:
+    """Default agent factory: a memory-less ``IntraMindAgent``.
+
+    Module-level (and importing the agent lazily) so worker processes can
+    unpickle it without importing the API routers.
+    """
+    from agent.main import IntraMindAgent
+
+    return IntraMindAgent(thread_id=False)
+
+
+def _progress_kwargs(agent: Any, progress: Optional[ProgressCallback]) -> dict:
+    """Pass ``progress`` as ``progress_callback`` if ``ingest_document`` takes it."""
+    if progress is None:
+        return {}
+    try:
+        parameters = inspect.signature(agent.ingest_document).parameters
+    except (TypeError, ValueError):
+        return {}
+    return {"progress_callback": progress} if "progress_callback" in parameters else {}
+
+
+# Per worker thread (and so per worker process): one agent and one event
+# loop, reused for every file that worker ingests.
+_worker_state = threading.local()
+
+
+def _worker_agent(factory: Callable[[], Any]) -> tuple[Any, Optional[float]]:
+    """This worker's agent, and the seconds spent building it if this call did."""
+    if getattr(_worker_state, "agent", None) is not None:
+        return _worker_state.agent, None
+    started = time.perf_counter()
+    _worker_state.loop = asyncio.new_event_loop()
+    _worker_state.agent = factory()
+    return _worker_state.agent, time.perf_counter() - started
+
+
+def _warm_worker(factory: Callable[[], Any]) -> Optional[float]:
+    return _worker_agent(factory)[1]
+
+
+def _ingest_in_worker(
+    factory: Callable[[], Any], kwargs: dict, progress: Optional[ProgressCallback] = None
+) -> tuple[dict, float, Optional[float]]:
+    """Ingest one file in a worker; return ``(result, started, construction)``.
+
+    ``started`` is when the worker picked the file up (``time.monotonic``,
+    comparable across processes on one host); ``construction`` the seconds
+    spent building this worker's agent, if this file paid for it.
+    """
+    started = time.monotonic()
+    agent, construction = _worker_agent(factory)
+    coro = agent.ingest_document(**kwargs, **_progress_kwargs(agent, progress))
+    return _worker_state.loop.run_until_complete(coro), started, construction
+
+
+class IngestionExecutor:
+    """Runs ``ingest_document`` calls with agents built by ``factory``.
+
+    ``workers`` sizes the thread / process pool; ``pool_size`` the agent
+    pool in inline mode. In thread and process mode each worker builds its
+    own agent, and ``stats()["worker_agents"]`` reports their construction
+    time and how long files waited for a free worker. In process mode ``factory`` must be picklable (a
+    module-level function), as workers are started with ``spawn``.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        mode: str = THREAD,
+        workers: int = 2,
+        pool_size: int = 4,
+    ) -> None:
+        mode = mode.lower()
+        if mode not in (INLINE, THREAD, PROCESS):
+            raise ValueError(f"Unknown WEB_UI_INGESTION_EXECUTOR: {mode!r}")
+        self._factory = factory
+        self._mode = mode
+        self._workers = max(1, workers)
+        self._agent_pool = AgentPool(factory, size=pool_size) if mode == INLINE else None
+        self._executor: Optional[Executor] = None
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._crashes = 0
+        self._late_results = 0
+        self._busy_seconds = 0.0
+        self._agents_built = 0
+        self._construction_seconds = 0.0
+        self._last_construction_seconds: Optional[float] = None
+        self._worker_waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def agent_pool(self) -> Optional[AgentPool]:
+        return self._agent_pool
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._mode == THREAD:
+                self._executor = ThreadPoolExecutor(
+                    self._workers, thread_name_prefix="ingestion"
+                )
+            else:
+                # spawn, not fork: the serving process runs threads (uvicorn,
+                # to_thread, SQLite) whose locks a forked child could inherit held.
+                self._executor = ProcessPoolExecutor(
+                    self._workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._executor
+
+    async def warm(self) -> None:
+        """Start the workers and build their agents (call at startup)."""
+        if self._agent_pool is not None:
+            await self._agent_pool.warm()
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        for construction in await asyncio.gather(*(
+            loop.run_in_executor(executor, _warm_worker, self._factory)
+            for _ in range(self._workers)
+        )):
+            self._record_construction(construction)
+
+    async def ingest(
+        self,
+        progress: Optional[ProgressCallback] = None,
+        on_late_result: Optional[LateResultCallback] = None,
+        **kwargs: Any,
+    ) -> dict:
+        """Ingest one file; ``kwargs`` go to ``agent.ingest_document``.
+
+        ``progress`` receives the completed fraction when the agent reports
+        it (not in process mode). A crashed worker process raises
+        :class:`IngestionWorkerCrashedError`. If this call is cancelled while
+        a thread or process worker runs the file, ``on_late_result`` is
+        called on this event loop with the worker's result once it finishes.
+        """
+        self._running += 1
+        started = time.perf_counter()
+        try:
+            if self._agent_pool is not None:
+                async with self._agent_pool.checkout() as agent:
+                    result = await agent.ingest_document(**kwargs, **_progress_kwargs(agent, progress))
+            else:
+                result = await self._run_in_worker(kwargs, progress, on_late_result)
+        except BaseException:
+            self._failed += 1
+            raise
+        else:
+            self._completed += 1
+            return result
+        finally:
+            self._running -= 1
+            self._busy_seconds += time.perf_counter() - started
+
+    async def _run_in_worker(
+        self,
+        kwargs: dict,
+        progress: Optional[ProgressCallback],
+        on_late_result: Optional[LateResultCallback],
+    ) -> dict:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if self._mode == PROCESS:
+            # Callbacks cannot cross the process boundary.
+            call = (_ingest_in_worker, self._factory, kwargs)
+        else:
+            call = (_ingest_in_worker, self._factory, kwargs, progress)
+        submitted = time.monotonic()
+        future = executor.submit(*call)
+        try:
+            result, started, construction = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if on_late_result is not None and not future.cancel():
+                future.add_done_callback(
+                    lambda done: self._deliver_late(loop, done, on_late_result)
+                )
+            raise
+        except BrokenProcessPool:
+            self._crashes += 1
+            if self._executor is executor:
+                # Every job still on the broken pool fails with it; later jobs
+                # get a fresh pool.
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            logger.error("Ingestion worker process crashed; pool restarted")
+            raise IngestionWorkerCrashedError(
+                "Ingestion worker crashed while processing the file"
+            ) from None
+        self._record_construction(construction)
+        waited = max(0.0, started - submitted)
+        self._worker_waits += 1
+        self._wait_seconds += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        return result
+
+    def _record_construction(self, seconds: Optional[float]) -> None:
+        if seconds is None:
+            return
+        self._agents_built += 1
+        self._construction_seconds += seconds
+        self._last_construction_seconds = seconds
+
+    def _deliver_late(
+        self, loop: asyncio.AbstractEventLoop, future: Future, callback: LateResultCallback
+    ) -> None:
+        # Runs on the worker (or pool manager) thread; hop back to the loop.
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._late_results += 1
+        try:
+            loop.call_soon_threadsafe(callback, future.result()[0])
+        except RuntimeError:
+            logger.warning("Late ingestion result dropped: event loop is closed")
+
+    def shutdown(self) -> None:
+        """Stop the workers without waiting for running files to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "mode": self._mode,
+            "workers": self._workers,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "worker_crashes": self._crashes,
+            "late_results": self._late_results,
+            "busy_seconds": round(self._busy_seconds, 3),
+            # Inline mode borrows agents from the pool; thread and process
+            # workers each own one, so only one of these two is set.
+            "agent_pool": self._agent_pool.stats() if self._agent_pool is not None else None,
+            "worker_agents": self._worker_agent_stats() if self._agent_pool is None else None,
+        }
+
+    def _worker_agent_stats(self) -> dict:
+        return {
+            "created": self._agents_built,
+            "avg_construction_ms": round(
+                self._construction_seconds / self._agents_built * 1000, 3
+            ) if self._agents_built else None,
+            "last_construction_ms": round(self._last_construction_seconds * 1000, 3)
+            if self._last_construction_seconds is not None else None,
+            "avg_worker_wait_ms": round(self._wait_seconds / self._worker_waits * 1000, 3)
+            if self._worker_waits else None,
+            "max_worker_wait_ms": round(self._max_wait_seconds * 1000, 3),
+        }
@@ -0,0 +1,275 @@
+"""Background ingestion jobs with a bounded queue.
+
+``ingest_document`` can run for minutes on a large PDF, long enough to trip
+proxy timeouts if the upload request waits for it. :class:`IngestionQueue`
+decouples the two: the upload handler saves the file, submits a job and
+returns its id straight away, and a fixed pool of worker tasks runs the jobs.
+The queue is bounded, so a burst of uploads gets a fast 503 instead of an
+unbounded backlog, and so is each tenant's share of it (429 beyond that), so
+one tenant's bulk upload cannot lock the others out. Finished jobs stay
+queryable for ``job_ttl`` seconds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+
+from config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class IngestionQueueFullError(HTTPException):
+    """503 raised when the ingestion queue has no room for another job."""
+
+    def __init__(self, retry_after: int = 5) -> None:
+        super().__init__(
+            status_code=503,
+            detail="Ingestion queue is full. Please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class TenantIngestionLimitError(HTTPException):
+    """429 raised when a tenant already has its maximum of outstanding jobs."""
+
+    def __init__(self, limit: int, retry_after: int = 5) -> None:
+        super().__init__(
+            status_code=429,
+            detail=(
+                f"Too many documents are already being ingested for this tenant "
+                f"(limit {limit}). Please retry once some have finished."
+            ),
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+@dataclass
+class IngestionJob:
+    """One queued document ingestion and its outcome."""
+
+    job_id: str
+    tenant_id: str
+    filename: str
+    # Collection as the client named it (not the gateway-facing name).
+    collection: str
+    # Temporary copy of the upload; removed once the job finishes.
+    file_path: str
+    status: str = QUEUED
+    progress: int = 0
+    chunks_stored: Optional[int] = None
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+
+# Runs one job and returns the agent's ingestion result
+# ({"chunks_stored": ..., "document_id": ...}). It may update job.progress.
+JobRunner = Callable[[IngestionJob], Awaitable[dict]]
+
+
+class IngestionQueue:
+    """Bounded FIFO of ingestion jobs drained by ``workers`` background tasks.
+
+    ``max_queued`` counts jobs waiting for a worker (0 = unbounded);
+    ``max_per_tenant`` counts one tenant's queued plus running jobs
+    (0 = unbounded).
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queued: int = 100,
+        job_ttl: float = 3600.0,
+        max_per_tenant: int = 0,
+    ) -> None:
+        self._workers = max(1, workers)
+        self._max_queued = max_queued
+        self._max_per_tenant = max_per_tenant
+        # Queued + running jobs per tenant.
+        self._outstanding: dict[str, int] = {}
+        self._job_ttl = job_ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        # Ordered by submission, so pruning can stop at the first job that is
+        # still too young. Runners are dropped once their job starts.
+        self._jobs: OrderedDict[str, IngestionJob] = OrderedDict()
+        self._runners: dict[str, JobRunner] = {}
+        self._running = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._rejected = 0
+        self._rejected_tenant = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "IngestionQueue":
+        return cls(
+            workers=settings.ingestion_workers,
+            max_queued=settings.ingestion_queue_size,
+            job_ttl=settings.ingestion_job_ttl_seconds,
+            max_per_tenant=settings.ingestion_queue_max_per_tenant,
+        )
+
+    def start(self) -> None:
+        """Start the worker tasks (idempotent; needs a running event loop)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queued)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"ingestion-worker-{i}")
+            for i in range(self._workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued jobs are failed and their files removed."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self._jobs.values():
+            if not job.finished:
+                self._finish(job, FAILED, error="Server shut down before ingestion completed")
+        self._queue = None
+
+    def submit(self, job: IngestionJob, runner: JobRunner) -> IngestionJob:
+        """Queue ``job``.
+
+        Raises TenantIngestionLimitError (429) if its tenant is at
+        ``max_per_tenant``, or IngestionQueueFullError (503) if the queue
+        has no room.
+        """
+        self.start()
+        self._prune()
+        self.check_capacity(job.tenant_id)
+        try:
+            self._queue.put_nowait(job.job_id)
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise IngestionQueueFullError()
+        self._jobs[job.job_id] = job
+        self._runners[job.job_id] = runner
+        self._outstanding[job.tenant_id] = self._outstanding.get(job.tenant_id, 0) + 1
+        return job
+
+    def check_capacity(self, tenant_id: str) -> None:
+        """Raise the error :meth:`submit` would raise for ``tenant_id`` right now.
+
+        Lets a caller refuse early, before expensive work whose result it
+        would then have to throw away.
+        """
+        if 0 < self._max_per_tenant <= self._outstanding.get(tenant_id, 0):
+            self._rejected_tenant += 1
+            raise TenantIngestionLimitError(self._max_per_tenant)
+        if self._queue is not None and self._queue.full():
+            self._rejected += 1
+            raise IngestionQueueFullError()
+
+    def get(self, job_id: str, tenant_id: str) -> Optional[IngestionJob]:
+        """Return ``job_id`` if it exists and belongs to ``tenant_id``."""
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None or job.tenant_id != tenant_id:
+            return None
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            runner = self._runners.pop(job_id, None)
+            if job is None or runner is None or job.finished:
+                continue
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._running += 1
+            try:
+                result = await runner(job)
+            except asyncio.CancelledError:
+                self._finish(job, FAILED, error="Server shut down before ingestion completed")
+                raise
+            except HTTPException as e:
+                self._finish(job, FAILED, error=str(e.detail))
+            except Exception as e:
+                logger.error("Ingestion job %s failed: %s", job_id, e, exc_info=True)
+                self._finish(job, FAILED, error=f"Ingestion failed: {e}")
+            else:
+                job.chunks_stored = result.get("chunks_stored", 0)
+                job.document_id = result.get("document_id", job.filename)
+                self._finish(job, SUCCEEDED)
+            finally:
+                self._running -= 1
+
+    def _finish(self, job: IngestionJob, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        if status == SUCCEEDED:
+            job.progress = 100
+            self._succeeded += 1
+        else:
+            self._failed += 1
+        job.finished_at = time.time()
+        self._runners.pop(job.job_id, None)
+        left = self._outstanding.get(job.tenant_id, 0) - 1
+        if left > 0:
+            self._outstanding[job.tenant_id] = left
+        else:
+            self._outstanding.pop(job.tenant_id, None)
+        try:
+            os.unlink(job.file_path)
+        except OSError:
+            pass
+        job.done.set()
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the TTL."""
+        cutoff = time.time() - self._job_ttl
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            if job.created_at > cutoff:
+                break
+            if job.finished and job.finished_at <= cutoff:
+                del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self._workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queued": self._max_queued,
+            "running": self._running,
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+            "max_per_tenant": self._max_per_tenant,
+            "rejected_queue_full": self._rejected,
+            "rejected_tenant_limit": self._rejected_tenant,
+            "tracked_jobs": len(self._jobs),
+        }
+
+
+_queue: IngestionQueue | None = None
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    global _queue
+    if _queue is None:
+        _queue = IngestionQueue.from_settings(get_settings())
+    return _queue
@@ -3,6 +3,7 @@ IntraMind Web UI Backend
 FastAPI application serving the embeddable widget and API endpoints
 """
 
+import asyncio
 import logging
 import os
 import sys
@@ -24,7 +25,27 @@ if _AI_AGENT_SRC not in sys.path:
 # Note: Run with `uvicorn main:app` from the backend directory
 # Or set PYTHONPATH: `PYTHONPATH=. uvicorn backend.main:app`
 from api import chat, upload, collections, validate
+from auth import (
+    get_auth_manager,
+    start_key_reloader,
+    start_rate_limit_maintenance,
+    stop_key_reloader,
+    stop_rate_limit_maintenance,
+)
+from collection_cache import get_collection_cache
+from concurrency import get_concurrency_limiter
 from config import get_settings
+from conversation_state import get_conversation_backend
+from conversations import start_conversation_purge, stop_conversation_purge
+from deadlines import get_request_canceller
+from gateway import get_shared_gateway
+from ingestion_jobs import get_ingestion_queue
+from resumable_uploads import (
+    get_resumable_store,
+    start_upload_session_purge,
+    stop_upload_session_purge,
+)
+from upload_limits import UploadSizeLimitMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -55,12 +76,22 @@ if not _cors_origins and settings.auth_dev_mode:
         "because WEB_UI_AUTH_DEV_MODE is on."
     )
 
+# Reject oversized uploads before their bodies are read. Added before CORS so
+# CORSMiddleware (outermost) still decorates the 413 for browser clients.
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths={"/api/upload": 1, "/api/upload/batch": settings.upload_batch_max_files},
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_cors_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "X-API-Key"],
+    # Resumable uploads tell the widget where to resume from; collection
+    # listings where the next page starts.
+    expose_headers=["Upload-Offset", "X-Next-Cursor"],
 )
 
 # Include API routers
@@ -70,6 +101,109 @@ app.include_router(collections.router)
 app.include_router(validate.router)
 
 
+@app.on_event("startup")
+async def _start_auth_tasks() -> None:
+    """Hot-reload WEB_UI_API_KEYS_FILE and run rate-limiter housekeeping."""
+    await start_key_reloader()
+    start_rate_limit_maintenance()
+
+
+@app.on_event("shutdown")
+async def _stop_auth_tasks() -> None:
+    await stop_key_reloader()
+    await stop_rate_limit_maintenance()
+
+
+@app.on_event("startup")
+async def _start_conversation_purge() -> None:
+    """Sweep idle conversations out of memory even when nothing looks them up."""
+    start_conversation_purge()
+
+
+@app.on_event("shutdown")
+async def _stop_conversation_purge() -> None:
+    await stop_conversation_purge()
+
+
+@app.on_event("startup")
+async def _open_conversation_backend() -> None:
+    """Open the shared conversation backend and drop long-idle threads.
+
+    Also warns if the agent cannot be handed a resumed conversation's history.
+    """
+    backend = get_conversation_backend()
+    if backend is not None:
+        purged = await asyncio.to_thread(backend.purge_expired)
+        logger.info("Purged %d expired conversations", purged)
+    chat.check_history_support()
+
+
+@app.on_event("shutdown")
+async def _close_conversation_backend() -> None:
+    backend = get_conversation_backend()
+    if backend is not None:
+        backend.close()
+
+
+@app.on_event("startup")
+async def _open_gateway_client() -> None:
+    """Open the worker's pooled API Gateway client used by the routers."""
+    try:
+        await get_shared_gateway().open()
+    except Exception as exc:
+        # Routers retry on first use; don't block startup on it.
+        logger.warning("API Gateway client setup failed: %s", exc)
+
+
+@app.on_event("shutdown")
+async def _close_gateway_client() -> None:
+    await get_shared_gateway().close()
+
+
+@app.on_event("startup")
+async def _start_ingestion_workers() -> None:
+    get_ingestion_queue().start()
+
+
+@app.on_event("shutdown")
+async def _stop_ingestion_workers() -> None:
+    await get_ingestion_queue().stop()
+
+
+@app.on_event("startup")
+async def _purge_upload_sessions() -> None:
+    """Delete staged data of abandoned resumable uploads, now and periodically."""
+    purged = await asyncio.to_thread(get_resumable_store().purge_expired)
+    if purged:
+        logger.info("Purged %d abandoned upload sessions", purged)
+    start_upload_session_purge()
+
+
+@app.on_event("shutdown")
+async def _stop_upload_session_purge() -> None:
+    await stop_upload_session_purge()
+
+
+@app.on_event("startup")
+async def _warm_ingestion_executor() -> None:
+    """Start the ingestion workers and build their agents before the first upload."""
+    executor = upload.get_ingestion_executor()
+    if executor is None or not settings.agent_pool_warm_on_startup:
+        return
+    try:
+        await executor.warm()
+    except Exception as exc:
+        # Agents are built on demand instead; don't block startup on it.
+        logger.warning("Ingestion executor warm-up failed: %s", exc)
+
+
+@app.on_event("shutdown")
+async def _stop_ingestion_executor() -> None:
+    executor = upload.get_ingestion_executor()
+    if executor is not None:
+        executor.shutdown()
+
+
 @app.on_event("startup")
 async def _init_observability() -> None:
     """Initialize OTEL tracing and instrument FastAPI + HTTPX.
@@ -130,6 +264,7 @@ async def root():
         "status": "ready",
         "endpoints": {
             "chat": "/api/chat",
+            "chat_stream": "/api/chat/stream",
             "upload": "/api/upload",
             "collections": "/api/collections",
             "validate": "/api/validate",
@@ -142,7 +277,15 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "web-ui-backend"}
+    return {
+        "status": "healthy",
+        "service": "web-ui-backend",
+        "auth": get_auth_manager().stats(),
+        "concurrency": get_concurrency_limiter().stats(),
+        "deadlines": get_request_canceller().stats(),
+        "gateway": get_shared_gateway().stats(),
+        "collections_cache": cache.stats() if (cache := get_collection_cache()) is not None else None,
+    }
 
 
 @app.get("/widget.js")
@@ -0,0 +1,411 @@
+"""Per-tenant rate limiting backends.
+
+:class:`RateLimiter` is the extension point used by ``auth.require_tenant``.
+Two implementations ship:
+
+* :class:`SlidingWindowRateLimiter` (default) - in-process, dependency-free.
+  Each uvicorn worker enforces the limit on its own, so N workers admit up to
+  N times the configured rate.
+* :class:`RedisRateLimiter` - shares the budget across workers / containers
+  through any Redis-protocol server. To avoid a round trip per request, each
+  worker leases a small batch of tokens and serves requests from it locally;
+  unused tokens are handed back when the lease expires.
+
+Both use the same two-bucket sliding-window counter, so a tenant sees the same
+429 / ``Retry-After`` behavior whichever backend is configured.
+
+Budgets are counted in *units* rather than requests: :class:`CostModel` prices
+each request by route (and, for uploads, by body size), so a tenant's
+expensive calls draw down its per-minute budget faster than cheap ones.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from fastapi import HTTPException
+
+from config import Settings
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60
+
+
+class RateLimitError(HTTPException):
+    """429 raised when a tenant exceeds its per-minute request budget."""
+
+    def __init__(self, retry_after: int = 60) -> None:
+        super().__init__(
+            status_code=429,
+            detail="Rate limit exceeded. Please slow down and retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def _retry_after(
+    previous: int, current: int, elapsed: float, limit: int, cost: int = 1
+) -> int:
+    """Seconds until ``cost`` more units would fit in the sliding window."""
+    if current + cost > limit:
+        # Only the next window can help; there ``current`` becomes the
+        # decaying previous count.
+        wait = (WINDOW_SECONDS - elapsed) + max(
+            0.0, WINDOW_SECONDS * (1 - (limit - cost) / current)
+        )
+    else:
+        wait = WINDOW_SECONDS * (1 - (limit - current - cost) / previous) - elapsed
+    return max(1, math.ceil(wait))
+
+
+class CostModel:
+    """Prices a request in rate-limit units.
+
+    ``route_costs`` maps URL path prefixes to a unit cost; the longest
+    matching prefix wins and unmatched paths cost ``default_cost``. When
+    ``bytes_per_unit`` is positive, requests under ``size_weighted_prefix``
+    additionally pay one unit per started ``bytes_per_unit`` of declared
+    ``Content-Length``.
+    """
+
+    def __init__(
+        self,
+        route_costs: dict[str, int] | None = None,
+        bytes_per_unit: int = 0,
+        default_cost: int = 1,
+        size_weighted_prefix: str = "/api/upload",
+    ) -> None:
+        self._routes = sorted(
+            (route_costs or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self._bytes_per_unit = bytes_per_unit
+        self._default_cost = default_cost
+        self._size_weighted_prefix = size_weighted_prefix
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "CostModel":
+        return cls(
+            route_costs=settings.rate_limit_route_costs,
+            bytes_per_unit=settings.rate_limit_upload_bytes_per_unit,
+        )
+
+    def route_cost(self, path: str) -> int:
+        for prefix, cost in self._routes:
+            if path.startswith(prefix):
+                return cost
+        return self._default_cost
+
+    def size_cost(self, path: str, size: int | None) -> int:
+        """Units charged for ``size`` bytes of body sent to ``path``."""
+        if self._bytes_per_unit > 0 and size and path.startswith(self._size_weighted_prefix):
+            return -(-size // self._bytes_per_unit)
+        return 0
+
+    def cost(self, path: str, content_length: int | None = None) -> int:
+        """Units charged for a request to ``path`` with the given body size."""
+        return max(0, self.route_cost(path) + self.size_cost(path, content_length))
+
+
+class RateLimiter(ABC):
+    """Interface for per-tenant request budgets."""
+
+    #: Seconds between :meth:`maintain` calls from the background task.
+    maintenance_interval: float = 60.0
+
+    @abstractmethod
+    async def acquire(
+        self, tenant_id: str, limit_per_minute: int, cost: int = 1
+    ) -> None:
+        """Consume ``cost`` units for ``tenant_id``; raise RateLimitError if over.
+
+        A cost above the limit is charged as the whole budget, so even the
+        most expensive request can eventually be admitted.
+        """
+
+    async def maintain(self) -> None:
+        """Periodic housekeeping (eviction, lease reconciliation)."""
+
+    def reset(self) -> None:
+        """Forget all state (used by tests)."""
+
+
+class _Shard:
+    """One stripe of the in-memory limiter: its own lock and buckets."""
+
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # tenant_id -> [window_index, previous_count, current_count]
+        self.buckets: dict[str, list] = {}
+
+
+class SlidingWindowRateLimiter(RateLimiter):
+    """In-memory per-tenant sliding-window rate limiter.
+
+    Uses the two-bucket sliding-window counter: each tenant keeps only the
+    request counts for the current and previous fixed windows, and the
+    previous count is weighted by how much of it still overlaps the sliding
+    window. State is three numbers per tenant no matter how high its limit.
+
+    Tenants are striped across ``shards`` independently locked shards, so
+    requests for different tenants (and the eviction sweep) rarely contend;
+    each tenant always maps to the same shard, so decisions are identical to
+    a single-lock limiter.
+
+    Tenants whose buckets have both aged out hold no information, so
+    :meth:`evict_idle` can drop them without changing any decision.
+
+    Lightweight and dependency-free, but per-process; use
+    :class:`RedisRateLimiter` for multi-worker deployments.
+    """
+
+    WINDOW_SECONDS = WINDOW_SECONDS
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        maintenance_interval: float = 60.0,
+        shards: int = 64,
+    ) -> None:
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._clock = clock
+        self.maintenance_interval = maintenance_interval
+
+    def _shard(self, tenant_id: str) -> _Shard:
+        return self._shards[hash(tenant_id) % len(self._shards)]
+
+    def check(self, tenant_id: str, limit_per_minute: int, cost: int = 1) -> None:
+        """Charge ``cost`` units to ``tenant_id``; raise RateLimitError if over budget."""
+        if limit_per_minute <= 0 or cost <= 0:
+            return  # 0 / negative means "unlimited"
+        cost = min(cost, limit_per_minute)
+        now = self._clock()
+        window = int(now // self.WINDOW_SECONDS)
+        elapsed = now - window * self.WINDOW_SECONDS
+        shard = self._shard(tenant_id)
+        with shard.lock:
+            bucket = shard.buckets.get(tenant_id)
+            if bucket is None:
+                bucket = shard.buckets[tenant_id] = [window, 0, 0]
+            elif bucket[0] != window:
+                # Roll forward: the old current window becomes "previous" only
+                # if it is the window immediately before this one.
+                previous = bucket[2] if bucket[0] == window - 1 else 0
+                bucket[0], bucket[1], bucket[2] = window, previous, 0
+            previous, current = bucket[1], bucket[2]
+            weight = 1 - elapsed / self.WINDOW_SECONDS
+            if previous * weight + current + cost > limit_per_minute:
+                raise RateLimitError(
+                    retry_after=_retry_after(
+                        previous, current, elapsed, limit_per_minute, cost
+                    )
+                )
+            bucket[2] = current + cost
+
+    async def acquire(
+        self, tenant_id: str, limit_per_minute: int, cost: int = 1
+    ) -> None:
+        self.check(tenant_id, limit_per_minute, cost)
+
+    def evict_idle(self) -> int:
+        """Drop tenants with no hits in the current or previous window.
+
+        Returns the number of tenants evicted. Each shard is scanned from a
+        snapshot without its lock and candidates are re-checked under it, so
+        the hot path is only ever blocked for a single delete.
+        """
+        window = int(self._clock() // self.WINDOW_SECONDS)
+        evicted = 0
+        for shard in self._shards:
+            for tenant_id, bucket in list(shard.buckets.items()):
+                if bucket[0] >= window - 1:
+                    continue
+                with shard.lock:
+                    current = shard.buckets.get(tenant_id)
+                    if current is not None and current[0] < window - 1:
+                        del shard.buckets[tenant_id]
+                        evicted += 1
+        return evicted
+
+    async def maintain(self) -> None:
+        # Sweep in a worker thread: scanning 100k tenants would otherwise
+        # stall the event loop for a noticeable fraction of a second.
+        evicted = await asyncio.to_thread(self.evict_idle)
+        if evicted:
+            logger.debug("Evicted %d idle rate-limit buckets", evicted)
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def reset(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
+
+
+@dataclass
+class _Lease:
+    """Tokens this worker has reserved in one shared window."""
+
+    window: int
+    tokens: int
+    expires_at: float
+
+
+class RedisRateLimiter(RateLimiter):
+    """Sliding-window limiter shared through a Redis-protocol server.
+
+    Counts live under ``<prefix><tenant_id>:<window>`` and are only touched
+    with ``GET`` / ``INCRBY`` / ``DECRBY`` / ``EXPIRE`` in a single pipeline,
+    so any RESP-compatible server (Redis, Valkey, KeyDB, Dragonfly) works.
+
+    ``client`` must follow the ``redis.asyncio.Redis`` interface. Each lease
+    reserves up to ``lease_size`` tokens in one round trip; requests are then
+    admitted locally until the lease runs out, the window rolls over, or
+    ``lease_seconds`` pass, at which point unused tokens are returned. With N
+    workers, at most N * ``lease_size`` tokens can be reserved but unused at
+    any moment, so keep leases small relative to tenant limits.
+
+    If the server is unreachable, requests fall back to a per-process
+    :class:`SlidingWindowRateLimiter` rather than failing.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        lease_size: int = 5,
+        lease_seconds: float = 5.0,
+        key_prefix: str = "intramind:rl:",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._client = client
+        self._lease_size = max(1, lease_size)
+        self._prefix = key_prefix
+        # Wall-clock time so every worker agrees on window boundaries.
+        self._clock = clock
+        self._leases: dict[str, _Lease] = {}
+        self._fallback = SlidingWindowRateLimiter()
+        self.lease_seconds = lease_seconds
+        self.maintenance_interval = lease_seconds
+
+    def _key(self, tenant_id: str, window: int) -> str:
+        return f"{self._prefix}{tenant_id}:{window}"
+
+    async def acquire(
+        self, tenant_id: str, limit_per_minute: int, cost: int = 1
+    ) -> None:
+        if limit_per_minute <= 0 or cost <= 0:
+            return
+        cost = min(cost, limit_per_minute)
+        now = self._clock()
+        window = int(now // WINDOW_SECONDS)
+        lease = self._leases.get(tenant_id)
+        if lease is not None and lease.window == window and lease.tokens >= cost:
+            lease.tokens -= cost
+            return
+        try:
+            await self._lease(tenant_id, limit_per_minute, cost, now, window)
+        except RateLimitError:
+            raise
+        except Exception as exc:
+            logger.warning("Shared rate limiter unavailable, using local: %s", exc)
+            self._fallback.check(tenant_id, limit_per_minute, cost)
+
+    async def _lease(
+        self, tenant_id: str, limit: int, cost: int, now: float, window: int
+    ) -> None:
+        """Reserve a batch for ``tenant_id`` and consume ``cost`` tokens from it."""
+        elapsed = now - window * WINDOW_SECONDS
+        batch = min(max(self._lease_size, cost), limit)
+        current_key = self._key(tenant_id, window)
+
+        pipe = self._client.pipeline(transaction=False)
+        # Hand back whatever is left of a stale lease in the same round trip.
+        stale = self._leases.pop(tenant_id, None)
+        if stale is not None and stale.tokens > 0:
+            pipe.decrby(self._key(tenant_id, stale.window), stale.tokens)
+        pipe.get(self._key(tenant_id, window - 1))
+        pipe.incrby(current_key, batch)
+        pipe.expire(current_key, 2 * WINDOW_SECONDS)
+        results = await pipe.execute()
+        previous = int(results[-3] or 0)
+        total = int(results[-2])
+
+        before = total - batch
+        allowed = math.floor(limit - previous * (1 - elapsed / WINDOW_SECONDS))
+        granted = max(0, min(batch, allowed - before))
+        if granted < cost:
+            granted = 0
+        if granted < batch:
+            await self._client.decrby(current_key, batch - granted)
+        if granted == 0:
+            raise RateLimitError(
+                retry_after=_retry_after(previous, before, elapsed, limit, cost)
+            )
+        current = self._leases.get(tenant_id)
+        if current is not None and current.window == window:
+            # A concurrent request leased for this tenant while we awaited.
+            current.tokens += granted - cost
+            return
+        self._leases[tenant_id] = _Lease(
+            window=window,
+            tokens=granted - cost,
+            expires_at=now + self.lease_seconds,
+        )
+
+    async def maintain(self) -> None:
+        """Return unused tokens from expired or rolled-over leases."""
+        now = self._clock()
+        window = int(now // WINDOW_SECONDS)
+        stale = [
+            (tenant_id, lease)
+            for tenant_id, lease in self._leases.items()
+            if lease.expires_at <= now or lease.window != window
+        ]
+        if not stale:
+            return
+        pipe = self._client.pipeline(transaction=False)
+        for tenant_id, lease in stale:
+            if self._leases.get(tenant_id) is lease:
+                del self._leases[tenant_id]
+            if lease.tokens > 0:
+                pipe.decrby(self._key(tenant_id, lease.window), lease.tokens)
+        try:
+            await pipe.execute()
+        except Exception as exc:
+            logger.warning("Failed to return leased rate-limit tokens: %s", exc)
+        self._fallback.evict_idle()
+
+    def reset(self) -> None:
+        self._leases.clear()
+        self._fallback.reset()
+
+
+def build_rate_limiter(settings: Settings) -> RateLimiter:
+    """Construct the rate-limit backend selected by ``settings``."""
+    backend = settings.rate_limit_backend.lower()
+    if backend == "memory":
+        return SlidingWindowRateLimiter(
+            maintenance_interval=settings.rate_limit_eviction_interval_seconds
+        )
+    if backend == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError(
+                "WEB_UI_RATE_LIMIT_BACKEND=redis requires the 'redis' package"
+            ) from exc
+        return RedisRateLimiter(
+            redis_asyncio.from_url(settings.rate_limit_redis_url),
+            lease_size=settings.rate_limit_lease_size,
+            lease_seconds=settings.rate_limit_lease_seconds,
+        )
+    raise ValueError(f"Unknown WEB_UI_RATE_LIMIT_BACKEND: {settings.rate_limit_backend!r}")
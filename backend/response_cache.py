@@ -0,0 +1,156 @@
+"""Opt-in cache of chat answers for repeated opening questions.
+
+Widget users ask the same FAQ-style questions against the same collection all
+day. :class:`ChatResponseCache` remembers the answer keyed on
+``(tenant_id, namespaced collection, normalized query)`` with LRU and TTL
+bounds. Because an answer is only as fresh as its collection, every entry for
+a collection is dropped when documents are ingested into it or it is deleted,
+and an answer whose search started before such a change is not cached at all.
+
+Only the first turn of a conversation is cached (no ``conversationId``, or a
+client-generated one with no turns stored yet): once a conversation has
+memory, the same words can legitimately get a different answer.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from config import Settings, get_settings
+
+_Key = tuple[str, str, str]
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of ``query`` used in cache keys."""
+    return " ".join(query.casefold().split())
+
+
+class ChatResponseCache:
+    """LRU + TTL cache of chat responses with per-collection invalidation."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[_Key, tuple[float, Any]] = OrderedDict()
+        # Gateway collection name -> keys cached against it.
+        self._by_collection: dict[str, set[_Key]] = {}
+        # Gateway collection name -> invalidation count, so an answer computed
+        # before an invalidation can be recognised and not cached.
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._stale_puts = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ChatResponseCache":
+        return cls(
+            max_entries=settings.chat_cache_max_entries,
+            ttl=settings.chat_cache_ttl_seconds,
+        )
+
+    def get(self, tenant_id: str, collection: str, query: str) -> Any | None:
+        key = (tenant_id, collection, normalize_query(query))
+        now = self._clock()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    self._remove(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return item[1]
+
+    def generation(self, collection: str) -> int:
+        """Current generation of ``collection``; read it before computing an answer."""
+        with self._lock:
+            return self._generations.get(collection, 0)
+
+    def put(
+        self,
+        tenant_id: str,
+        collection: str,
+        query: str,
+        value: Any,
+        generation: int | None = None,
+    ) -> None:
+        """Cache ``value``; skipped if ``collection`` was invalidated since
+        ``generation`` (from :meth:`generation`) was read."""
+        key = (tenant_id, collection, normalize_query(query))
+        with self._lock:
+            if generation is not None and generation != self._generations.get(collection, 0):
+                self._stale_puts += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and len(self._entries) >= self._max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+            self._entries[key] = (self._clock() + self._ttl, value)
+            self._by_collection.setdefault(collection, set()).add(key)
+
+    def invalidate_collection(self, collection: str) -> int:
+        """Drop every cached answer for gateway ``collection``, for all tenants.
+
+        Tenants without namespacing share the global collection space, so an
+        upload by one of them must invalidate the others' answers too.
+        """
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            keys = self._by_collection.pop(collection, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def _remove(self, key: _Key) -> None:
+        self._entries.pop(key, None)
+        keys = self._by_collection.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_collection[key[1]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+            "stale_puts_skipped": self._stale_puts,
+        }
+
+
+_cache: ChatResponseCache | None = None
+
+
+def get_response_cache() -> ChatResponseCache | None:
+    """Return the process-wide cache, or None when caching is disabled."""
+    global _cache
+    settings = get_settings()
+    if not settings.chat_cache_enabled:
+        return None
+    if _cache is None:
+        _cache = ChatResponseCache.from_settings(settings)
+    return _cache
@@ -0,0 +1,531 @@
+"""Resumable chunked uploads for large documents.
+
+A single multipart upload has to arrive in one piece, so a 200 MB slide
+deck over a flaky connection restarts from zero every time it drops. The
+resumable protocol splits the transfer into sessions:
+
+1. ``POST /api/upload/sessions`` declares the file (name, collection, size).
+2. ``PUT /api/upload/sessions/{id}?offset=N`` appends one chunk at ``N``.
+3. ``GET /api/upload/sessions/{id}`` reports the offset to resume from.
+4. ``POST /api/upload/sessions/{id}/complete`` hands the file to ingestion.
+
+:class:`ResumableUploadStore` keeps each session as two files in a staging
+directory scoped to the tenant: ``<id>.json`` (metadata) and ``<id>.part``
+(the bytes so far, whose length *is* the offset). Nothing lives in process
+memory, so any worker on the host can serve any chunk and sessions survive a
+restart; writers hold an exclusive ``flock`` on the ``.part`` file, so two
+workers never write (or complete) one session at once. Sessions untouched for
+``session_ttl`` seconds are garbage-collected.
+
+Each tenant may have a bounded number of open sessions and of declared bytes
+staged across them, so one tenant cannot fill the staging disk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, BinaryIO, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the per-process guard applies.
+    fcntl = None
+
+from fastapi import HTTPException
+
+from config import Settings, get_settings
+from upload_limits import UploadTooLargeError
+
+logger = logging.getLogger(__name__)
+
+_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+# Chunk bodies arrive in small pieces; write them in blocks of this size.
+_WRITE_BLOCK = 1024 * 1024
+
+
+class UploadOffsetMismatchError(HTTPException):
+    """409 raised when a chunk does not start at the session's current offset."""
+
+    def __init__(self, offset: int, detail: Optional[str] = None) -> None:
+        super().__init__(
+            status_code=409,
+            detail=detail or f"Chunk offset does not match; resume from offset {offset}",
+            headers={"Upload-Offset": str(offset)},
+        )
+        self.offset = offset
+
+
+class UploadSessionLimitError(HTTPException):
+    """429 raised when a tenant has too many sessions or staged bytes open."""
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(status_code=429, detail=detail)
+
+
+def _try_lock(f: BinaryIO) -> bool:
+    """Take an exclusive lock on ``f`` without waiting (released on close)."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _still_at(path: str, f: BinaryIO) -> bool:
+    """Whether ``path`` still names open file ``f`` (not renamed or removed)."""
+    try:
+        return os.stat(path).st_ino == os.fstat(f.fileno()).st_ino
+    except OSError:
+        return False
+
+
+@dataclass
+class UploadSession:
+    """One resumable upload as recorded in its metadata file."""
+
+    session_id: str
+    tenant_id: str
+    filename: str
+    # Collection as the client named it (not the gateway-facing name).
+    collection: str
+    size: int
+    created_at: float
+    # Bytes received so far; derived from the .part file, not stored.
+    offset: int = 0
+    # Last time a chunk arrived (or the session was created).
+    updated_at: float = 0.0
+
+
+class ResumableUploadStore:
+    """Upload sessions stored under ``root/<tenant>/``.
+
+    ``max_file_bytes`` caps the declared size of one upload (0 = unlimited)
+    and ``max_chunk_bytes`` the body of one chunk request. Per tenant,
+    ``max_sessions`` caps open sessions and ``max_staged_bytes`` the sum of
+    their declared sizes (0 = unlimited). Those two are checked per process;
+    creates racing on different workers can overshoot by a session.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        session_ttl: float = 86400.0,
+        max_file_bytes: int = 0,
+        max_chunk_bytes: int = 8 * 1024 * 1024,
+        max_sessions: int = 0,
+        max_staged_bytes: int = 0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._root = root
+        self._session_ttl = session_ttl
+        self._max_file_bytes = max_file_bytes
+        self._max_chunk_bytes = max_chunk_bytes
+        self._max_sessions = max_sessions
+        self._max_staged_bytes = max_staged_bytes
+        self._clock = clock
+        # Serializes the per-tenant quota check with the create it admits.
+        self._create_lock = threading.Lock()
+        # Per-process guard against two requests writing the same session.
+        self._writing: set[str] = set()
+        self._created = 0
+        self._completed = 0
+        self._purged = 0
+        self._rejected_quota = 0
+        self._reopened = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ResumableUploadStore":
+        return cls(
+            settings.resumable_upload_dir
+            or os.path.join(tempfile.gettempdir(), "intramind-uploads"),
+            session_ttl=settings.resumable_session_ttl_seconds,
+            max_file_bytes=settings.resumable_upload_max_bytes,
+            max_chunk_bytes=settings.resumable_chunk_max_bytes,
+            max_sessions=settings.resumable_max_sessions_per_tenant,
+            max_staged_bytes=settings.resumable_max_staged_bytes_per_tenant,
+        )
+
+    @property
+    def session_ttl(self) -> float:
+        return self._session_ttl
+
+    def _tenant_dir(self, tenant_id: str) -> str:
+        # Hashed so any tenant id maps to a safe, fixed-length directory name.
+        return os.path.join(self._root, hashlib.sha256(tenant_id.encode()).hexdigest()[:32])
+
+    def _paths(self, tenant_id: str, session_id: str) -> tuple[str, str]:
+        base = os.path.join(self._tenant_dir(tenant_id), session_id)
+        return f"{base}.json", f"{base}.part"
+
+    def _expired(self, mtime: float) -> bool:
+        return self._session_ttl > 0 and mtime <= self._clock() - self._session_ttl
+
+    def _open_sessions(self, tenant_id: str) -> tuple[int, int]:
+        """``(sessions, declared bytes)`` of the tenant's unexpired sessions."""
+        sessions = staged = 0
+        try:
+            entries = list(os.scandir(self._tenant_dir(tenant_id)))
+        except OSError:
+            return 0, 0
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if self._expired(entry.stat().st_mtime):
+                    continue
+                with open(entry.path) as f:
+                    staged += int(json.load(f).get("size", 0))
+            except (OSError, ValueError):
+                continue
+            sessions += 1
+        return sessions, staged
+
+    def create(
+        self,
+        tenant_id: str,
+        filename: str,
+        collection: str,
+        size: int,
+        max_bytes: Optional[int] = None,
+    ) -> UploadSession:
+        """Start a session for a ``size``-byte file.
+
+        ``max_bytes`` (the tenant's limit) replaces ``max_file_bytes`` when
+        given. Raises UploadTooLargeError if the file is too big and
+        UploadSessionLimitError if the tenant's session quota is used up.
+        """
+        if size < 0:
+            raise HTTPException(status_code=422, detail="Upload size must not be negative")
+        limit = self._max_file_bytes if max_bytes is None else max_bytes
+        if limit > 0 and size > limit:
+            raise UploadTooLargeError(limit, size)
+        self.purge_expired()
+        with self._create_lock:
+            self._check_quota(tenant_id, size)
+            return self._create(tenant_id, filename, collection, size)
+
+    def _check_quota(self, tenant_id: str, size: int) -> None:
+        if self._max_sessions <= 0 and self._max_staged_bytes <= 0:
+            return
+        sessions, staged = self._open_sessions(tenant_id)
+        if 0 < self._max_sessions <= sessions:
+            self._rejected_quota += 1
+            raise UploadSessionLimitError(
+                f"Too many open upload sessions (limit {self._max_sessions}). "
+                "Complete or cancel one first."
+            )
+        if 0 < self._max_staged_bytes < staged + size:
+            self._rejected_quota += 1
+            raise UploadSessionLimitError(
+                f"Open upload sessions would stage {staged + size} bytes "
+                f"(limit {self._max_staged_bytes}). Complete or cancel one first."
+            )
+
+    def _create(self, tenant_id: str, filename: str, collection: str, size: int) -> UploadSession:
+        now = self._clock()
+        session = UploadSession(
+            session_id=os.urandom(16).hex(),
+            tenant_id=tenant_id,
+            filename=filename,
+            collection=collection,
+            size=size,
+            created_at=now,
+            updated_at=now,
+        )
+        os.makedirs(self._tenant_dir(tenant_id), exist_ok=True)
+        meta_path, part_path = self._paths(tenant_id, session.session_id)
+        open(part_path, "xb").close()
+        self._write_metadata(session, meta_path, "x")
+        self._created += 1
+        return session
+
+    @staticmethod
+    def _write_metadata(session: UploadSession, meta_path: str, mode: str) -> None:
+        metadata = asdict(session)
+        del metadata["offset"], metadata["updated_at"]
+        with open(meta_path, mode) as f:
+            json.dump(metadata, f)
+
+    def get(self, session_id: str, tenant_id: str) -> Optional[UploadSession]:
+        """Return the tenant's session, or None if unknown, foreign or expired."""
+        if not _SESSION_ID.match(session_id):
+            return None
+        meta_path, part_path = self._paths(tenant_id, session_id)
+        try:
+            with open(meta_path) as f:
+                metadata = json.load(f)
+            stat = os.stat(part_path)
+        except (OSError, ValueError):
+            return None
+        if metadata.get("tenant_id") != tenant_id:
+            return None
+        if self._expired(stat.st_mtime):
+            self._remove(meta_path, part_path)
+            self._purged += 1
+            return None
+        return UploadSession(offset=stat.st_size, updated_at=stat.st_mtime, **metadata)
+
+    async def append(
+        self, session: UploadSession, offset: int, chunks: AsyncIterator[bytes]
+    ) -> int:
+        """Write one chunk at ``offset``; return the new offset.
+
+        The chunk must start exactly where the previous one ended
+        (:class:`UploadOffsetMismatchError` otherwise). If the body is cut
+        off, too large or runs past the declared size, the partial chunk is
+        discarded so the client can resend it from the same offset.
+        """
+        if offset != session.offset:
+            raise UploadOffsetMismatchError(session.offset)
+        if session.session_id in self._writing:
+            raise UploadOffsetMismatchError(
+                session.offset, "Another chunk is already being written to this session"
+            )
+        # Claimed before the first await, so a concurrent request in this
+        # process sees it; the flock below covers other workers.
+        self._writing.add(session.session_id)
+        try:
+            return await self._append(session, offset, chunks)
+        finally:
+            self._writing.discard(session.session_id)
+
+    async def _append(
+        self, session: UploadSession, offset: int, chunks: AsyncIterator[bytes]
+    ) -> int:
+        meta_path, part_path = self._paths(session.tenant_id, session.session_id)
+        try:
+            f = await asyncio.to_thread(open, part_path, "r+b")
+        except FileNotFoundError:
+            raise _session_gone(session)
+        try:
+            if not await asyncio.to_thread(_try_lock, f):
+                raise UploadOffsetMismatchError(
+                    offset, "Another chunk is already being written to this session"
+                )
+            # Another worker may have completed the session, or stored a
+            # chunk, since ``session`` was read.
+            if not _still_at(part_path, f):
+                raise _session_gone(session)
+            stored = os.fstat(f.fileno()).st_size
+            if stored != offset:
+                raise UploadOffsetMismatchError(stored)
+        except BaseException:
+            await asyncio.to_thread(f.close)
+            raise
+        try:
+            await asyncio.to_thread(f.seek, offset)
+            received = 0
+            block = bytearray()
+            async for piece in chunks:
+                received += len(piece)
+                if self._max_chunk_bytes > 0 and received > self._max_chunk_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Chunk exceeds maximum chunk size ({self._max_chunk_bytes} bytes)",
+                    )
+                if offset + received > session.size:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Chunk runs past the declared upload size ({session.size} bytes)",
+                    )
+                block += piece
+                if len(block) >= _WRITE_BLOCK:
+                    await asyncio.to_thread(f.write, bytes(block))
+                    block.clear()
+            if block:
+                await asyncio.to_thread(f.write, bytes(block))
+        except BaseException:
+            await asyncio.to_thread(f.truncate, offset)
+            raise
+        finally:
+            await asyncio.to_thread(f.close)
+
+        # Keep the metadata as fresh as the data so GC treats them alike.
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        session.offset = offset + received
+        session.updated_at = self._clock()
+        return session.offset
+
+    def complete(self, session: UploadSession) -> tuple[str, str]:
+        """Close a fully received session; return ``(file_path, sha256)``.
+
+        The data file is renamed out of the session (keeping the upload's
+        extension for the parsers) and is owned by the caller from then on.
+        A session another request already completed or cancelled raises a
+        404; one still being written to, a 409.
+        """
+        if session.offset != session.size:
+            raise UploadOffsetMismatchError(
+                session.offset,
+                f"Upload is incomplete: received {session.offset} of {session.size} bytes",
+            )
+        if session.session_id in self._writing:
+            raise UploadOffsetMismatchError(
+                session.offset, "A chunk is still being written to this session"
+            )
+        meta_path, part_path = self._paths(session.tenant_id, session.session_id)
+        digest = hashlib.sha256()
+        extension = os.path.splitext(session.filename)[1].lower()
+        ready_path = os.path.join(
+            self._tenant_dir(session.tenant_id), f"{session.session_id}.ready{extension}"
+        )
+        try:
+            with open(part_path, "rb") as f:
+                if not _try_lock(f):
+                    raise UploadOffsetMismatchError(
+                        session.offset, "A chunk is still being written to this session"
+                    )
+                if not _still_at(part_path, f):
+                    raise _session_gone(session)
+                stored = os.fstat(f.fileno()).st_size
+                if stored != session.size:
+                    raise UploadOffsetMismatchError(
+                        stored, f"Upload is incomplete: received {stored} of {session.size} bytes"
+                    )
+                while block := f.read(_WRITE_BLOCK):
+                    digest.update(block)
+                # Renamed while still locked; a request that opened the file
+                # meanwhile finds it gone once it gets the lock.
+                os.replace(part_path, ready_path)
+        except FileNotFoundError:
+            raise _session_gone(session)
+        self._remove(meta_path)
+        self._completed += 1
+        return ready_path, digest.hexdigest()
+
+    def reopen(self, session: UploadSession, file_path: str) -> None:
+        """Undo :meth:`complete`: put ``file_path`` back as the session's data.
+
+        For when the completed file could not be handed on (e.g. the
+        ingestion queue was full), so the client can retry ``complete``
+        instead of uploading everything again.
+        """
+        meta_path, part_path = self._paths(session.tenant_id, session.session_id)
+        os.replace(file_path, part_path)
+        os.utime(part_path)  # a fresh TTL for the retry
+        self._write_metadata(session, meta_path, "w")
+        self._completed -= 1
+        self._reopened += 1
+
+    def abort(self, session: UploadSession) -> None:
+        """Discard a session and everything received for it."""
+        self._remove(*self._paths(session.tenant_id, session.session_id))
+
+    def purge_expired(self) -> int:
+        """Remove staging files untouched for the TTL; return sessions dropped.
+
+        Also catches completed files whose ingestion never cleaned up (e.g.
+        after a crash), since those are never touched again either.
+        """
+        if self._session_ttl <= 0:
+            return 0
+        purged = 0
+        try:
+            tenant_dirs = [entry.path for entry in os.scandir(self._root) if entry.is_dir()]
+        except OSError:
+            return 0
+        for tenant_dir in tenant_dirs:
+            for entry in os.scandir(tenant_dir):
+                try:
+                    expired = self._expired(entry.stat().st_mtime)
+                except OSError:
+                    continue
+                if expired:
+                    self._remove(entry.path)
+                    purged += entry.name.endswith(".json")
+            try:
+                os.rmdir(tenant_dir)  # only succeeds once the tenant has no files
+            except OSError:
+                pass
+        self._purged += purged
+        return purged
+
+    @staticmethod
+    def _remove(*paths: str) -> None:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "created": self._created,
+            "completed": self._completed,
+            "purged": self._purged,
+            "writing": len(self._writing),
+            "max_file_bytes": self._max_file_bytes,
+            "max_chunk_bytes": self._max_chunk_bytes,
+            "max_sessions_per_tenant": self._max_sessions,
+            "max_staged_bytes_per_tenant": self._max_staged_bytes,
+            "rejected_quota": self._rejected_quota,
+            "reopened": self._reopened,
+        }
+
+
+def _session_gone(session: UploadSession) -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail=f"Upload session '{session.session_id}' was already completed or cancelled",
+    )
+
+
+_store: Optional[ResumableUploadStore] = None
+
+
+def get_resumable_store() -> ResumableUploadStore:
+    global _store
+    if _store is None:
+        _store = ResumableUploadStore.from_settings(get_settings())
+    return _store
+
+
+_purge_task: asyncio.Task | None = None
+
+
+async def _purge_upload_sessions(store: ResumableUploadStore, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = await asyncio.to_thread(store.purge_expired)
+        except Exception as exc:
+            logger.warning("Upload session purge failed: %s", exc)
+        else:
+            if purged:
+                logger.info("Purged %d abandoned upload sessions", purged)
+
+
+def start_upload_session_purge() -> None:
+    """Delete abandoned sessions every ``resumable_purge_interval_seconds``."""
+    global _purge_task
+    interval = get_settings().resumable_purge_interval_seconds
+    if interval <= 0 or _purge_task is not None:
+        return
+    _purge_task = asyncio.get_running_loop().create_task(
+        _purge_upload_sessions(get_resumable_store(), interval)
+    )
+
+
+async def stop_upload_session_purge() -> None:
+    global _purge_task
+    if _purge_task is not None:
+        _purge_task.cancel()
+        try:
+            await _purge_task
+        except asyncio.CancelledError:
+            pass
+        _purge_task = None
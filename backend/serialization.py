@@ -0,0 +1,46 @@
+"""Direct JSON serialization for response models.
+
+When a route declares ``response_model``, FastAPI re-validates the returned
+value against it and then serializes it (on older FastAPI releases through
+``jsonable_encoder`` and stdlib ``json``). For models we built ourselves that
+work is redundant. :class:`ModelJSONResponse` writes pydantic models, and
+lists of them, straight to JSON bytes with pydantic-core's serializer. The
+bytes are identical to FastAPI's own ``response_model`` output. Routes keep
+their ``response_model`` so the OpenAPI schema is unchanged.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def dump_json(content: BaseModel | list[BaseModel]) -> bytes:
+    """Serialize a model, or a list of models of one type, to JSON bytes."""
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if not content:
+        return b"[]"
+    return _list_adapter(type(content[0])).dump_json(content)
+
+
+class ModelJSONResponse(JSONResponse):
+    """JSONResponse that serializes pydantic models without a dict round trip.
+
+    Any other content falls back to the stock JSONResponse encoding.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel) or (
+            isinstance(content, list) and (not content or isinstance(content[0], BaseModel))
+        ):
+            return dump_json(content)
+        return super().render(content)
@@ -0,0 +1,69 @@
+"""Coalesce identical concurrent calls into one.
+
+When a popular question goes out, many widget sessions send the same query at
+once. :class:`SingleFlight` lets the first caller for a key (the leader) run
+the work while later callers with the same key await the leader's result
+instead of starting their own agent call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _LeaderCancelled(Exception):
+    """Set on a flight whose leader went away before finishing."""
+
+
+class SingleFlight:
+    """Deduplicate concurrent in-flight calls by key."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Run ``fn`` once per concurrent ``key``.
+
+        Returns ``(result, shared)`` where ``shared`` is True for callers that
+        received another caller's result. Exceptions propagate to every
+        waiter. If the leader is cancelled (its client disconnected or hit
+        its deadline), waiters start over: the first to wake runs its own
+        ``fn`` as the new leader and the rest wait on that.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self._coalesced += 1
+            try:
+                # shield: one waiter going away must not cancel the shared call.
+                return await asyncio.shield(future), True
+            except _LeaderCancelled:
+                return await self.do(key, fn)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._leaders += 1
+        try:
+            result = await fn()
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                future.set_exception(_LeaderCancelled())
+            else:
+                future.set_exception(exc)
+            # Mark retrieved so an unobserved failure does not log a warning.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self._leaders,
+            "coalesced": self._coalesced,
+        }
@@ -25,6 +25,16 @@ class Tenant:
     rate_limit_per_minute: int
     collection_prefix: str = ""
     namespace_separator: str = "__"
+    # Cap on concurrent chat agent calls; 0 means unlimited.
+    max_concurrent_requests: int = 0
+    # Seconds a chat / upload request may run before its agent work is
+    # cancelled with a 504; 0 means no deadline.
+    request_timeout_seconds: float = 0.0
+    upload_timeout_seconds: float = 0.0
+    # Largest accepted upload in bytes; 0 means no limit.
+    max_upload_bytes: int = 0
+    # Largest accepted resumable (chunked) upload in bytes; 0 means no limit.
+    max_resumable_upload_bytes: int = 0
     # True when this tenant came from the dev-mode fallback rather than a
     # configured key. Used only for logging / diagnostics.
     is_dev: bool = field(default=False, compare=False)
@@ -35,6 +45,11 @@ class Tenant:
             return ""
         return f"{self.collection_prefix}{self.namespace_separator}"
 
+    @property
+    def gateway_prefix(self) -> str:
+        """Prefix shared by every gateway collection this tenant owns ("" = all)."""
+        return self._full_prefix
+
     def namespaced(self, collection: str) -> str:
         """Return the gateway-facing collection name for this tenant."""
         prefix = self._full_prefix
@@ -1,8 +1,9 @@
 """Test configuration: make the backend package importable.
 
-These tests deliberately exercise the auth / tenancy / rate-limit modules in
-isolation, without importing the FastAPI routers (which pull in the heavy AI
-Agent stack). A minimal app is constructed per test for dependency coverage.
+Most tests exercise the backend modules in isolation, with a minimal app
+built per test for dependency coverage. Endpoint tests (``test_*_api.py``)
+mount the real routers with stand-in agents in place of the AI Agent stack,
+on apps built by the shared :func:`build_api_client` fixture.
 """
 
 import os
@@ -13,3 +14,85 @@ import sys
 BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if BACKEND_DIR not in sys.path:
     sys.path.insert(0, BACKEND_DIR)
+
+import json  # noqa: E402
+
+import pytest  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import auth  # noqa: E402
+import collection_cache  # noqa: E402
+import concurrency  # noqa: E402
+import conversation_state  # noqa: E402
+import conversations  # noqa: E402
+import deadlines  # noqa: E402
+import ingestion_jobs  # noqa: E402
+import response_cache  # noqa: E402
+import resumable_uploads  # noqa: E402
+import upload_dedup  # noqa: E402
+from api import chat  # noqa: E402
+from config import get_settings  # noqa: E402
+from singleflight import SingleFlight  # noqa: E402
+
+# The tenant every endpoint test authenticates as.
+API_KEY = "sk-acme-123"
+HEADERS = {"X-API-Key": API_KEY}
+# A second tenant, for checking that one tenant cannot see another's data.
+OTHER_API_KEY = "sk-globex-456"
+OTHER_HEADERS = {"X-API-Key": OTHER_API_KEY}
+
+
+@pytest.fixture
+def build_api_client(monkeypatch, tmp_path):
+    """Build a TestClient serving ``routers`` with fresh singletons.
+
+    ``tenant`` overrides fields of the "acme" tenant behind :data:`API_KEY`
+    ("globex", behind :data:`OTHER_API_KEY`, keeps the defaults); other
+    keywords become ``WEB_UI_*`` settings. Resumable uploads are
+    staged under ``tmp_path``. Use the client as a context manager when the
+    test needs the ingestion queue, whose workers live on the app's loop.
+    """
+    def build(*routers, tenant=None, **settings) -> TestClient:
+        tenant_config = {"tenant_id": "acme", "name": "Acme", **(tenant or {})}
+        env = {
+            "api_keys": json.dumps({
+                API_KEY: tenant_config,
+                OTHER_API_KEY: {"tenant_id": "globex", "name": "Globex"},
+            }),
+            "auth_dev_mode": False,
+            "rate_limit_enabled": False,
+            "resumable_upload_dir": str(tmp_path / "uploads"),
+            **settings,
+        }
+        for name, value in env.items():
+            monkeypatch.setenv(f"WEB_UI_{name.upper()}", str(value))
+        get_settings.cache_clear()
+
+        for module, name in (
+            (auth, "_auth_manager"), (auth, "_rate_limiter"), (auth, "_cost_model"),
+            (collection_cache, "_cache"), (concurrency, "_limiter"),
+            (conversations, "_store"), (conversation_state, "_backend"),
+            (deadlines, "_canceller"), (ingestion_jobs, "_queue"),
+            (resumable_uploads, "_store"), (response_cache, "_cache"),
+            (upload_dedup, "_index"),
+        ):
+            monkeypatch.setattr(module, name, None)
+        monkeypatch.setattr(conversation_state, "_backend_built", False)
+        monkeypatch.setattr(upload_dedup, "_index_built", False)
+        monkeypatch.setattr(chat, "_chat_flights", SingleFlight())
+        auth.configure(get_settings())
+
+        app = FastAPI()
+        for router in routers:
+            app.include_router(router)
+
+        async def stop_ingestion_workers() -> None:
+            await ingestion_jobs.get_ingestion_queue().stop()
+
+        app.router.on_shutdown.append(stop_ingestion_workers)
+
+        return TestClient(app)
+
+    yield build
+    get_settings.cache_clear()
@@ -0,0 +1,76 @@
+"""Unit tests for the pre-warmed agent pool."""
+
+import asyncio
+
+import pytest
+
+from agent_pool import AgentPool
+
+
+class _Factory:
+    def __init__(self, fail_first: int = 0):
+        self.built = 0
+        self.fail_first = fail_first
+
+    def __call__(self):
+        self.built += 1
+        if self.built <= self.fail_first:
+            raise RuntimeError("agent init failed")
+        return object()
+
+
+def test_warm_builds_pool_and_checkouts_reuse_agents():
+    factory = _Factory()
+    pool = AgentPool(factory, size=2)
+
+    async def scenario():
+        await pool.warm()
+        seen = set()
+        for _ in range(5):
+            async with pool.checkout() as agent:
+                seen.add(id(agent))
+        return seen
+
+    seen = asyncio.run(scenario())
+    assert factory.built == 2
+    assert len(seen) <= 2
+    stats = pool.stats()
+    assert stats["created"] == 2 and stats["available"] == 2
+    assert stats["checkouts"] == 5
+    assert stats["avg_construction_ms"] is not None
+
+
+def test_checkout_builds_lazily_then_waits_when_exhausted():
+    factory = _Factory()
+    pool = AgentPool(factory, size=1)
+    order = []
+
+    async def use(name, delay):
+        async with pool.checkout():
+            order.append(f"{name}-start")
+            await asyncio.sleep(delay)
+            order.append(f"{name}-end")
+
+    async def scenario():
+        await asyncio.gather(use("a", 0.02), use("b", 0.0))
+
+    asyncio.run(scenario())
+    assert factory.built == 1
+    assert order == ["a-start", "a-end", "b-start", "b-end"]
+    assert pool.stats()["in_use"] == 0
+
+
+def test_failed_warm_up_keeps_built_agents_and_recovers_on_demand():
+    factory = _Factory(fail_first=1)
+    pool = AgentPool(factory, size=2)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await pool.warm()
+        assert pool.stats()["available"] == 1
+        async with pool.checkout():
+            async with pool.checkout():
+                pass
+
+    asyncio.run(scenario())
+    assert pool.stats()["created"] == 2
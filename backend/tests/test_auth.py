@@ -1,10 +1,12 @@
 """Unit tests for API key resolution and the rate limiter."""
 
+import asyncio
 import json
+import os
 
 import pytest
 
-from auth import AuthManager, RateLimitError, SlidingWindowRateLimiter
+from auth import AuthManager, KeyFileWatcher, RateLimitError, SlidingWindowRateLimiter
 from config import Settings
 
 
@@ -79,6 +81,83 @@ def test_invalid_key_config_raises():
         AuthManager(_settings(api_keys=json.dumps({"k": {"name": "no tenant id"}})))
 
 
+def test_keys_file_resolves_and_takes_precedence(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"sk-file-1": {"tenant_id": "file"}}))
+    mgr = AuthManager(
+        _settings(
+            api_keys=json.dumps({"sk-env-1": {"tenant_id": "env"}}),
+            api_keys_file=str(path),
+        )
+    )
+    assert mgr.resolve("sk-file-1").tenant_id == "file"
+    assert mgr.resolve("sk-env-1") is None
+
+
+def test_many_keys_resolve_without_storing_raw_keys():
+    keys = {f"sk-{i}": {"tenant_id": f"t{i}"} for i in range(1000)}
+    mgr = AuthManager(_settings(api_keys=json.dumps(keys)))
+
+    assert mgr.resolve("sk-0").tenant_id == "t0"
+    assert mgr.resolve("sk-999").tenant_id == "t999"
+    assert mgr.resolve("sk-1000") is None
+    # The index is keyed by digest, never by the plaintext key.
+    assert "sk-0" not in mgr._tenants
+
+
+def test_reload_swaps_in_new_keys(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"sk-old": {"tenant_id": "old"}}))
+    mgr = AuthManager(_settings(api_keys_file=str(path)))
+
+    path.write_text(json.dumps({"sk-new": {"tenant_id": "new"}}))
+    assert mgr.reload() is True
+
+    assert mgr.resolve("sk-old") is None
+    assert mgr.resolve("sk-new").tenant_id == "new"
+    stats = mgr.stats()
+    assert stats["key_count"] == 1
+    assert stats["reload_count"] == 1
+    assert stats["last_reload_seconds"] is not None
+
+
+def test_invalid_reload_keeps_previous_keys(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"sk-old": {"tenant_id": "old"}}))
+    mgr = AuthManager(_settings(api_keys_file=str(path)))
+
+    path.write_text(json.dumps({"sk-new": {"name": "missing tenant id"}}))
+    assert mgr.reload() is False
+
+    assert mgr.resolve("sk-old").tenant_id == "old"
+    assert mgr.stats()["reload_failures"] == 1
+    assert mgr.stats()["last_reload_error"]
+
+
+def test_key_file_watcher_picks_up_changes(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"sk-old": {"tenant_id": "old"}}))
+    mgr = AuthManager(_settings(api_keys_file=str(path)))
+
+    async def scenario():
+        watcher = KeyFileWatcher(mgr, str(path), interval=0.01)
+        watcher.start()
+        try:
+            path.write_text(json.dumps({"sk-new": {"tenant_id": "new"}}))
+            # Bump mtime explicitly in case the filesystem has coarse stamps.
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+            for _ in range(200):
+                if mgr.resolve("sk-new") is not None:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await watcher.stop()
+
+    asyncio.run(scenario())
+    assert mgr.resolve("sk-new").tenant_id == "new"
+
+
 def test_rate_limiter_blocks_after_limit():
     limiter = SlidingWindowRateLimiter()
     # 2 requests allowed, 3rd should be blocked.
@@ -101,3 +180,108 @@ def test_rate_limiter_zero_means_unlimited():
     limiter = SlidingWindowRateLimiter()
     for _ in range(100):
         limiter.check("acme", 0)  # should never raise
+
+
+class _FakeClock:
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_rate_limiter_slides_previous_window():
+    clock = _FakeClock(0.0)
+    limiter = SlidingWindowRateLimiter(clock=clock)
+    for _ in range(10):
+        limiter.check("acme", 10)
+
+    # Halfway into the next window, half of the previous count still applies.
+    clock.now = 90.0
+    for _ in range(5):
+        limiter.check("acme", 10)
+    with pytest.raises(RateLimitError) as exc:
+        limiter.check("acme", 10)
+    retry_after = int(exc.value.headers["Retry-After"])
+    assert 1 <= retry_after <= 60
+
+    clock.now = 90.0 + retry_after
+    limiter.check("acme", 10)
+
+
+def test_rate_limiter_retry_after_when_current_window_full():
+    clock = _FakeClock(10.0)
+    limiter = SlidingWindowRateLimiter(clock=clock)
+    limiter.check("acme", 1)
+    with pytest.raises(RateLimitError) as exc:
+        limiter.check("acme", 1)
+    # Must wait out the rest of this window plus the previous window's decay.
+    assert exc.value.headers["Retry-After"] == "110"
+
+
+def test_rate_limiter_evicts_idle_tenants():
+    clock = _FakeClock(0.0)
+    limiter = SlidingWindowRateLimiter(clock=clock)
+    limiter.check("acme", 5)
+    limiter.check("globex", 5)
+
+    clock.now = 61.0
+    limiter.check("globex", 5)
+    assert limiter.evict_idle() == 0  # acme's hits still weigh on the window
+
+    clock.now = 125.0
+    limiter.check("globex", 5)
+    assert limiter.evict_idle() == 1
+    assert len(limiter) == 1
+
+
+def test_rate_limiter_charges_cost_units():
+    limiter = SlidingWindowRateLimiter()
+    limiter.check("acme", 10, cost=6)
+    with pytest.raises(RateLimitError):
+        limiter.check("acme", 10, cost=5)
+    limiter.check("acme", 10, cost=4)
+
+
+def test_cost_above_limit_is_capped_to_budget():
+    clock = _FakeClock(0.0)
+    limiter = SlidingWindowRateLimiter(clock=clock)
+    limiter.check("acme", 10, cost=50)
+    with pytest.raises(RateLimitError):
+        limiter.check("acme", 10)
+
+
+def test_cost_model_longest_prefix_and_upload_size():
+    from ratelimit import CostModel
+
+    model = CostModel(
+        route_costs={"/api/chat": 5, "/api/chat/health": 0, "/api/upload": 10},
+        bytes_per_unit=1024,
+    )
+    assert model.cost("/api/validate") == 1
+    assert model.cost("/api/chat") == 5
+    assert model.cost("/api/chat/health") == 0
+    assert model.cost("/api/upload", content_length=3000) == 13
+    # Body size only weighs on uploads.
+    assert model.cost("/api/chat", content_length=3000) == 5
+
+
+def test_sharded_limiter_matches_single_lock_decisions():
+    import random
+
+    rng = random.Random(7)
+    clock = _FakeClock(0.0)
+    single = SlidingWindowRateLimiter(clock=clock, shards=1)
+    sharded = SlidingWindowRateLimiter(clock=clock, shards=64)
+
+    def outcome(limiter, tenant_id):
+        try:
+            limiter.check(tenant_id, 5)
+            return None
+        except RateLimitError as exc:
+            return exc.headers["Retry-After"]
+
+    for _ in range(5000):
+        clock.now += rng.random() * 0.5
+        tenant_id = f"t{rng.randrange(50)}"
+        assert outcome(single, tenant_id) == outcome(sharded, tenant_id)
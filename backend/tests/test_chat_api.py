@@ -0,0 +1,431 @@
+"""End-to-end tests for the chat endpoints with a stand-in agent.
+
+Mounts the real ``api.chat`` router on a throwaway app (plus the upload and
+collections routers where a test changes a collection). The AI Agent is
+replaced by :class:`_Agent`, which answers with the query it was asked.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import auth
+import conversation_state
+import conversations
+import deadlines
+from api import chat, collections, upload
+from conftest import HEADERS
+from gateway import gateway_client
+from ingestion_executor import IngestionExecutor
+
+
+class _Agent:
+    """Stand-in IntraMindAgent: answers ``answer to <query>`` after ``delay``.
+
+    Queries starting with ``fail`` raise; ``hang`` ones take five seconds.
+    """
+
+    delay = 0.0
+
+    def __init__(self, thread_id=None):
+        self.thread_id = thread_id
+        self.queries = []
+
+    async def search(self, query, collection_name, num_results, min_score):
+        self.queries.append(query)
+        await asyncio.sleep(self.delay)
+        if query.startswith("hang"):
+            await asyncio.sleep(5)
+        if query.startswith("fail"):
+            raise RuntimeError("vector store unreachable")
+        return {
+            "final_response": f"answer to {query}",
+            "search_results": [{
+                "id": "d1",
+                "content": "Refunds within 30 days.",
+                "score": 0.9,
+                "metadata": {"title": "Policy", "source": "policy.pdf", "chunk_id": "c1"},
+            }],
+            "query_classification": {"complexity": "simple"},
+        }
+
+
+class _StreamingAgent(_Agent):
+    async def stream_search(self, query, collection_name, num_results, min_score):
+        for word in ("answer ", "to ", query):
+            yield {"type": "token", "content": word}
+        yield {"type": "result", "result": await self.search(
+            query, collection_name, num_results, min_score
+        )}
+
+
+@pytest.fixture
+def make_client(build_api_client, monkeypatch):
+    """Build a TestClient for the chat router with ``agent`` and settings."""
+
+    def build(agent=_Agent, tenant=None, **settings) -> TestClient:
+        monkeypatch.setattr(chat, "AI_AGENT_AVAILABLE", True)
+        monkeypatch.setattr(chat, "IntraMindAgent", agent, raising=False)
+        return build_api_client(chat.router, tenant=tenant, **settings)
+
+    return build
+
+
+def _events(body: str) -> list:
+    """Parse an SSE body into ``(event, data)`` pairs."""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _stream(client: TestClient, query: str = "refund policy") -> list:
+    resp = client.post(
+        "/api/chat/stream", headers=HEADERS, json={"query": query, "collection": "docs"}
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    return _events(resp.text)
+
+
+def test_stream_frames_tokens_then_citations_metadata_and_done(make_client):
+    events = _stream(make_client(agent=_StreamingAgent))
+
+    names = [name for name, _ in events]
+    assert names == ["start", "token", "token", "token", "citations", "metadata", "done"]
+    conversation_id = events[0][1]["conversationId"]
+    assert "".join(data["text"] for name, data in events if name == "token") == (
+        "answer to refund policy"
+    )
+    assert events[4][1][0]["metadata"]["collection"] == "docs"
+    assert events[5][1] == {"queryComplexity": "simple", "safetyFlag": None}
+    assert events[-1][1] == {
+        "response": "answer to refund policy", "conversationId": conversation_id,
+    }
+
+
+def test_stream_falls_back_to_one_delta_without_stream_search(make_client):
+    events = _stream(make_client())
+
+    assert [name for name, _ in events] == ["start", "token", "citations", "metadata", "done"]
+    assert events[1][1] == {"text": "answer to refund policy"}
+    assert events[-1][1]["response"] == "answer to refund policy"
+
+
+def test_stream_agent_error_ends_with_error_event(make_client):
+    events = _stream(make_client(), query="fail please")
+
+    assert [name for name, _ in events] == ["start", "error"]
+    assert events[-1][1]["status"] == 500
+    assert "vector store unreachable" in events[-1][1]["error"]
+
+
+def test_stream_deadline_ends_with_504_event(make_client, monkeypatch):
+    monkeypatch.setattr(_Agent, "delay", 1.0)
+    client = make_client(tenant={"request_timeout_seconds": 0.05})
+
+    events = _stream(client)
+
+    assert [name for name, _ in events] == ["start", "error"]
+    assert events[-1][1]["status"] == 504
+    stats = deadlines.get_request_canceller().stats()["chat_stream"]
+    assert stats["cancelled_deadline"] == 1
+
+
+def _batch(client: TestClient, *queries: str, ordered: bool = True):
+    return client.post(
+        f"/api/chat/batch?ordered={str(ordered).lower()}",
+        headers=HEADERS,
+        json={"requests": [{"query": query, "collection": "docs"} for query in queries]},
+    )
+
+
+def test_batch_lists_results_in_request_order(make_client, monkeypatch):
+    monkeypatch.setattr(_Agent, "delay", 0.01)
+    resp = _batch(make_client(), "first", "second", "third")
+
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert [r["response"]["response"] for r in results] == [
+        "answer to first", "answer to second", "answer to third",
+    ]
+
+
+def test_unordered_batch_streams_one_ndjson_line_per_item(make_client):
+    resp = _batch(make_client(), "first", "second", ordered=False)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert sorted(
+        (line["index"], line["response"]["response"]) for line in lines
+    ) == [(0, "answer to first"), (1, "answer to second")]
+
+
+def test_failing_batch_item_reports_an_error_without_failing_the_rest(make_client):
+    resp = _batch(make_client(), "first", "fail please", "third")
+
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert results[1]["response"] is None
+    assert "vector store unreachable" in results[1]["error"]
+    assert [results[i]["response"]["response"] for i in (0, 2)] == [
+        "answer to first", "answer to third",
+    ]
+    assert results[0]["error"] is None
+
+
+def test_hanging_batch_item_times_out_on_the_tenant_deadline(make_client):
+    client = make_client(tenant={"request_timeout_seconds": 0.05})
+
+    started = time.monotonic()
+    resp = _batch(client, "refund policy", "hang on", "returns")
+    assert time.monotonic() - started < 1
+
+    first, hung, last = resp.json()["results"]
+    assert first["response"]["response"] == "answer to refund policy"
+    assert hung["response"] is None and "within 0.05 seconds" in hung["error"]
+    assert last["response"]["response"] == "answer to returns"
+    stats = deadlines.get_request_canceller().stats()["chat_batch_item"]
+    assert stats["cancelled_deadline"] == 1
+
+
+def test_unordered_batch_streams_past_a_hanging_item(make_client):
+    client = make_client(tenant={"request_timeout_seconds": 0.05})
+
+    started = time.monotonic()
+    resp = _batch(client, "hang on", "refund policy", ordered=False)
+    assert time.monotonic() - started < 1
+
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["index"] for line in lines] == [1, 0]
+    assert "within 0.05 seconds" in lines[1]["error"]
+
+
+def test_batch_over_the_item_limit_is_rejected(make_client):
+    resp = _batch(make_client(chat_batch_max_items=2), "a", "b", "c")
+
+    assert resp.status_code == 422
+    assert "maximum is 2" in resp.json()["detail"]
+
+
+def test_batch_is_charged_once_per_item(make_client):
+    client = make_client(tenant={"rate_limit_per_minute": 5}, rate_limit_enabled=True)
+
+    assert _batch(client, "a", "b", "c", "d", "e").status_code == 200
+    # The batch used the whole budget; nothing was charged on top of it.
+    assert _batch(client, "f").status_code == 429
+
+
+def test_batch_over_the_whole_budget_is_rejected_up_front(make_client):
+    client = make_client(tenant={"rate_limit_per_minute": 5}, rate_limit_enabled=True)
+
+    resp = _batch(client, "a", "b", "c", "d", "e", "f")
+    assert resp.status_code == 413
+    assert "Split it" in resp.json()["detail"]
+    # Not charged: the whole budget is still available.
+    assert _batch(client, "a", "b", "c", "d", "e").status_code == 200
+
+
+class _HistoryAgent(_Agent):
+    """Stand-in agent that is handed resumed history through ``search``."""
+
+    histories = []
+
+    async def search(
+        self, query, collection_name, num_results, min_score, conversation_history=None
+    ):
+        self.histories.append(conversation_history)
+        return await super().search(query, collection_name, num_results, min_score)
+
+
+def _ask(client: TestClient, query: str, conversation_id=None) -> dict:
+    resp = client.post("/api/chat", headers=HEADERS, json={
+        "query": query, "collection": "docs", "conversationId": conversation_id,
+    })
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_conversation_resumes_on_another_agent_with_its_history(make_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(_HistoryAgent, "histories", [])
+    client = make_client(
+        agent=_HistoryAgent,
+        conversation_backend="sqlite",
+        conversation_sqlite_path=str(tmp_path / "conversations.db"),
+    )
+
+    _ask(client, "refund policy", "conv_1")
+    _ask(client, "and for gift cards?", "conv_1")
+    # Another worker: no local agent for the conversation, same backend.
+    monkeypatch.setattr(conversations, "_store", None)
+    assert _ask(client, "who approves it?", "conv_1")["response"] == "answer to who approves it?"
+    _ask(client, "thanks", "conv_1")
+
+    assert _HistoryAgent.histories == [None, None, [
+        {"query": "refund policy", "response": "answer to refund policy"},
+        {"query": "and for gift cards?", "response": "answer to and for gift cards?"},
+    ], None]
+
+
+def test_first_turn_without_an_id_is_resumable_on_another_worker(
+    make_client, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(_HistoryAgent, "histories", [])
+    client = make_client(
+        agent=_HistoryAgent,
+        conversation_backend="sqlite",
+        conversation_sqlite_path=str(tmp_path / "conversations.db"),
+    )
+
+    conversation_id = _ask(client, "refund policy")["conversationId"]
+    monkeypatch.setattr(conversations, "_store", None)
+    _ask(client, "and for gift cards?", conversation_id)
+
+    assert _HistoryAgent.histories == [None, [
+        {"query": "refund policy", "response": "answer to refund policy"},
+    ]]
+
+
+def test_agent_without_history_support_resumes_from_empty_memory(
+    make_client, monkeypatch, tmp_path, caplog
+):
+    client = make_client(
+        conversation_backend="sqlite",
+        conversation_sqlite_path=str(tmp_path / "conversations.db"),
+    )
+    chat.check_history_support()
+    assert "takes no conversation_history" in caplog.text
+
+    conversation_id = _ask(client, "refund policy")["conversationId"]
+    monkeypatch.setattr(conversations, "_store", None)
+    # _Agent.search has no conversation_history: the turn is still answered.
+    assert _ask(client, "who approves it?", conversation_id)["response"] == (
+        "answer to who approves it?"
+    )
+    backend = conversation_state.get_conversation_backend()
+    assert backend.load(f"acme:{conversation_id}")[1] == 2
+
+
+def test_coalesced_follower_still_answers_when_the_leader_disconnects(make_client, monkeypatch):
+    monkeypatch.setattr(_Agent, "delay", 0.05)
+    make_client(chat_coalesce_enabled=True)
+    tenant = auth.get_auth_manager().resolve(HEADERS["X-API-Key"])
+    request = chat.ChatRequest(query="refund policy", collection="docs")
+
+    async def scenario():
+        leader = asyncio.create_task(chat._answer(request, tenant))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(chat._answer(request, tenant))
+        await asyncio.sleep(0.01)
+        leader.cancel()  # what the canceller does when its client goes away
+        return await follower
+
+    response = asyncio.run(scenario())
+    assert response.response == "answer to refund policy"
+    assert response.queryComplexity == "simple"
+
+
+def test_first_turns_with_client_generated_ids_share_one_agent_call(make_client, monkeypatch):
+    monkeypatch.setattr(_Agent, "delay", 0.05)
+    searches = []
+    search = _Agent.search
+
+    async def counted(self, *args, **kwargs):
+        searches.append(self.thread_id)
+        return await search(self, *args, **kwargs)
+
+    monkeypatch.setattr(_Agent, "search", counted)
+    make_client(chat_coalesce_enabled=True)
+    tenant = auth.get_auth_manager().resolve(HEADERS["X-API-Key"])
+
+    def widget_turn(conversation_id: str) -> chat.ChatRequest:
+        # What the widget posts: its conversationId exists from the first message.
+        return chat.ChatRequest.model_validate({
+            "query": "refund policy", "collection": "docs", "conversationId": conversation_id,
+        })
+
+    async def scenario():
+        return await asyncio.gather(
+            chat._answer(widget_turn("conv_1760000000000_a1b2c3d4e"), tenant),
+            chat._answer(widget_turn("conv_1760000000000_f5g6h7i8j"), tenant),
+        )
+
+    first, second = asyncio.run(scenario())
+    assert len(searches) == 1
+    assert first.response == second.response == "answer to refund policy"
+    assert {first.conversationId, second.conversationId} == {
+        "conv_1760000000000_a1b2c3d4e", "conv_1760000000000_f5g6h7i8j",
+    }
+
+    # A follow-up in the conversation that ran the search has history, so it
+    # does not share a new conversation's answer.
+    leader = searches[0].split(":", 1)[1]
+
+    async def follow_up():
+        return await asyncio.gather(
+            chat._answer(widget_turn(leader), tenant),
+            chat._answer(widget_turn("conv_1760000000001_k9l0m1n2o"), tenant),
+        )
+
+    asyncio.run(follow_up())
+    assert len(searches) == 3
+
+
+class _IngestAgent:
+    async def ingest_document(self, file_path, collection_name, original_filename):
+        return {"chunks_stored": 1, "document_id": f"doc-{original_filename}"}
+
+
+class _Gateway:
+    async def delete_collection(self, name):
+        return None
+
+
+def test_cached_answers_are_dropped_when_the_collection_changes(make_client, monkeypatch):
+    searches = []
+    search = _Agent.search
+
+    async def counted(self, *args, **kwargs):
+        searches.append(self.thread_id)
+        return await search(self, *args, **kwargs)
+
+    monkeypatch.setattr(_Agent, "search", counted)
+    monkeypatch.setattr(upload, "AI_AGENT_AVAILABLE", True)
+    monkeypatch.setattr(
+        upload, "_ingestion_executor", IngestionExecutor(_IngestAgent, mode="inline", workers=1)
+    )
+    with make_client(chat_cache_enabled=True) as client:
+        client.app.include_router(upload.router)
+        client.app.include_router(collections.router)
+        client.app.dependency_overrides[gateway_client] = _Gateway
+        turn = iter(range(100))
+
+        def ask() -> dict:
+            # Each call is the first message of a new widget conversation.
+            return _ask(client, "refund policy", f"conv_1760000000000_{next(turn)}")
+
+        ask()
+        assert ask()["conversationId"] == "conv_1760000000000_1"
+        assert len(searches) == 1  # answered from the cache
+
+        uploaded = client.post(
+            "/api/upload",
+            headers=HEADERS,
+            params={"wait": "true"},
+            data={"collection": "docs"},
+            files={"file": ("policy.txt", b"Refunds within 60 days.", "text/plain")},
+        )
+        assert uploaded.status_code == 200
+        ask()
+        ask()
+        assert len(searches) == 2
+
+        assert client.delete("/api/collections/docs", headers=HEADERS).status_code == 200
+        ask()
+        assert len(searches) == 3
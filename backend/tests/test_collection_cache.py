@@ -0,0 +1,239 @@
+"""Unit tests for the shared collection list cache."""
+
+import asyncio
+from types import SimpleNamespace
+
+from collection_cache import CollectionListCache
+from tenancy import Tenant
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _tenant(tenant_id: str, prefix: str) -> Tenant:
+    return Tenant(
+        tenant_id=tenant_id,
+        name=tenant_id.title(),
+        rate_limit_per_minute=60,
+        collection_prefix=prefix,
+    )
+
+
+def _col(name: str, count: int = 0) -> SimpleNamespace:
+    return SimpleNamespace(collection_name=name, vector_count=count)
+
+
+class _Gateway:
+    """Counts fetches and returns whatever collections ``names`` holds."""
+
+    def __init__(self, *names: str) -> None:
+        self.names = list(names)
+        self.calls = 0
+        self.release = None
+        self.fail = False
+
+    async def fetch(self) -> list:
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise RuntimeError("gateway down")
+        return [_col(name) for name in self.names]
+
+
+ACME = _tenant("acme", "acme")
+GLOBEX = _tenant("globex", "globex")
+DEV = _tenant("dev", "")
+
+
+async def _names(cache: CollectionListCache, tenant: Tenant, gateway: _Gateway) -> list:
+    records, _ = await cache.page(tenant, gateway.fetch)
+    return [r.collection_name for r in records]
+
+
+def test_fresh_list_is_served_from_memory_for_every_tenant():
+    async def scenario():
+        clock = _Clock()
+        cache = CollectionListCache(ttl=10, stale_ttl=60, clock=clock)
+        gateway = _Gateway("acme__docs", "globex__wiki")
+
+        assert await _names(cache, ACME, gateway) == ["acme__docs"]
+        clock.now = 9
+        assert await _names(cache, GLOBEX, gateway) == ["globex__wiki"]
+        assert await _names(cache, DEV, gateway) == ["acme__docs", "globex__wiki"]
+        assert gateway.calls == 1
+        assert cache.stats()["hits"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_stale_list_is_served_while_it_refreshes():
+    async def scenario():
+        clock = _Clock()
+        cache = CollectionListCache(ttl=10, stale_ttl=60, clock=clock)
+        gateway = _Gateway("acme__docs")
+        await cache.page(ACME, gateway.fetch)
+
+        gateway.names.append("acme__hr")
+        clock.now = 30
+        assert await _names(cache, ACME, gateway) == ["acme__docs"]
+        assert await _names(cache, ACME, gateway) == ["acme__docs"]
+        await asyncio.sleep(0)
+        assert gateway.calls == 2  # one background refresh for both
+        assert await _names(cache, ACME, gateway) == ["acme__docs", "acme__hr"]
+        assert cache.stats()["stale_hits"] == 2
+        assert cache.stats()["refresh_changes"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_keeps_the_stale_list():
+    async def scenario():
+        clock = _Clock()
+        cache = CollectionListCache(ttl=10, stale_ttl=60, clock=clock)
+        gateway = _Gateway("acme__docs")
+        await cache.page(ACME, gateway.fetch)
+
+        gateway.fail = True
+        clock.now = 30
+        assert await _names(cache, ACME, gateway) == ["acme__docs"]
+        await asyncio.sleep(0)
+        assert cache.stats()["refresh_errors"] == 1
+        assert await _names(cache, ACME, gateway) == ["acme__docs"]
+
+    asyncio.run(scenario())
+
+
+def test_expired_list_is_fetched_on_the_request_path():
+    async def scenario():
+        clock = _Clock()
+        cache = CollectionListCache(ttl=10, stale_ttl=60, clock=clock)
+        gateway = _Gateway("acme__docs")
+        await cache.page(ACME, gateway.fetch)
+
+        gateway.names = ["acme__hr"]
+        clock.now = 71
+        assert await _names(cache, ACME, gateway) == ["acme__hr"]
+        assert cache.stats()["misses"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def scenario():
+        cache = CollectionListCache()
+        gateway = _Gateway("acme__docs", "globex__wiki")
+        gateway.release = asyncio.Event()
+
+        waiting = [
+            asyncio.create_task(_names(cache, tenant, gateway))
+            for tenant in (ACME, GLOBEX, ACME, DEV)
+        ]
+        await asyncio.sleep(0)
+        gateway.release.set()
+        assert await asyncio.gather(*waiting) == [
+            ["acme__docs"], ["globex__wiki"], ["acme__docs"], ["acme__docs", "globex__wiki"],
+        ]
+        assert gateway.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_creates_and_deletes_write_through():
+    async def scenario():
+        cache = CollectionListCache()
+        gateway = _Gateway("acme__docs", "globex__wiki")
+        await cache.page(ACME, gateway.fetch)
+
+        cache.upsert(_col("acme__hr"))
+        cache.remove("acme__docs")
+
+        assert await _names(cache, ACME, gateway) == ["acme__hr"]
+        assert await _names(cache, DEV, gateway) == ["acme__hr", "globex__wiki"]
+        assert gateway.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_serves_the_list_while_it_refreshes():
+    async def scenario():
+        cache = CollectionListCache()
+        gateway = _Gateway("acme__docs")
+        await cache.page(ACME, gateway.fetch)
+
+        cache.invalidate()
+        gateway.names.append("acme__hr")
+        # Served at once from the stale copy; no request waits on the gateway.
+        assert await _names(cache, ACME, gateway) == ["acme__docs"]
+        assert await _names(cache, GLOBEX, gateway) == []
+        await asyncio.sleep(0)
+        assert gateway.calls == 2
+        assert cache.stats()["misses"] == 1 and cache.stats()["stale_hits"] == 2
+        assert await _names(cache, ACME, gateway) == ["acme__docs", "acme__hr"]
+
+    asyncio.run(scenario())
+
+
+def test_uploads_update_the_document_count_in_place():
+    async def scenario():
+        cache = CollectionListCache()
+        gateway = _Gateway("acme__docs")
+        await cache.page(ACME, gateway.fetch)
+
+        cache.add_vectors("acme__docs", 12)
+        cache.add_vectors("acme__docs", 3)
+        records, _ = await cache.page(ACME, gateway.fetch)
+        assert records[0].vector_count == 15
+        assert gateway.calls == 1 and cache.stats()["hits"] == 1
+
+        # A collection the upload created is not indexed yet: refresh it.
+        cache.add_vectors("acme__new", 4)
+        await cache.page(ACME, gateway.fetch)
+        await asyncio.sleep(0)
+        assert gateway.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_writes_during_a_fetch_are_replayed_on_its_result():
+    async def scenario():
+        cache = CollectionListCache()
+        gateway = _Gateway("acme__docs", "acme__old")
+        gateway.release = asyncio.Event()
+
+        pending = asyncio.create_task(_names(cache, ACME, gateway))
+        await asyncio.sleep(0)
+        cache.upsert(_col("acme__hr"))
+        cache.remove("acme__old")
+        gateway.release.set()
+
+        # The fetched list predates both writes; they are applied on top.
+        assert await pending == ["acme__docs", "acme__hr"]
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_during_a_fetch_leaves_the_list_stale():
+    async def scenario():
+        cache = CollectionListCache()
+        gateway = _Gateway("acme__docs")
+        gateway.release = asyncio.Event()
+
+        pending = asyncio.create_task(_names(cache, ACME, gateway))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        gateway.release.set()
+        assert await pending == ["acme__docs"]
+
+        gateway.release = None
+        await cache.page(ACME, gateway.fetch)
+        await asyncio.sleep(0)
+        assert gateway.calls == 2
+        assert cache.stats()["stale_hits"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,109 @@
+"""Unit tests for the prefix-indexed collection index and its cursors."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from collection_index import CollectionIndex, decode_cursor, encode_cursor
+
+
+def _cols(*names: str) -> list:
+    return [SimpleNamespace(collection_name=name) for name in names]
+
+
+def _names(records: list) -> list:
+    return [r.collection_name for r in records]
+
+
+def _index() -> CollectionIndex:
+    return CollectionIndex(_cols(
+        "globex__wiki", "acme__hr", "acme__docs", "acmecorp__x", "acme__legal", "zeta",
+    ))
+
+
+def test_page_returns_only_the_prefix_range_in_name_order():
+    records, more = _index().page("acme__")
+
+    assert _names(records) == ["acme__docs", "acme__hr", "acme__legal"]
+    assert more is False
+
+
+def test_pages_follow_on_from_the_last_name():
+    index = _index()
+
+    first, more = index.page("acme__", limit=2)
+    assert _names(first) == ["acme__docs", "acme__hr"]
+    assert more is True
+
+    second, more = index.page("acme__", after="hr", limit=2)
+    assert _names(second) == ["acme__legal"]
+    assert more is False
+
+
+def test_exact_final_page_reports_no_more():
+    records, more = _index().page("acme__", after="docs", limit=2)
+
+    assert _names(records) == ["acme__hr", "acme__legal"]
+    assert more is False
+
+
+def test_empty_prefix_pages_through_everything():
+    index = _index()
+    seen, after, more = [], "", True
+    while more:
+        records, more = index.page("", after=after, limit=4)
+        seen += _names(records)
+        after = seen[-1]
+
+    assert seen == sorted(seen) and len(seen) == 6
+
+
+def test_unknown_prefix_is_empty():
+    assert _index().page("initech__") == ([], False)
+
+
+def test_sync_applies_only_the_differences():
+    index = _index()
+
+    changed = index.sync(_cols("acme__docs", "acme__new", "globex__wiki"))
+
+    assert changed == 5
+    assert _names(index.page("")[0]) == ["acme__docs", "acme__new", "globex__wiki"]
+
+
+def test_sync_replaces_records_of_unchanged_names():
+    index = CollectionIndex([SimpleNamespace(collection_name="acme__docs", vector_count=1)])
+
+    assert index.sync([SimpleNamespace(collection_name="acme__docs", vector_count=5)]) == 0
+    assert index.page("acme__")[0][0].vector_count == 5
+
+
+def test_large_sync_rebuilds():
+    names = [f"t{i:04d}__c" for i in range(200)]
+    index = CollectionIndex(_cols(*names[:50]))
+
+    assert index.sync(_cols(*reversed(names))) == 150
+    assert _names(index.page("")[0]) == names
+
+
+def test_upsert_and_remove():
+    index = _index()
+    index.upsert(SimpleNamespace(collection_name="acme__aaa"))
+    index.upsert(SimpleNamespace(collection_name="acme__aaa"))
+
+    assert index.remove("acme__hr") is True
+    assert index.remove("acme__hr") is False
+    assert _names(index.page("acme__")[0]) == ["acme__aaa", "acme__docs", "acme__legal"]
+    assert len(index) == 6
+
+
+def test_cursor_round_trip():
+    for name in ("docs", "Q3 reports/ü", ""):
+        assert decode_cursor(encode_cursor(name)) == name
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("%%%")
+    with pytest.raises(ValueError):
+        decode_cursor("_w")  # not UTF-8
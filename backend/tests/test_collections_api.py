@@ -0,0 +1,68 @@
+"""End-to-end tests for the collections listing with a stand-in gateway.
+
+Mounts the real ``api.collections`` router on a throwaway app, with the
+gateway client dependency overridden by :class:`_Gateway`.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import collections
+from conftest import HEADERS
+from gateway import gateway_client
+
+
+class _Gateway:
+    """Stand-in gateway listing five acme collections and one of globex's."""
+
+    names = ["acme__e", "acme__a", "globex__b", "acme__d", "acme__b", "acme__c"]
+
+    async def list_collections(self):
+        return [
+            SimpleNamespace(
+                collection_name=name,
+                vector_count=index,
+                created_at="2025-06-01T00:00:00Z",
+                description=None,
+            )
+            for index, name in enumerate(self.names)
+        ]
+
+
+@pytest.fixture(params=[10.0, 0.0], ids=["cached", "uncached"])
+def client(request, build_api_client) -> TestClient:
+    client = build_api_client(
+        collections.router, collections_cache_ttl_seconds=request.param
+    )
+    client.app.dependency_overrides[gateway_client] = _Gateway
+    return client
+
+
+def test_pages_chain_through_the_next_cursor(client):
+    names, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/api/collections", headers=HEADERS, params=params)
+        assert resp.status_code == 200
+        names += [c["name"] for c in resp.json()]
+        pages += 1
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert names == ["a", "b", "c", "d", "e"]
+    assert pages == 3
+
+
+def test_unpaged_listing_has_no_cursor(client):
+    resp = client.get("/api/collections", headers=HEADERS)
+    assert [c["name"] for c in resp.json()] == ["a", "b", "c", "d", "e"]
+    assert "X-Next-Cursor" not in resp.headers
+
+
+def test_malformed_cursor_is_a_400(client):
+    resp = client.get("/api/collections", headers=HEADERS, params={"cursor": "not base64!"})
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Invalid collections cursor"
@@ -0,0 +1,102 @@
+"""Unit tests for the per-tenant in-flight concurrency cap."""
+
+import asyncio
+
+import pytest
+
+from concurrency import OverloadedError, TenantConcurrencyLimiter
+from tenancy import Tenant
+
+
+def _tenant(tenant_id: str = "acme", cap: int = 1) -> Tenant:
+    return Tenant(
+        tenant_id=tenant_id,
+        name=tenant_id,
+        rate_limit_per_minute=60,
+        max_concurrent_requests=cap,
+    )
+
+
+def test_waiter_gets_slot_when_holder_finishes():
+    limiter = TenantConcurrencyLimiter(queue_size=4, queue_timeout=1.0)
+    tenant = _tenant(cap=1)
+    order = []
+
+    async def work(name, delay):
+        async with limiter.slot(tenant):
+            order.append(f"{name}-start")
+            await asyncio.sleep(delay)
+            order.append(f"{name}-end")
+
+    async def scenario():
+        await asyncio.gather(work("a", 0.02), work("b", 0.0))
+
+    asyncio.run(scenario())
+    assert order == ["a-start", "a-end", "b-start", "b-end"]
+    assert limiter.stats()["busy_tenants"] == 0
+
+
+def test_full_queue_fails_fast_with_503():
+    limiter = TenantConcurrencyLimiter(queue_size=1, queue_timeout=5.0)
+    tenant = _tenant(cap=1)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot(tenant):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        queued = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError) as exc:
+            async with limiter.slot(tenant):
+                pass
+        release.set()
+        await asyncio.gather(holder, queued)
+        return exc.value
+
+    err = asyncio.run(scenario())
+    assert err.status_code == 503
+    assert "Retry-After" in err.headers
+    assert limiter.stats()["rejected_queue_full"] == 1
+
+
+def test_wait_deadline_fails_with_503():
+    limiter = TenantConcurrencyLimiter(queue_size=4, queue_timeout=0.01)
+    tenant = _tenant(cap=1)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot(tenant):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError):
+            async with limiter.slot(tenant):
+                pass
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+    stats = limiter.stats()
+    assert stats["rejected_deadline"] == 1
+    assert stats["active"] == 0 and stats["queued"] == 0
+
+
+def test_caps_are_per_tenant_and_zero_is_unlimited():
+    limiter = TenantConcurrencyLimiter(queue_size=0, queue_timeout=1.0)
+
+    async def scenario():
+        async with limiter.slot(_tenant("acme", cap=1)):
+            # A different tenant is unaffected by acme's full cap.
+            async with limiter.slot(_tenant("globex", cap=1)):
+                pass
+            async with limiter.slot(_tenant("acme-unlimited", cap=0)):
+                pass
+
+    asyncio.run(scenario())
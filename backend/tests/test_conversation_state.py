@@ -0,0 +1,56 @@
+"""Unit tests for the shared SQLite conversation backend."""
+
+from conversation_state import SQLiteConversationBackend, build_conversation_backend
+from config import Settings
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_two_workers_share_history(tmp_path):
+    path = str(tmp_path / "conv.db")
+    worker_a = SQLiteConversationBackend(path)
+    worker_b = SQLiteConversationBackend(path)
+
+    assert worker_a.append_turn("acme:c1", "acme", {"query": "q1", "response": "r1"}) == 1
+    assert worker_b.turn_count("acme:c1") == 1
+    assert worker_b.append_turn("acme:c1", "acme", {"query": "q2", "response": "r2"}) == 2
+
+    turns, count = worker_a.load("acme:c1")
+    assert count == 2
+    assert [t["query"] for t in turns] == ["q1", "q2"]
+    # Keys are tenant-prefixed, so another tenant's id never matches.
+    assert worker_a.load("globex:c1") is None
+
+
+def test_history_is_trimmed_but_count_keeps_growing():
+    backend = SQLiteConversationBackend(":memory:", max_turns=2)
+    for i in range(5):
+        backend.append_turn("acme:c1", "acme", {"query": f"q{i}", "response": ""})
+    turns, count = backend.load("acme:c1")
+    assert count == 5
+    assert [t["query"] for t in turns] == ["q3", "q4"]
+
+
+def test_idle_conversations_expire_and_can_be_deleted():
+    clock = FakeClock()
+    backend = SQLiteConversationBackend(":memory:", idle_ttl=60, clock=clock)
+    backend.append_turn("acme:old", "acme", {"query": "q", "response": "r"})
+    clock.now += 30
+    backend.append_turn("acme:new", "acme", {"query": "q", "response": "r"})
+    clock.now += 45
+
+    assert backend.load("acme:old") is None
+    assert backend.turn_count("acme:new") == 1
+    assert backend.purge_expired() == 1
+    assert backend.delete("acme:new") is True
+    assert backend.delete("acme:new") is False
+
+
+def test_memory_backend_keeps_state_in_process():
+    assert build_conversation_backend(Settings(conversation_backend="memory")) is None
@@ -0,0 +1,80 @@
+"""Unit tests for the bounded conversation store."""
+
+import asyncio
+
+from conversations import ConversationStore, _purge_conversations
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_keeps_recently_used():
+    store = ConversationStore(max_entries=2, idle_ttl=0)
+    store.put("acme:a", "acme", "A")
+    store.put("acme:b", "acme", "B")
+    assert store.get("acme:a") == "A"  # a is now most recent
+
+    store.put("acme:c", "acme", "C")
+    assert "acme:b" not in store
+    assert store.get("acme:a") == "A"
+    assert store.stats()["evictions"]["lru"] == 1
+
+
+def test_idle_entries_expire():
+    clock = _Clock()
+    store = ConversationStore(max_entries=10, idle_ttl=60, clock=clock)
+    store.put("acme:a", "acme", "A")
+    store.put("acme:b", "acme", "B")
+
+    clock.now = 50
+    assert store.get("acme:b") == "B"
+    clock.now = 100
+    assert store.get("acme:a") is None
+    assert store.get("acme:b") == "B"
+    assert store.stats()["evictions"]["ttl"] == 1
+
+
+def test_per_tenant_quota_evicts_own_oldest():
+    store = ConversationStore(max_entries=10, idle_ttl=0, max_per_tenant=2)
+    store.put("globex:x", "globex", "X")
+    store.put("acme:a", "acme", "A")
+    store.put("acme:b", "acme", "B")
+    store.put("acme:c", "acme", "C")
+
+    assert "acme:a" not in store
+    assert "globex:x" in store
+    assert store.stats()["evictions"]["tenant_quota"] == 1
+
+
+def test_stats_report_hit_rate():
+    store = ConversationStore()
+    store.put("acme:a", "acme", "A")
+    store.get("acme:a")
+    store.get("acme:missing")
+    stats = store.stats()
+    assert stats["size"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert store.pop("acme:a") is True
+    assert store.pop("acme:a") is False
+
+
+def test_background_purge_drops_entries_nobody_looks_up():
+    clock = _Clock()
+    store = ConversationStore(max_entries=10, idle_ttl=60, clock=clock)
+    store.put("acme:a", "acme", "A")
+    clock.now = 61
+
+    async def scenario():
+        task = asyncio.create_task(_purge_conversations(store, 0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert len(store) == 0
+    assert store.stats()["evictions"]["ttl"] == 1
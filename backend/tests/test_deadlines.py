@@ -0,0 +1,78 @@
+"""Unit tests for request deadlines and disconnect cancellation."""
+
+import asyncio
+
+import pytest
+
+from deadlines import ClientDisconnectedError, DeadlineExceededError, RequestCanceller
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+def test_completed_work_returns_result():
+    canceller = RequestCanceller(poll_interval=0.01)
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    assert asyncio.run(canceller.run("chat", work(), FakeRequest(), timeout=1)) == "answer"
+    stats = canceller.stats()["chat"]
+    assert stats["completed"] == 1
+    assert stats["cancelled_deadline"] == stats["cancelled_disconnect"] == 0
+
+
+def test_deadline_cancels_work_with_504():
+    canceller = RequestCanceller()
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(DeadlineExceededError) as exc:
+        asyncio.run(canceller.run("chat", slow(), timeout=0.02))
+    assert exc.value.status_code == 504
+    assert cancelled == [True]
+    assert canceller.stats()["chat"]["cancelled_deadline"] == 1
+
+
+def test_disconnect_cancels_work_and_estimates_savings():
+    canceller = RequestCanceller(poll_interval=0.01)
+    request = FakeRequest()
+    cancelled = []
+
+    async def work(delay):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        # One completed call establishes the typical duration (~0.2s).
+        await canceller.run("chat", work(0.2), request)
+
+        async def leave():
+            await asyncio.sleep(0.02)
+            request.disconnected = True
+
+        leaver = asyncio.create_task(leave())
+        with pytest.raises(ClientDisconnectedError):
+            await canceller.run("chat", work(10), request)
+        await leaver
+
+    asyncio.run(scenario())
+    assert cancelled == [True]
+    stats = canceller.stats()["chat"]
+    assert stats["cancelled_disconnect"] == 1
+    assert 0.1 < stats["seconds_saved_estimate"] < 0.2
@@ -0,0 +1,121 @@
+"""Tests for the shared, pooled API Gateway client."""
+
+import asyncio
+import json
+
+import httpx
+
+from gateway import SharedGatewayClient
+
+
+class _StubGateway:
+    """Minimal HTTP/1.1 keep-alive server that counts TCP connections."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.connections = 0
+        self.headers_seen = []
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.url = f"http://127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while head := await reader.readuntil(b"\r\n\r\n"):
+                self.headers_seen.append(head.decode().lower())
+                await asyncio.sleep(self.delay)
+                body = json.dumps([{"collection_name": "docs"}]).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class _OwnClientGateway:
+    """Shaped like APIGatewayClient: builds its own httpx client."""
+
+    def __init__(self, url: str):
+        self._client = httpx.AsyncClient(base_url=url, headers={"X-Gateway-Key": "k"})
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+
+    async def list_collections(self):
+        response = await self._client.get("/api/collections")
+        response.raise_for_status()
+        return response.json()
+
+
+def test_calls_reuse_one_kept_alive_connection():
+    async def scenario():
+        async with _StubGateway() as server:
+            shared = SharedGatewayClient(lambda: _OwnClientGateway(server.url))
+            client = await shared.open()
+            for _ in range(20):
+                assert await client.list_collections() == [{"collection_name": "docs"}]
+            assert await shared.open() is client
+            stats = shared.stats()
+            await shared.close()
+            return server, stats
+
+    server, stats = asyncio.run(scenario())
+    assert server.connections == 1
+    # The gateway client's own base URL and headers are kept.
+    assert all("x-gateway-key: k" in head for head in server.headers_seen)
+    assert stats["pooled"] and stats["requests"] == 20
+    assert stats["in_flight"] == 0 and stats["connections_idle"] == 1
+
+
+def test_pool_limits_bound_concurrent_connections():
+    async def scenario():
+        async with _StubGateway(delay=0.05) as server:
+            shared = SharedGatewayClient(lambda: _OwnClientGateway(server.url), max_connections=2)
+            client = await shared.open()
+            await asyncio.gather(*(client.list_collections() for _ in range(8)))
+            stats = shared.stats()
+            await shared.close()
+            return server, stats
+
+    server, stats = asyncio.run(scenario())
+    assert server.connections == 2
+    assert stats["peak_in_flight"] == 8 and stats["connections_open"] == 2
+
+
+def test_injects_pool_when_constructor_accepts_http_client():
+    received = {}
+
+    class _InjectableGateway:
+        def __init__(self, http_client=None):
+            received["client"] = http_client
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            pass
+
+    async def scenario():
+        shared = SharedGatewayClient(_InjectableGateway)
+        await shared.open()
+        stats = shared.stats()
+        await shared.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert isinstance(received["client"], httpx.AsyncClient)
+    assert stats["pooled"] and stats["open"]
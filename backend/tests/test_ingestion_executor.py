@@ -0,0 +1,144 @@
+"""Tests for running ingestion off the serving event loop."""
+
+import asyncio
+import math
+import os
+import time
+
+import pytest
+
+from ingestion_executor import IngestionExecutor, IngestionWorkerCrashedError
+
+
+class _FakeAgent:
+    """Stand-in agent: CPU-bound parsing, optional progress, optional crash."""
+
+    async def ingest_document(self, file_path, collection_name, original_filename, progress_callback=None):
+        if file_path == "crash":
+            os._exit(1)  # a parser segfault / OOM kill
+        deadline = time.perf_counter() + (0.4 if file_path == "busy" else 0.0)
+        while time.perf_counter() < deadline:
+            pass  # synchronous parsing/OCR: never yields to the event loop
+        if progress_callback is not None:
+            progress_callback(0.5)
+        return {"chunks_stored": 3, "document_id": original_filename, "pid": os.getpid()}
+
+
+def _ingest(executor, file_path="doc.pdf", **kwargs):
+    return executor.ingest(
+        file_path=file_path, collection_name="docs", original_filename="doc.pdf", **kwargs
+    )
+
+
+def _chat_p99_during_ingestion(mode: str) -> float:
+    """p99 latency of a chat-like request (2 ms of awaited I/O) while a file ingests."""
+    executor = IngestionExecutor(_FakeAgent, mode=mode, workers=1)
+
+    async def scenario():
+        await executor.warm()
+        latencies = []
+        done = asyncio.Event()
+
+        async def chat_traffic():
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.002)
+                latencies.append(time.perf_counter() - started)
+
+        traffic = asyncio.create_task(chat_traffic())
+        await asyncio.sleep(0.02)
+        await _ingest(executor, "busy")
+        done.set()
+        await traffic
+        return latencies
+
+    try:
+        latencies = sorted(asyncio.run(scenario()))
+    finally:
+        executor.shutdown()
+    return latencies[math.ceil(0.99 * len(latencies)) - 1]
+
+
+def test_chat_p99_stays_flat_while_uploads_run():
+    # On the serving loop, one file stalls every chat request for its whole
+    # parse; off it, the loop keeps serving chat at close to its normal pace.
+    # Compared with each other rather than fixed numbers, so a slow CI box
+    # slows every mode alike.
+    inline = _chat_p99_during_ingestion("inline")
+    assert _chat_p99_during_ingestion("process") < inline / 4
+    assert _chat_p99_during_ingestion("thread") < inline / 4
+
+
+def test_result_of_a_cancelled_upload_is_delivered_late():
+    executor = IngestionExecutor(_FakeAgent, mode="thread", workers=1)
+
+    async def scenario():
+        late = asyncio.get_running_loop().create_future()
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(_ingest(executor, "busy", on_late_result=late.set_result), 0.05)
+        # The worker finished the file anyway; its result comes back on the loop.
+        return await asyncio.wait_for(late, 2)
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert result["chunks_stored"] == 3
+    assert executor.stats()["late_results"] == 1
+
+
+def test_worker_crash_fails_only_that_upload():
+    executor = IngestionExecutor(_FakeAgent, mode="process", workers=1)
+
+    async def scenario():
+        with pytest.raises(IngestionWorkerCrashedError):
+            await _ingest(executor, "crash")
+        # The pool is rebuilt, so the next upload succeeds.
+        return await _ingest(executor)
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert result["chunks_stored"] == 3 and result["pid"] != os.getpid()
+    stats = executor.stats()
+    assert stats["worker_crashes"] == 1 and stats["failed"] == 1 and stats["completed"] == 1
+
+
+def test_thread_workers_reuse_their_agent_and_report_progress():
+    executor = IngestionExecutor(_FakeAgent, mode="thread", workers=1)
+    reported = []
+
+    async def scenario():
+        await _ingest(executor, progress=reported.append)
+        return await _ingest(executor)
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert result["document_id"] == "doc.pdf"
+    assert reported == [0.5]
+
+
+def test_thread_workers_report_agent_construction_and_wait():
+    executor = IngestionExecutor(_FakeAgent, mode="thread", workers=1)
+
+    async def scenario():
+        # The second file waits for the only worker to finish the first.
+        await asyncio.gather(_ingest(executor, "busy"), _ingest(executor))
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    stats = executor.stats()
+    assert stats["agent_pool"] is None
+    workers = stats["worker_agents"]
+    assert workers["created"] == 1 and workers["avg_construction_ms"] is not None
+    assert workers["max_worker_wait_ms"] > 300
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        IngestionExecutor(_FakeAgent, mode="gpu")
@@ -0,0 +1,138 @@
+"""Unit tests for the background ingestion job queue."""
+
+import asyncio
+
+import pytest
+
+from ingestion_jobs import (
+    FAILED,
+    QUEUED,
+    SUCCEEDED,
+    IngestionJob,
+    IngestionQueue,
+    IngestionQueueFullError,
+    TenantIngestionLimitError,
+)
+
+
+def _job(tmp_path, job_id: str, tenant_id: str = "acme") -> IngestionJob:
+    path = tmp_path / f"{job_id}.txt"
+    path.write_text("content")
+    return IngestionJob(
+        job_id=job_id, tenant_id=tenant_id, filename="a.txt", collection="docs", file_path=str(path)
+    )
+
+
+def test_jobs_run_in_background_and_clean_up(tmp_path):
+    queue = IngestionQueue(workers=1, max_queued=4)
+
+    async def ok(job):
+        job.progress = 50
+        return {"chunks_stored": 3, "document_id": "doc-1"}
+
+    async def boom(job):
+        raise RuntimeError("parser crashed")
+
+    async def scenario():
+        good = queue.submit(_job(tmp_path, "good"), ok)
+        bad = queue.submit(_job(tmp_path, "bad"), boom)
+        assert good.status == QUEUED
+        await asyncio.wait_for(asyncio.gather(good.done.wait(), bad.done.wait()), 1)
+        await queue.stop()
+        return good, bad
+
+    good, bad = asyncio.run(scenario())
+    assert (good.status, good.progress, good.chunks_stored) == (SUCCEEDED, 100, 3)
+    assert bad.status == FAILED and "parser crashed" in bad.error
+    assert not (tmp_path / "good.txt").exists() and not (tmp_path / "bad.txt").exists()
+    stats = queue.stats()
+    assert stats["succeeded"] == 1 and stats["failed"] == 1
+
+
+def test_full_queue_rejects_with_503(tmp_path):
+    queue = IngestionQueue(workers=1, max_queued=1)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(job):
+            await release.wait()
+            return {}
+
+        first = queue.submit(_job(tmp_path, "first"), slow)
+        await asyncio.sleep(0)  # the worker picks up "first"
+        queue.submit(_job(tmp_path, "second"), slow)  # waits in the queue
+        with pytest.raises(IngestionQueueFullError) as exc:
+            queue.submit(_job(tmp_path, "third"), slow)
+        assert queue.stats()["queue_depth"] == 1
+        release.set()
+        await first.done.wait()
+        await queue.stop()
+        return exc.value
+
+    err = asyncio.run(scenario())
+    assert err.status_code == 503 and "Retry-After" in err.headers
+    assert queue.stats()["rejected_queue_full"] == 1
+
+
+def test_jobs_are_tenant_scoped(tmp_path):
+    queue = IngestionQueue(workers=1)
+
+    async def ok(job):
+        return {}
+
+    async def scenario():
+        job = queue.submit(_job(tmp_path, "j1", tenant_id="acme"), ok)
+        await job.done.wait()
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert queue.get("j1", "acme") is not None
+    assert queue.get("j1", "globex") is None
+
+
+def test_shutdown_fails_unstarted_jobs(tmp_path):
+    queue = IngestionQueue(workers=1)
+
+    async def scenario():
+        async def hang(job):
+            await asyncio.sleep(10)
+
+        running = queue.submit(_job(tmp_path, "running"), hang)
+        waiting = queue.submit(_job(tmp_path, "waiting"), hang)
+        await asyncio.sleep(0)
+        await queue.stop()
+        return running, waiting
+
+    running, waiting = asyncio.run(scenario())
+    assert running.status == waiting.status == FAILED
+    assert not (tmp_path / "waiting.txt").exists()
+
+
+def test_one_tenant_cannot_fill_the_queue_for_others(tmp_path):
+    queue = IngestionQueue(workers=1, max_queued=10, max_per_tenant=2)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(job):
+            await release.wait()
+            return {}
+
+        first = queue.submit(_job(tmp_path, "a1"), slow)
+        await asyncio.sleep(0)  # the worker picks up "a1"; it still counts
+        queue.submit(_job(tmp_path, "a2"), slow)
+        with pytest.raises(TenantIngestionLimitError) as exc:
+            queue.submit(_job(tmp_path, "a3"), slow)
+        other = queue.submit(_job(tmp_path, "g1", tenant_id="globex"), slow)
+        release.set()
+        await asyncio.wait_for(asyncio.gather(first.done.wait(), other.done.wait()), 1)
+        # A finished job frees its tenant's slot.
+        queue.submit(_job(tmp_path, "a4"), slow)
+        await queue.stop()
+        return exc.value
+
+    err = asyncio.run(scenario())
+    assert err.status_code == 429 and "Retry-After" in err.headers
+    stats = queue.stats()
+    assert stats["rejected_tenant_limit"] == 1 and stats["rejected_queue_full"] == 0
@@ -0,0 +1,158 @@
+"""Tests for the shared (Redis-protocol) rate limiter with batched leases.
+
+Runs against a tiny in-process stand-in that implements the handful of Redis
+commands the limiter uses, so no server is needed.
+"""
+
+import asyncio
+
+import pytest
+
+from ratelimit import RateLimitError, RedisRateLimiter
+
+
+class FakeRedis:
+    """In-process stand-in for ``redis.asyncio.Redis`` (counters only)."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, int] = {}
+        self.round_trips = 0
+        self.fail = False
+
+    async def _call(self, op, *args):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return op(*args)
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _incrby(self, key, amount):
+        self.data[key] = self.data.get(key, 0) + amount
+        return self.data[key]
+
+    def _decrby(self, key, amount):
+        return self._incrby(key, -amount)
+
+    def _expire(self, key, seconds):
+        return True
+
+    async def decrby(self, key, amount):
+        self.round_trips += 1
+        return await self._call(self._decrby, key, amount)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._ops = []
+
+    def get(self, key):
+        self._ops.append((self._redis._get, (key,)))
+
+    def incrby(self, key, amount):
+        self._ops.append((self._redis._incrby, (key, amount)))
+
+    def decrby(self, key, amount):
+        self._ops.append((self._redis._decrby, (key, amount)))
+
+    def expire(self, key, seconds):
+        self._ops.append((self._redis._expire, (key, seconds)))
+
+    async def execute(self):
+        if not self._ops:
+            return []
+        self._redis.round_trips += 1
+        if self._redis.fail:
+            raise ConnectionError("redis down")
+        return [op(*args) for op, args in self._ops]
+
+
+class _Clock:
+    def __init__(self, now: float = 1_000_020.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _admitted(limiter, tenant_id, limit, attempts):
+    async def run():
+        ok = 0
+        for _ in range(attempts):
+            try:
+                await limiter.acquire(tenant_id, limit)
+                ok += 1
+            except RateLimitError:
+                pass
+        return ok
+
+    return asyncio.run(run())
+
+
+def test_leases_batch_tokens_to_save_round_trips():
+    redis = FakeRedis()
+    limiter = RedisRateLimiter(redis, lease_size=5, clock=_Clock())
+
+    assert _admitted(limiter, "acme", 100, 10) == 10
+    assert redis.round_trips == 2
+
+
+def test_workers_share_one_budget():
+    redis = FakeRedis()
+    clock = _Clock()
+    workers = [RedisRateLimiter(redis, lease_size=3, clock=clock) for _ in range(3)]
+
+    admitted = sum(_admitted(w, "acme", 10, 10) for w in workers)
+    # Three in-process limiters would admit 30; the shared one admits 10.
+    assert admitted == 10
+
+
+def test_exhausted_budget_raises_with_retry_after():
+    redis = FakeRedis()
+    limiter = RedisRateLimiter(redis, lease_size=2, clock=_Clock())
+    assert _admitted(limiter, "acme", 4, 4) == 4
+
+    with pytest.raises(RateLimitError) as exc:
+        asyncio.run(limiter.acquire("acme", 4))
+    assert int(exc.value.headers["Retry-After"]) >= 1
+
+
+def test_maintain_returns_unused_tokens():
+    redis = FakeRedis()
+    clock = _Clock()
+    idle = RedisRateLimiter(redis, lease_size=5, lease_seconds=1.0, clock=clock)
+    busy = RedisRateLimiter(redis, lease_size=5, lease_seconds=1.0, clock=clock)
+
+    assert _admitted(idle, "acme", 6, 1) == 1  # reserves 5, uses 1
+    assert _admitted(busy, "acme", 6, 6) == 1
+
+    clock.now += 2.0
+    asyncio.run(idle.maintain())
+    assert _admitted(busy, "acme", 6, 6) == 4
+
+
+def test_falls_back_to_local_limiter_when_unreachable():
+    redis = FakeRedis()
+    redis.fail = True
+    limiter = RedisRateLimiter(redis, lease_size=5, clock=_Clock())
+
+    assert _admitted(limiter, "acme", 3, 5) == 3
+
+
+def test_cost_consumes_multiple_leased_tokens():
+    redis = FakeRedis()
+    limiter = RedisRateLimiter(redis, lease_size=5, clock=_Clock())
+
+    async def run():
+        await limiter.acquire("acme", 10, cost=3)
+        await limiter.acquire("acme", 10, cost=3)
+        await limiter.acquire("acme", 10, cost=3)
+        with pytest.raises(RateLimitError):
+            await limiter.acquire("acme", 10, cost=3)
+
+    asyncio.run(run())
+    assert sum(redis.data.values()) == 9
@@ -6,7 +6,7 @@ Builds a throwaway app wired only to the dependency, so we cover the real
 
 import json
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.testclient import TestClient
 
 import auth
@@ -30,6 +30,21 @@ def _build_client(**settings_overrides) -> TestClient:
     async def protected(tenant: Tenant = Depends(auth.require_tenant)):
         return {"tenant": tenant.tenant_id}
 
+    @app.post("/api/upload")
+    async def upload(tenant: Tenant = Depends(auth.require_tenant)):
+        return {"tenant": tenant.tenant_id}
+
+    @app.post("/api/upload/raw")
+    async def upload_raw(request: Request, tenant: Tenant = Depends(auth.require_tenant)):
+        body = await request.body()
+        await auth.charge_unmetered_body(request, tenant, len(body))
+        return {"tenant": tenant.tenant_id}
+
+    @app.post("/batch/{items}")
+    async def batch(items: int, tenant: Tenant = Depends(auth.require_tenant)):
+        await auth.charge(tenant, items - 1)
+        return {"tenant": tenant.tenant_id}
+
     return TestClient(app, raise_server_exceptions=True)
 
 
@@ -68,3 +83,60 @@ def test_rate_limit_disabled_allows_many():
     headers = {"X-API-Key": "sk-acme-123"}
     for _ in range(5):
         assert client.get("/protected", headers=headers).status_code == 200
+
+
+def test_weighted_routes_draw_down_budget_faster():
+    client = _build_client(
+        default_rate_limit_per_minute=10,
+        rate_limit_route_costs={"/api/upload": 4},
+        rate_limit_upload_bytes_per_unit=100,
+    )
+    headers = {"X-API-Key": "sk-acme-123"}
+    # 4 (route) + 1 (<=100 bytes) = 5 units each.
+    assert client.post("/api/upload", headers=headers, content=b"x" * 50).status_code == 200
+    assert client.post("/api/upload", headers=headers, content=b"x" * 50).status_code == 200
+    resp = client.get("/protected", headers=headers)
+    assert resp.status_code == 429
+
+
+def test_charge_draws_extra_units_after_admission():
+    client = _build_client(default_rate_limit_per_minute=5)
+    headers = {"X-API-Key": "sk-acme-123"}
+    assert client.post("/batch/4", headers=headers).status_code == 200
+    # One unit left: a 2-item batch passes admission but fails the top-up.
+    resp = client.post("/batch/2", headers=headers)
+    assert resp.status_code == 429
+    assert "Retry-After" in resp.headers
+
+
+def test_chunked_upload_pays_for_the_bytes_received():
+    client = _build_client(
+        default_rate_limit_per_minute=10,
+        rate_limit_route_costs={"/api/upload": 1},
+        rate_limit_upload_bytes_per_unit=100,
+    )
+    headers = {"X-API-Key": "sk-acme-123"}
+
+    def chunked(size: int):
+        # A generator body is sent with Transfer-Encoding: chunked.
+        yield b"x" * size
+
+    # 1 (route) + 4 (<=400 bytes) = 5 units, charged once the body is read.
+    resp = client.post("/api/upload/raw", headers=headers, content=chunked(400))
+    assert resp.status_code == 200
+    resp = client.post("/api/upload/raw", headers=headers, content=chunked(400))
+    assert resp.status_code == 200
+    assert client.get("/protected", headers=headers).status_code == 429
+
+
+def test_declared_length_is_not_charged_twice():
+    client = _build_client(
+        default_rate_limit_per_minute=10,
+        rate_limit_route_costs={"/api/upload": 1},
+        rate_limit_upload_bytes_per_unit=100,
+    )
+    headers = {"X-API-Key": "sk-acme-123"}
+    # 1 + 4 units each, all charged from Content-Length by require_tenant.
+    for _ in range(2):
+        assert client.post("/api/upload/raw", headers=headers, content=b"x" * 400).status_code == 200
+    assert client.get("/protected", headers=headers).status_code == 429
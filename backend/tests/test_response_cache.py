@@ -0,0 +1,76 @@
+"""Unit tests for the chat answer cache."""
+
+from response_cache import ChatResponseCache, normalize_query
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_normalized_queries_share_an_entry():
+    cache = ChatResponseCache()
+    cache.put("acme", "acme__docs", "What is  the PTO policy?", "answer")
+
+    assert cache.get("acme", "acme__docs", "what is the pto policy?") == "answer"
+    assert normalize_query("  A   b ") == "a b"
+
+
+def test_entries_are_tenant_and_collection_scoped():
+    cache = ChatResponseCache()
+    cache.put("acme", "acme__docs", "q", "answer")
+
+    assert cache.get("globex", "acme__docs", "q") is None
+    assert cache.get("acme", "acme__other", "q") is None
+
+
+def test_ttl_and_size_bounds():
+    clock = _Clock()
+    cache = ChatResponseCache(max_entries=2, ttl=10, clock=clock)
+    cache.put("acme", "c", "q1", 1)
+    cache.put("acme", "c", "q2", 2)
+    cache.put("acme", "c", "q3", 3)
+    assert cache.get("acme", "c", "q1") is None
+    assert cache.stats()["evictions"] == 1
+
+    clock.now = 11
+    assert cache.get("acme", "c", "q3") is None
+
+
+def test_invalidate_collection_drops_all_tenants_entries():
+    cache = ChatResponseCache()
+    cache.put("dev", "docs", "q", 1)
+    cache.put("other-unprefixed", "docs", "q", 2)
+    cache.put("dev", "notes", "q", 3)
+
+    assert cache.invalidate_collection("docs") == 2
+    assert cache.get("dev", "docs", "q") is None
+    assert cache.get("dev", "notes", "q") == 3
+    stats = cache.stats()
+    assert stats["invalidations"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_answer_from_before_an_invalidation_is_not_cached():
+    cache = ChatResponseCache()
+    generation = cache.generation("acme__docs")  # search starts
+    cache.invalidate_collection("acme__docs")  # upload lands mid-search
+    cache.put("acme", "acme__docs", "q", "stale answer", generation)
+
+    assert cache.get("acme", "acme__docs", "q") is None
+    assert cache.stats()["stale_puts_skipped"] == 1
+
+    cache.put("acme", "acme__docs", "q", "fresh", cache.generation("acme__docs"))
+    assert cache.get("acme", "acme__docs", "q") == "fresh"
+
+
+def test_invalidating_one_collection_keeps_others_cacheable():
+    cache = ChatResponseCache()
+    generation = cache.generation("acme__hr")
+    cache.invalidate_collection("acme__docs")
+    cache.put("acme", "acme__hr", "q", "answer", generation)
+
+    assert cache.get("acme", "acme__hr", "q") == "answer"
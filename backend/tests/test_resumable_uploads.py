@@ -0,0 +1,206 @@
+"""Unit tests for resumable upload sessions."""
+
+import asyncio
+import dataclasses
+import hashlib
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from resumable_uploads import (
+    ResumableUploadStore,
+    UploadOffsetMismatchError,
+    UploadSessionLimitError,
+    _purge_upload_sessions,
+    fcntl,
+)
+from upload_limits import UploadTooLargeError
+
+
+async def _body(*pieces: bytes):
+    for piece in pieces:
+        yield piece
+
+
+def _append(store, session, offset, *pieces):
+    return asyncio.run(store.append(session, offset, _body(*pieces)))
+
+
+def test_chunks_resume_from_offset_and_complete(tmp_path):
+    store = ResumableUploadStore(str(tmp_path))
+    data = b"0123456789" * 3
+    session = store.create("acme", "manual.pdf", "docs", len(data))
+
+    assert _append(store, session, 0, data[:10], data[10:12]) == 12
+    # A new request (e.g. after reconnecting) sees the stored offset.
+    resumed = store.get(session.session_id, "acme")
+    assert resumed.offset == 12 and resumed.filename == "manual.pdf"
+
+    with pytest.raises(UploadOffsetMismatchError) as exc:
+        _append(store, resumed, 0, data)
+    assert exc.value.status_code == 409 and exc.value.headers["Upload-Offset"] == "12"
+
+    _append(store, resumed, 12, data[12:])
+    path, content_hash = store.complete(resumed)
+    assert path.endswith(".pdf")
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert content_hash == hashlib.sha256(data).hexdigest()
+    assert store.get(session.session_id, "acme") is None
+
+
+def test_failed_chunk_is_discarded(tmp_path):
+    store = ResumableUploadStore(str(tmp_path), max_chunk_bytes=8)
+    session = store.create("acme", "a.txt", "docs", 20)
+    _append(store, session, 0, b"abcd")
+
+    with pytest.raises(HTTPException) as exc:
+        _append(store, session, 4, b"efgh", b"ijklm")  # 9 bytes > 8
+    assert exc.value.status_code == 413
+    assert store.get(session.session_id, "acme").offset == 4
+
+    _append(store, session, 4, b"x" * 8)
+    _append(store, session, 12, b"y" * 4)
+    with pytest.raises(HTTPException) as exc:
+        _append(store, session, 16, b"z" * 5)  # past the declared 20 bytes
+    assert exc.value.status_code == 400
+    assert store.get(session.session_id, "acme").offset == 16
+
+    with pytest.raises(UploadOffsetMismatchError):
+        store.complete(store.get(session.session_id, "acme"))
+
+
+def test_sessions_are_tenant_scoped_and_bounded(tmp_path):
+    store = ResumableUploadStore(str(tmp_path), max_file_bytes=100)
+    session = store.create("acme", "a.txt", "docs", 10)
+    assert store.get(session.session_id, "globex") is None
+    assert store.get("../../etc/passwd", "acme") is None
+    with pytest.raises(UploadTooLargeError):
+        store.create("acme", "big.pdf", "docs", 101)
+
+    store.abort(session)
+    assert store.get(session.session_id, "acme") is None
+
+
+def test_abandoned_sessions_are_garbage_collected(tmp_path):
+    store = ResumableUploadStore(str(tmp_path), session_ttl=60)
+    old = store.create("acme", "a.txt", "docs", 10)
+    _append(store, old, 0, b"abc")
+    for path in tmp_path.rglob(f"{old.session_id}*"):
+        os.utime(path, (path.stat().st_atime, path.stat().st_mtime - 61))
+
+    fresh = store.create("globex", "b.txt", "docs", 10)  # creating purges
+    assert store.get(old.session_id, "acme") is None
+    assert not list(tmp_path.rglob(f"{old.session_id}*"))
+    assert store.get(fresh.session_id, "globex") is not None
+    assert store.stats()["purged"] == 1
+
+
+def test_background_purge_removes_sessions_nobody_creates_after(tmp_path):
+    store = ResumableUploadStore(str(tmp_path), session_ttl=60)
+    old = store.create("acme", "a.txt", "docs", 10)
+    _append(store, old, 0, b"abc")
+    for path in tmp_path.rglob(f"{old.session_id}*"):
+        os.utime(path, (path.stat().st_atime, path.stat().st_mtime - 61))
+
+    async def scenario():
+        task = asyncio.create_task(_purge_upload_sessions(store, 0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert not list(tmp_path.rglob(f"{old.session_id}*"))
+    assert store.stats()["purged"] == 1
+
+
+def test_reopened_session_can_be_completed_again(tmp_path):
+    store = ResumableUploadStore(str(tmp_path))
+    session = store.create("acme", "a.txt", "docs", 3)
+    _append(store, session, 0, b"abc")
+    file_path, content_hash = store.complete(session)
+    assert store.get(session.session_id, "acme") is None
+
+    store.reopen(session, file_path)
+    again = store.get(session.session_id, "acme")
+    assert again is not None and again.offset == 3
+    assert store.complete(again)[1] == content_hash
+    assert store.stats()["reopened"] == 1
+
+
+def test_tenant_limits_cap_size_sessions_and_staged_bytes(tmp_path):
+    store = ResumableUploadStore(str(tmp_path), max_sessions=2, max_staged_bytes=100)
+    with pytest.raises(UploadTooLargeError):
+        store.create("acme", "a.pdf", "docs", 51, max_bytes=50)
+
+    first = store.create("acme", "a.pdf", "docs", 60)
+    with pytest.raises(UploadSessionLimitError):
+        store.create("acme", "b.pdf", "docs", 41)  # 101 bytes staged
+    store.create("acme", "b.pdf", "docs", 40)
+    with pytest.raises(UploadSessionLimitError) as exc:
+        store.create("acme", "c.pdf", "docs", 0)  # third session
+    assert exc.value.status_code == 429
+    # Other tenants have quotas of their own; finishing a session frees one.
+    store.create("globex", "c.pdf", "docs", 100)
+    store.abort(first)
+    store.create("acme", "c.pdf", "docs", 60)
+    assert store.stats()["rejected_quota"] == 2
+
+
+def test_concurrent_writers_are_turned_away(tmp_path):
+    store = ResumableUploadStore(str(tmp_path))
+    session = store.create("acme", "a.txt", "docs", 8)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_body():
+            yield b"abcd"
+            await release.wait()
+
+        first = asyncio.create_task(store.append(session, 0, slow_body()))
+        await asyncio.sleep(0)
+        # The second request is refused before it touches the file.
+        with pytest.raises(UploadOffsetMismatchError) as exc:
+            await store.append(session, 0, _body(b"wxyz"))
+        release.set()
+        return await first, exc.value
+
+    offset, err = asyncio.run(scenario())
+    assert offset == 4 and "already being written" in err.detail
+
+
+@pytest.mark.skipif(fcntl is None, reason="needs flock")
+def test_chunks_from_another_worker_are_serialized_by_the_file_lock(tmp_path):
+    store = ResumableUploadStore(str(tmp_path))
+    session = store.create("acme", "a.txt", "docs", 8)
+    _, part_path = store._paths("acme", session.session_id)
+
+    with open(part_path, "r+b") as other_worker:
+        fcntl.flock(other_worker, fcntl.LOCK_EX)
+        with pytest.raises(UploadOffsetMismatchError):
+            _append(store, session, 0, b"abcd")
+        with pytest.raises(UploadOffsetMismatchError):
+            store.complete(dataclasses.replace(session, offset=8))
+        other_worker.write(b"abcd")
+
+    # The other worker's chunk landed after this worker read the session.
+    with pytest.raises(UploadOffsetMismatchError) as exc:
+        _append(store, session, 0, b"abcd")
+    assert exc.value.headers["Upload-Offset"] == "4"
+
+
+def test_completing_twice_is_a_404(tmp_path):
+    store = ResumableUploadStore(str(tmp_path))
+    session = store.create("acme", "a.txt", "docs", 4)
+    _append(store, session, 0, b"abcd")
+    # Both requests read the session before either completed it.
+    again = store.get(session.session_id, "acme")
+
+    store.complete(session)
+    with pytest.raises(HTTPException) as exc:
+        store.complete(again)
+    assert exc.value.status_code == 404
+    with pytest.raises(HTTPException) as exc:
+        _append(store, again, 4, b"more")
+    assert exc.value.status_code == 404
@@ -0,0 +1,37 @@
+"""Unit tests for the direct model serialization path."""
+
+import json
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from serialization import ModelJSONResponse, dump_json
+
+
+class Item(BaseModel):
+    name: str
+    score: float
+    tags: List[str] = []
+    note: Optional[str] = None
+
+
+def _classic(content) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def test_models_and_lists_match_classic_encoding():
+    items = [Item(name="café – ünïcode", score=0.875, tags=["a"]), Item(name="b", score=1.0)]
+    for content in (items[0], items, []):
+        body = ModelJSONResponse(content).body
+        assert json.loads(body) == json.loads(_classic(content))
+    # Compact separators and raw UTF-8, exactly like JSONResponse.
+    assert ModelJSONResponse(items[0]).body == _classic(items[0])
+
+
+def test_other_content_uses_stock_encoding():
+    payload = {"success": True, "message": "ok"}
+    assert ModelJSONResponse(payload).body == JSONResponse(payload).body
+    assert ModelJSONResponse(payload).media_type == "application/json"
+    assert dump_json([]) == b"[]"
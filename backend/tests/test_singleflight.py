@@ -0,0 +1,103 @@
+"""Unit tests for single-flight request coalescing."""
+
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert calls == 1
+    assert [r for r, _ in results] == ["answer"] * 5
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def scenario():
+        return await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0, "A")),
+            flight.do("b", lambda: asyncio.sleep(0, "B")),
+        )
+
+    assert asyncio.run(scenario()) == [("A", False), ("B", False)]
+
+
+def test_errors_propagate_to_waiters_and_key_is_released():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("agent down")
+
+    async def scenario():
+        results = await asyncio.gather(
+            flight.do("k", boom), flight.do("k", boom), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+        # A later call starts a fresh execution.
+        return await flight.do("k", lambda: asyncio.sleep(0, "ok"))
+
+    assert asyncio.run(scenario()) == ("ok", False)
+
+
+def test_cancelled_waiter_does_not_cancel_leader():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(scenario()) == ("answer", False)
+
+
+
+def test_cancelled_leader_hands_the_call_to_one_waiter():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    # One waiter re-ran the work as the new leader; the other shared it.
+    assert sorted(asyncio.run(scenario())) == [("answer", False), ("answer", True)]
+    assert calls == 2
@@ -0,0 +1,333 @@
+"""End-to-end tests for the batch upload endpoint with a stand-in agent.
+
+Mounts the real ``api.upload`` router on a throwaway app. Ingestion runs on
+the real queue and an inline :class:`IngestionExecutor` whose agent is
+:class:`_IngestAgent`.
+"""
+
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import ingestion_jobs
+import upload_dedup
+from api import upload
+from conftest import HEADERS, OTHER_HEADERS
+from ingestion_executor import IngestionExecutor
+from ingestion_jobs import IngestionQueueFullError
+
+
+class _IngestAgent:
+    """Stand-in ingestion agent: one chunk per 10 bytes; ``fail*`` files raise."""
+
+    async def ingest_document(self, file_path, collection_name, original_filename):
+        if original_filename.startswith("fail"):
+            raise RuntimeError("parser crashed")
+        with open(file_path, "rb") as f:
+            size = len(f.read())
+        return {"chunks_stored": max(1, size // 10), "document_id": f"doc-{original_filename}"}
+
+
+class _SlowIngestAgent(_IngestAgent):
+    """Reads the file, then blocks its worker thread as a long parse would."""
+
+    async def ingest_document(self, file_path, collection_name, original_filename):
+        result = await super().ingest_document(file_path, collection_name, original_filename)
+        time.sleep(0.3)
+        return result
+
+
+@pytest.fixture
+def make_client(build_api_client, monkeypatch):
+    """Build a TestClient for the upload router with ingestion by ``agent``."""
+
+    def build(tenant=None, agent=_IngestAgent, mode="inline", **settings) -> TestClient:
+        monkeypatch.setattr(upload, "AI_AGENT_AVAILABLE", True)
+        monkeypatch.setattr(
+            upload, "_ingestion_executor", IngestionExecutor(agent, mode=mode, workers=1)
+        )
+        return build_api_client(upload.router, tenant=tenant, **settings)
+
+    return build
+
+
+def _upload(client: TestClient, name: str, content: bytes, **params):
+    return client.post(
+        "/api/upload",
+        headers=HEADERS,
+        params=params,
+        data={"collection": "docs"},
+        files={"file": (name, content, "text/plain")},
+    )
+
+
+def _batch(client: TestClient, *files: tuple, **params):
+    return client.post(
+        "/api/upload/batch",
+        headers=HEADERS,
+        params=params,
+        data={"collection": "docs"},
+        files=[("files", (name, content, "text/plain")) for name, content in files],
+    )
+
+
+def test_upload_is_accepted_and_its_job_polled_to_completion(make_client):
+    with make_client(agent=_SlowIngestAgent, mode="thread") as client:
+        resp = _upload(client, "a.txt", b"a" * 40)
+        assert resp.status_code == 202
+        job_id = resp.json()["jobId"]
+        assert resp.json()["status"] == "queued"
+
+        job_url = f"/api/upload/jobs/{job_id}"
+        statuses = []
+        deadline = time.monotonic() + 2
+        while not statuses or statuses[-1] != "succeeded":
+            assert time.monotonic() < deadline
+            job = client.get(job_url, headers=HEADERS).json()
+            statuses.append(job["status"])
+            time.sleep(0.02)
+        assert "running" in statuses
+        assert (job["chunksStored"], job["documentId"], job["progress"]) == (4, "doc-a.txt", 100)
+        assert job["finishedAt"] is not None
+
+        # Job ids are scoped to their tenant.
+        assert client.get(job_url, headers=OTHER_HEADERS).status_code == 404
+
+
+def test_results_are_listed_per_file_in_request_order(make_client):
+    with make_client() as client:
+        resp = _batch(client, ("a.txt", b"alpha"), ("b.txt", b"bravo"), ("c.txt", b"charlie"))
+
+        assert resp.status_code == 202
+        results = resp.json()["results"]
+        assert [(r["index"], r["filename"]) for r in results] == [
+            (0, "a.txt"), (1, "b.txt"), (2, "c.txt"),
+        ]
+        assert all(r["success"] and r["jobId"] for r in results)
+        assert len({r["jobId"] for r in results}) == 3
+
+
+def test_rejected_files_do_not_affect_the_others(make_client):
+    with make_client(tenant={"max_upload_bytes": 100}) as client:
+        resp = _batch(
+            client,
+            ("a.txt", b"alpha"),
+            ("virus.exe", b"MZ"),
+            ("big.txt", b"x" * 101),
+            ("d.txt", b"delta"),
+            wait="true",
+        )
+
+        assert resp.status_code == 200
+        results = resp.json()["results"]
+        assert [r["success"] for r in results] == [True, False, False, True]
+        assert "'.exe' not allowed" in results[1]["error"]
+        assert "exceeds maximum" in results[2]["error"]
+        assert [results[i]["documentId"] for i in (0, 3)] == ["doc-a.txt", "doc-d.txt"]
+
+
+def test_full_queue_fails_only_the_file_it_turned_away(make_client, monkeypatch):
+    with make_client() as client:
+        queue = ingestion_jobs.get_ingestion_queue()
+        submit = queue.submit
+
+        def submit_unless_full(job, runner):
+            if job.filename == "full.txt":
+                raise IngestionQueueFullError()
+            return submit(job, runner)
+
+        monkeypatch.setattr(queue, "submit", submit_unless_full)
+        resp = _batch(client, ("a.txt", b"alpha"), ("full.txt", b"bravo"), ("c.txt", b"charlie"))
+
+        results = resp.json()["results"]
+        assert [r["success"] for r in results] == [True, False, True]
+        assert "queue is full" in results[1]["error"]
+
+
+def test_wait_collects_every_job_result(make_client):
+    with make_client() as client:
+        resp = _batch(
+            client,
+            ("a.txt", b"a" * 30),
+            ("fail.txt", b"broken"),
+            ("a-again.txt", b"a" * 30),
+            wait="true",
+        )
+
+        assert resp.status_code == 200
+        first, failed, repeat = resp.json()["results"]
+        assert (first["status"], first["chunksStored"], first["documentId"]) == (
+            "succeeded", 3, "doc-a.txt",
+        )
+        assert failed["success"] is False and failed["status"] == "failed"
+        assert "parser crashed" in failed["error"]
+        # Same content as a.txt: shares its job instead of ingesting twice.
+        assert repeat["duplicate"] is True and repeat["jobId"] == first["jobId"]
+        assert repeat["documentId"] == "doc-a.txt"
+
+
+def test_batch_is_charged_once_and_rejected_when_over_the_whole_budget(make_client):
+    with make_client(tenant={"rate_limit_per_minute": 5}, rate_limit_enabled=True) as client:
+        files = [(f"{i}.txt", f"file {i}".encode()) for i in range(6)]
+
+        over = _batch(client, *files)
+        assert over.status_code == 413
+        assert "Split it" in over.json()["detail"]
+
+        assert _batch(client, *files[:5]).status_code == 202
+        # The first batch was not charged; the second used the whole budget.
+        assert _batch(client, files[5]).status_code == 429
+
+
+def test_concurrent_identical_uploads_share_one_job(make_client, monkeypatch):
+    with make_client(agent=_SlowIngestAgent, mode="thread") as client:
+        index = upload_dedup.get_content_index()
+        lookup = index.lookup
+
+        def slow_lookup(*args):
+            # Both requests miss the index before either has queued its job.
+            time.sleep(0.1)
+            return lookup(*args)
+
+        monkeypatch.setattr(index, "lookup", slow_lookup)
+
+        def send(name):
+            return _batch(client, (name, b"same bytes")).json()["results"][0]
+
+        with ThreadPoolExecutor(2) as pool:
+            first, second = pool.map(send, ["a.txt", "b.txt"])
+        assert first["jobId"] == second["jobId"]
+        assert [first["duplicate"], second["duplicate"]].count(True) == 1
+
+        job_url = f"/api/upload/jobs/{first['jobId']}"
+        deadline = time.monotonic() + 2
+        while client.get(job_url, headers=HEADERS).json()["status"] != "succeeded":
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+
+def test_file_stored_after_its_deadline_is_not_ingested_again(make_client):
+    with make_client(
+        tenant={"upload_timeout_seconds": 0.05}, agent=_SlowIngestAgent, mode="thread"
+    ) as client:
+        timed_out = _batch(client, ("a.txt", b"alpha"), wait="true").json()["results"][0]
+        assert timed_out["status"] == "failed"
+
+        # The worker thread still stores the file; its hash is recorded then.
+        index = upload_dedup.get_content_index()
+        content_hash = hashlib.sha256(b"alpha").hexdigest()
+        deadline = time.monotonic() + 2
+        while index.lookup("acme", "acme__docs", content_hash) is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+        repeat = _batch(client, ("a-again.txt", b"alpha")).json()["results"][0]
+        assert repeat["duplicate"] is True and repeat["documentId"] == "doc-a.txt"
+
+
+def _open_session(client: TestClient, content: bytes) -> str:
+    resp = client.post(
+        "/api/upload/sessions",
+        headers=HEADERS,
+        json={"filename": "big.txt", "collection": "docs", "size": len(content)},
+    )
+    assert resp.status_code == 201
+    return resp.json()["sessionId"]
+
+
+def _send(client: TestClient, session_id: str, chunk: bytes, offset: int):
+    return client.put(
+        f"/api/upload/sessions/{session_id}",
+        headers=HEADERS,
+        params={"offset": offset},
+        content=chunk,
+    )
+
+
+def test_resumable_upload_resumes_from_the_reported_offset(make_client):
+    content = b"0123456789" * 5
+    with make_client() as client:
+        session_id = _open_session(client, content)
+
+        assert _send(client, session_id, content[:20], 0).json()["offset"] == 20
+        # A retry of an already-stored chunk is told where to resume.
+        stale = _send(client, session_id, content[:20], 0)
+        assert stale.status_code == 409 and stale.headers["Upload-Offset"] == "20"
+
+        status = client.get(f"/api/upload/sessions/{session_id}", headers=HEADERS)
+        offset = status.json()["offset"]
+        assert offset == 20
+        _send(client, session_id, content[offset:], offset)
+
+        done = client.post(
+            f"/api/upload/sessions/{session_id}/complete",
+            headers=HEADERS,
+            params={"wait": "true"},
+        )
+        assert done.status_code == 200
+        assert (done.json()["chunksStored"], done.json()["documentId"]) == (5, "doc-big.txt")
+        # Completing consumed the session.
+        gone = client.get(f"/api/upload/sessions/{session_id}", headers=HEADERS)
+        assert gone.status_code == 404
+
+
+def test_completing_a_partial_upload_is_refused(make_client):
+    with make_client() as client:
+        session_id = _open_session(client, b"x" * 30)
+        _send(client, session_id, b"x" * 10, 0)
+
+        resp = client.post(f"/api/upload/sessions/{session_id}/complete", headers=HEADERS)
+        assert resp.status_code == 409
+
+
+def test_upload_session_survives_a_full_queue(make_client, monkeypatch):
+    content = b"resumable payload"
+    with make_client() as client:
+        session_id = _open_session(client, content)
+        _send(client, session_id, content, 0)
+
+        queue = ingestion_jobs.get_ingestion_queue()
+        submit = queue.submit
+        calls = []
+
+        def full_once(job, runner):
+            calls.append(job.filename)
+            if len(calls) == 1:
+                raise IngestionQueueFullError()
+            return submit(job, runner)
+
+        monkeypatch.setattr(queue, "submit", full_once)
+        complete = f"/api/upload/sessions/{session_id}/complete"
+
+        assert client.post(complete, headers=HEADERS).status_code == 503
+        status = client.get(f"/api/upload/sessions/{session_id}", headers=HEADERS)
+        assert status.status_code == 200 and status.json()["offset"] == len(content)
+
+        retry = client.post(complete, headers=HEADERS)
+        assert retry.status_code == 202 and retry.json()["jobId"]
+
+
+def test_complete_is_refused_before_hashing_when_the_tenant_is_at_its_share(make_client):
+    with make_client(
+        agent=_SlowIngestAgent, mode="thread", ingestion_queue_max_per_tenant=1
+    ) as client:
+        queued = _batch(client, ("a.txt", b"alpha"))
+        assert queued.status_code == 202
+        session_id = _open_session(client, b"bravo")
+        _send(client, session_id, b"bravo", 0)
+
+        resp = client.post(f"/api/upload/sessions/{session_id}/complete", headers=HEADERS)
+        assert resp.status_code == 429
+        status = client.get(f"/api/upload/sessions/{session_id}", headers=HEADERS)
+        assert status.json()["offset"] == 5
+
+        # Let the slow job finish before the app shuts down.
+        job_id = queued.json()["results"][0]["jobId"]
+        deadline = time.monotonic() + 2
+        job_url = f"/api/upload/jobs/{job_id}"
+        while client.get(job_url, headers=HEADERS).json()["status"] != "succeeded":
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
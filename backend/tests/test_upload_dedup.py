@@ -0,0 +1,67 @@
+"""Unit tests for the upload content-hash index."""
+
+import asyncio
+import hashlib
+import io
+
+from fastapi import UploadFile
+
+from upload_dedup import ContentIndex
+from upload_limits import spool_upload
+
+
+def test_spool_hashes_while_copying():
+    data = b"handbook " * 1000
+    digest = hashlib.sha256()
+    dest = io.BytesIO()
+    asyncio.run(spool_upload(UploadFile(io.BytesIO(data)), dest, 0, chunk_size=1000, digest=digest))
+    assert dest.getvalue() == data
+    assert digest.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_hashes_are_scoped_to_tenant_and_collection():
+    index = ContentIndex()
+    index.record("acme", "acme__docs", "abc", "doc-1", "handbook.pdf")
+    assert index.lookup("acme", "acme__docs", "abc") == "doc-1"
+    assert index.lookup("acme", "acme__other", "abc") is None
+    assert index.lookup("globex", "acme__docs", "abc") is None
+
+    index.record("acme", "acme__other", "abc", "doc-2")
+    assert index.forget_collection("acme__docs") == 1
+    assert index.lookup("acme", "acme__docs", "abc") is None
+    assert index.lookup("acme", "acme__other", "abc") == "doc-2"
+    assert index.stats()["hits"] == 2
+
+
+def test_forgetting_a_shared_collection_drops_every_tenants_hashes():
+    # Tenants without namespacing all write to the same gateway collection.
+    index = ContentIndex()
+    index.record("acme", "docs", "abc", "doc-1")
+    index.record("globex", "docs", "def", "doc-2")
+    index.begin("globex", "docs", "ghi", "job_1")
+
+    assert index.forget_collection("docs") == 2
+    assert index.lookup("acme", "docs", "abc") is None
+    assert index.lookup("globex", "docs", "def") is None
+    assert index.pending("globex", "docs", "ghi") is None
+
+
+def test_pending_ingestions_are_tracked_per_job():
+    index = ContentIndex()
+    index.begin("acme", "acme__docs", "abc", "job_1")
+    assert index.pending("acme", "acme__docs", "abc") == "job_1"
+
+    # A forced re-ingest took over the slot; the older job must not clear it.
+    index.begin("acme", "acme__docs", "abc", "job_2")
+    index.end("acme", "acme__docs", "abc", "job_1")
+    assert index.pending("acme", "acme__docs", "abc") == "job_2"
+    index.end("acme", "acme__docs", "abc", "job_2")
+    assert index.pending("acme", "acme__docs", "abc") is None
+
+
+def test_index_persists_in_a_file(tmp_path):
+    path = str(tmp_path / "hashes.db")
+    first = ContentIndex(path)
+    first.record("acme", "acme__docs", "abc", "doc-1")
+    first.close()
+    assert ContentIndex(path).lookup("acme", "acme__docs", "abc") == "doc-1"
@@ -0,0 +1,127 @@
+"""Tests for chunked upload spooling and early upload size rejection."""
+
+import asyncio
+import io
+import json
+from typing import List
+
+import pytest
+from fastapi import Depends, FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+import auth
+from config import Settings
+from tenancy import Tenant
+from upload_limits import (
+    MULTIPART_OVERHEAD,
+    UploadSizeLimitMiddleware,
+    UploadTooLargeError,
+    spool_upload,
+)
+
+
+class _ChunkRecorder(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(len(data))
+        return super().write(data)
+
+
+def test_spool_copies_in_bounded_chunks():
+    data = b"x" * 2500
+    dest = _ChunkRecorder()
+    written = asyncio.run(spool_upload(UploadFile(io.BytesIO(data)), dest, 10_000, chunk_size=1000))
+    assert written == 2500
+    assert dest.getvalue() == data
+    assert dest.writes == [1000, 1000, 500]
+
+
+def test_spool_stops_once_limit_is_passed():
+    dest = io.BytesIO()
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(UploadFile(io.BytesIO(b"x" * 5000)), dest, 1500, chunk_size=1000))
+    assert len(dest.getvalue()) == 1000
+
+    # A size already known from the parser is rejected before copying.
+    known = UploadFile(io.BytesIO(b"x" * 5000), size=5000)
+    with pytest.raises(UploadTooLargeError) as exc:
+        asyncio.run(spool_upload(known, io.BytesIO(), 1500))
+    assert exc.value.status_code == 413
+
+
+def _client(limit: int) -> TestClient:
+    keys = {
+        "sk-small": {"tenant_id": "small", "max_upload_bytes": limit},
+        "sk-big": {"tenant_id": "big", "max_upload_bytes": 0},
+    }
+    auth.configure(Settings(api_keys=json.dumps(keys), auth_dev_mode=False, rate_limit_enabled=False))
+
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware)
+
+    @app.post("/api/upload")
+    async def upload(file: UploadFile = File(...), tenant: Tenant = Depends(auth.require_tenant)):
+        return {"tenant": tenant.tenant_id, "size": len(await file.read())}
+
+    return TestClient(app)
+
+
+def test_oversized_content_length_rejected_per_tenant():
+    client = _client(limit=1000)
+    big = {"file": ("a.txt", b"x" * (1000 + MULTIPART_OVERHEAD + 1))}
+
+    resp = client.post("/api/upload", files=big, headers={"X-API-Key": "sk-small"})
+    assert resp.status_code == 413
+    assert "maximum allowed size" in resp.json()["detail"]
+
+    # Another tenant with no limit is unaffected.
+    resp = client.post("/api/upload", files=big, headers={"X-API-Key": "sk-big"})
+    assert resp.status_code == 200
+
+    small = {"file": ("a.txt", b"x" * 500)}
+    resp = client.post("/api/upload", files=small, headers={"X-API-Key": "sk-small"})
+    assert resp.json() == {"tenant": "small", "size": 500}
+
+
+def test_streamed_body_without_content_length_is_cut_off():
+    client = _client(limit=1000)
+    boundary = "b0undary"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.txt\"\r\n\r\n"
+    ).encode() + b"x" * (1000 + MULTIPART_OVERHEAD + 1) + f"\r\n--{boundary}--\r\n".encode()
+
+    def chunks():
+        for i in range(0, len(body), 4096):
+            yield body[i:i + 4096]
+
+    resp = client.post(
+        "/api/upload",
+        content=chunks(),
+        headers={
+            "X-API-Key": "sk-small",
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+        },
+    )
+    assert resp.status_code == 413
+
+
+def test_batch_path_allows_one_limit_per_file():
+    keys = {"sk-small": {"tenant_id": "small", "max_upload_bytes": 1000}}
+    auth.configure(Settings(api_keys=json.dumps(keys), auth_dev_mode=False, rate_limit_enabled=False))
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, paths={"/api/upload/batch": 3})
+
+    @app.post("/api/upload/batch")
+    async def batch(files: List[UploadFile] = File(...)):
+        return {"files": len(files)}
+
+    client = TestClient(app)
+    headers = {"X-API-Key": "sk-small"}
+    three = [("files", (f"{i}.txt", b"x" * 900)) for i in range(3)]
+    assert client.post("/api/upload/batch", files=three, headers=headers).json() == {"files": 3}
+
+    too_big = [("files", (f"{i}.txt", b"x" * (1000 + MULTIPART_OVERHEAD))) for i in range(4)]
+    assert client.post("/api/upload/batch", files=too_big, headers=headers).status_code == 413
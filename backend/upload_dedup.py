@@ -0,0 +1,144 @@
+"""Content-hash deduplication of uploads.
+
+Re-uploading a file that is already in a collection used to re-parse,
+re-chunk and re-embed it and store a second copy of every vector. Uploads
+are now hashed (SHA-256) while they are spooled to disk, and
+:class:`ContentIndex` remembers, per tenant and collection, which hash
+produced which ``documentId``. A repeat upload is answered from the index
+without touching the agent.
+
+Hashes are recorded only once ingestion succeeds. Until then the upload is
+tracked as *pending* in this process, so the same file sent twice in quick
+succession (a double click, or twice in one batch) shares the first job.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from config import Settings, get_settings
+
+
+class ContentIndex:
+    """Per-tenant, per-collection map of content hash -> documentId in SQLite.
+
+    The default ``":memory:"`` database lives and dies with the process; give
+    a file path to keep the index across restarts and share it between
+    workers on one host.
+    """
+
+    def __init__(self, path: str = ":memory:", clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        # (tenant_id, collection, content_hash) -> job_id of the running ingestion.
+        self._pending: dict[tuple[str, str, str], str] = {}
+        self._hits = 0
+        self._misses = 0
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS upload_hashes ("
+                " tenant_id TEXT NOT NULL,"
+                " collection TEXT NOT NULL,"
+                " content_hash TEXT NOT NULL,"
+                " document_id TEXT NOT NULL,"
+                " filename TEXT,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (tenant_id, collection, content_hash))"
+            )
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ContentIndex":
+        return cls(settings.upload_dedup_index_path)
+
+    def lookup(self, tenant_id: str, collection: str, content_hash: str) -> Optional[str]:
+        """Return the documentId already stored for this content, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT document_id FROM upload_hashes"
+                " WHERE tenant_id = ? AND collection = ? AND content_hash = ?",
+                (tenant_id, collection, content_hash),
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return row[0]
+
+    def record(
+        self,
+        tenant_id: str,
+        collection: str,
+        content_hash: str,
+        document_id: str,
+        filename: Optional[str] = None,
+    ) -> None:
+        """Remember that this content was ingested as ``document_id``."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO upload_hashes"
+                " (tenant_id, collection, content_hash, document_id, filename, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (tenant_id, collection, content_hash, document_id, filename, self._clock()),
+            )
+
+    def forget_collection(self, collection: str) -> int:
+        """Drop every hash recorded for gateway ``collection``, for all tenants.
+
+        Tenants without namespacing share the global collection space, so
+        when one of them deletes a collection the others' documents are gone
+        too. Returns how many hashes were dropped.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM upload_hashes WHERE collection = ?", (collection,)
+            )
+            for key in [k for k in self._pending if k[1] == collection]:
+                del self._pending[key]
+        return cursor.rowcount
+
+    def pending(self, tenant_id: str, collection: str, content_hash: str) -> Optional[str]:
+        """Job id of an unfinished ingestion of the same content, if any."""
+        return self._pending.get((tenant_id, collection, content_hash))
+
+    def begin(self, tenant_id: str, collection: str, content_hash: str, job_id: str) -> None:
+        self._pending[(tenant_id, collection, content_hash)] = job_id
+
+    def end(self, tenant_id: str, collection: str, content_hash: str, job_id: str) -> None:
+        key = (tenant_id, collection, content_hash)
+        if self._pending.get(key) == job_id:
+            del self._pending[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            (documents,) = self._conn.execute("SELECT COUNT(*) FROM upload_hashes").fetchone()
+        return {
+            "documents": documents,
+            "pending": len(self._pending),
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[ContentIndex] = None
+_index_built = False
+
+
+def get_content_index() -> Optional[ContentIndex]:
+    """Return the process-wide index, or None when deduplication is disabled."""
+    global _index, _index_built
+    if not _index_built:
+        settings = get_settings()
+        _index = ContentIndex.from_settings(settings) if settings.upload_dedup_enabled else None
+        _index_built = True
+    return _index
@@ -0,0 +1,145 @@
+"""Bounded-memory upload handling and per-tenant upload size limits.
+
+Starlette's multipart parser already spools file parts to disk once they pass
+1 MB, so the copy into the ingestion temp file is the only place an upload
+could end up wholly in memory. :func:`spool_upload` copies it in fixed-size
+chunks with a running size check, so peak memory per upload is bounded by the
+chunk size.
+
+The multipart body is parsed before any route dependency runs, so size limits
+enforced inside the route only fire after the whole body has been received.
+:class:`UploadSizeLimitMiddleware` rejects oversized uploads before that: up
+front from ``Content-Length``, or as soon as the bytes received pass the limit
+when the client streams without one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from auth import get_auth_manager
+from tenancy import Tenant
+
+# Allowance on top of the file size limit for multipart boundaries, part
+# headers and the small form fields sent alongside the file.
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def too_large_message(limit: int, size: Optional[int] = None) -> str:
+    allowed = f"maximum allowed size ({limit / 1024 / 1024:g}MB)"
+    if size is None:
+        return f"File exceeds {allowed}"
+    return f"File size ({size / 1024 / 1024:.2f}MB) exceeds {allowed}"
+
+
+class UploadTooLargeError(HTTPException):
+    """413 raised when an upload passes the caller's size limit."""
+
+    def __init__(self, limit: int, size: Optional[int] = None) -> None:
+        super().__init__(status_code=413, detail=too_large_message(limit, size))
+        self.limit = limit
+        self.size = size
+
+
+def upload_limit_for(tenant: Optional[Tenant]) -> int:
+    """Maximum upload size in bytes for ``tenant`` (0 = unlimited).
+
+    Unrecognized callers get the default limit; ``require_tenant`` rejects
+    them once the route runs.
+    """
+    if tenant is not None:
+        return tenant.max_upload_bytes
+    return get_auth_manager().settings.default_max_upload_bytes
+
+
+async def spool_upload(
+    file: UploadFile,
+    dest: BinaryIO,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024,
+    digest: Optional[Any] = None,
+) -> int:
+    """Copy ``file`` into ``dest`` chunk by chunk; return the bytes written.
+
+    Raises :class:`UploadTooLargeError` as soon as the running total passes
+    ``max_bytes`` (0 = unlimited), or before copying anything when the
+    parser already knows the size. Each chunk is also fed to ``digest`` (a
+    ``hashlib`` object), so the content hash costs no extra pass over the file.
+    """
+    if max_bytes > 0 and file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes, file.size)
+    written = 0
+    while chunk := await file.read(chunk_size):
+        written += len(chunk)
+        if max_bytes > 0 and written > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        await asyncio.to_thread(_write_chunk, dest, chunk, digest)
+    return written
+
+
+def _write_chunk(dest: BinaryIO, chunk: bytes, digest: Optional[Any]) -> None:
+    # hashlib releases the GIL for large buffers, so hashing off the event
+    # loop alongside the write keeps both out of the request path.
+    if digest is not None:
+        digest.update(chunk)
+    dest.write(chunk)
+
+
+class UploadSizeLimitMiddleware:
+    """Reject upload request bodies larger than the caller's limit (413).
+
+    Applies to POSTs to the paths in ``paths``, which maps each path to the
+    number of files its body may carry. The limit is that many times the
+    tenant's ``max_upload_bytes`` plus :data:`MULTIPART_OVERHEAD`.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Optional[dict[str, int]] = None) -> None:
+        self.app = app
+        self.paths = paths if paths is not None else {"/api/upload": 1}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        limit = upload_limit_for(get_auth_manager().resolve(headers.get("x-api-key")))
+        if limit <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        files = self.paths[scope["path"]]
+        allowed = files * (limit + MULTIPART_OVERHEAD)
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > allowed:
+            response = JSONResponse(
+                {"detail": too_large_message(limit * files)},
+                status_code=413,
+                headers={"Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > allowed:
+                    # Surfaces from the body parser as a 413 response.
+                    raise UploadTooLargeError(limit * files)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -7,7 +7,8 @@
 import { h } from 'preact';
 import { useState, useEffect } from 'preact/hooks';
 import type { WidgetConfig, Message, UploadFile, Collection } from './types';
-import { APIClient } from './services/api';
+import { APIClient, RESUMABLE_UPLOAD_THRESHOLD } from './services/api';
+import type { UploadResponse } from './services/api';
 import { loadSession, saveSession, generateConversationId } from './utils/storage';
 import { validateFile } from './utils/fileValidation';
 import ChatButton from './components/ChatButton';
@@ -152,24 +153,40 @@ export default function App({ config }: AppProps) {
     setMessages(prev => [...prev, userMessage]);
     setIsLoading(true);
 
-    try {
-      // Call API
-      const response = await apiClient.sendMessage({
-        query: text,
-        collection: config.collection || 'default',
-        conversationId: conversationId || undefined,
-      });
+    const aiMessageId = `msg_${Date.now()}_ai`;
+    let aiMessageAdded = false;
+    const upsertAiMessage = (update: Partial<Message>) => {
+      if (!aiMessageAdded) {
+        aiMessageAdded = true;
+        setIsLoading(false);
+        setMessages(prev => [
+          ...prev,
+          { id: aiMessageId, text: '', sender: 'ai', timestamp: new Date(), ...update },
+        ]);
+        return;
+      }
+      setMessages(prev => prev.map(m => (m.id === aiMessageId ? { ...m, ...update } : m)));
+    };
 
-      // Add AI response
-      const aiMessage: Message = {
-        id: `msg_${Date.now()}_ai`,
-        text: response.response,
-        sender: 'ai',
-        timestamp: new Date(),
-        searchResults: response.citations,
-      };
+    try {
+      // Call API, rendering the answer as it streams in
+      let streamedText = '';
+      const response = await apiClient.streamMessage(
+        {
+          query: text,
+          collection: config.collection || 'default',
+          conversationId: conversationId || undefined,
+        },
+        {
+          onToken: (token) => {
+            streamedText += token;
+            upsertAiMessage({ text: streamedText });
+          },
+        }
+      );
 
-      setMessages(prev => [...prev, aiMessage]);
+      // Finalize the AI response with the authoritative text and citations
+      upsertAiMessage({ text: response.response, searchResults: response.citations });
 
       // Update conversation ID if returned from API
       if (response.conversationId && response.conversationId !== conversationId) {
@@ -192,7 +209,7 @@ export default function App({ config }: AppProps) {
         timestamp: new Date(),
       };
 
-      setMessages(prev => [...prev, errorMessage]);
+      setMessages(prev => [...prev.filter(m => m.id !== aiMessageId), errorMessage]);
     } finally {
       setIsLoading(false);
     }
@@ -248,46 +265,60 @@ export default function App({ config }: AppProps) {
 
     setIsUploading(true);
 
-    // Upload files in sequence (could be parallel with Promise.all)
-    for (let i = 0; i < uploadFiles.length; i++) {
-      const uploadFile = uploadFiles[i];
+    // Small files go out together in one batch request (ingested in parallel
+    // on the server); large ones through resumable sessions, one at a time.
+    const pendingIndexes = uploadFiles
+      .map((f, idx) => (f.status === 'pending' ? idx : -1))
+      .filter(idx => idx !== -1);
+    const batchIndexes = pendingIndexes.filter(idx => uploadFiles[idx].file.size <= RESUMABLE_UPLOAD_THRESHOLD);
+    const largeIndexes = pendingIndexes.filter(idx => uploadFiles[idx].file.size > RESUMABLE_UPLOAD_THRESHOLD);
+
+    const applyResult = (fileIndex: number, result: UploadResponse) => {
+      setUploadFiles(prev => prev.map((f, idx) => {
+        if (idx !== fileIndex) return f;
+        return result.success
+          ? { ...f, status: 'success', progress: 100 }
+          : { ...f, status: 'error', error: result.error || 'Upload failed' };
+      }));
+      if (result.success) {
+        console.log('✅ File uploaded successfully', { filename: uploadFiles[fileIndex].file.name });
+      } else {
+        console.error('❌ File upload failed:', uploadFiles[fileIndex].file.name, result.error);
+      }
+    };
 
-      if (uploadFile.status !== 'pending') continue;
+    if (batchIndexes.length > 0) {
+      setUploadFiles(prev => prev.map((f, idx) =>
+        batchIndexes.includes(idx) ? { ...f, status: 'uploading', progress: 0 } : f
+      ));
 
-      // Mark as uploading
+      const results = await apiClient.uploadDocuments({
+        files: batchIndexes.map(idx => uploadFiles[idx].file),
+        collection: selectedCollection,
+        onProgress: (progress) => {
+          setUploadFiles(prev => prev.map((f, idx) =>
+            batchIndexes.includes(idx) ? { ...f, progress } : f
+          ));
+        }
+      });
+      results.forEach((result, k) => applyResult(batchIndexes[k], result));
+    }
+
+    for (const fileIndex of largeIndexes) {
       setUploadFiles(prev => prev.map((f, idx) =>
-        idx === i ? { ...f, status: 'uploading', progress: 0 } : f
+        idx === fileIndex ? { ...f, status: 'uploading', progress: 0 } : f
       ));
 
-      try {
-        await apiClient.uploadDocument({
-          file: uploadFile.file,
-          collection: selectedCollection,
-          onProgress: (progress) => {
-            setUploadFiles(prev => prev.map((f, idx) =>
-              idx === i ? { ...f, progress } : f
-            ));
-          }
-        });
-
-        // Mark as success
-        setUploadFiles(prev => prev.map((f, idx) =>
-          idx === i ? { ...f, status: 'success', progress: 100 } : f
-        ));
-
-        console.log('✅ File uploaded successfully', { filename: uploadFile.file.name });
-      } catch (error) {
-        console.error('❌ File upload failed:', error);
-
-        // Mark as error
-        setUploadFiles(prev => prev.map((f, idx) =>
-          idx === i ? {
-            ...f,
-            status: 'error',
-            error: error instanceof Error ? error.message : 'Upload failed'
-          } : f
-        ));
-      }
+      const result = await apiClient.uploadDocumentResumable({
+        file: uploadFiles[fileIndex].file,
+        collection: selectedCollection,
+        onProgress: (progress) => {
+          setUploadFiles(prev => prev.map((f, idx) =>
+            idx === fileIndex ? { ...f, progress } : f
+          ));
+        }
+      });
+      applyResult(fileIndex, result);
     }
 
     setIsUploading(false);
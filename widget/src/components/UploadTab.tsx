@@ -165,7 +165,7 @@ export default function UploadTab({
           </div>
           <ul style={{ margin: 0, paddingLeft: '20px', fontSize: '12px', color: '#1e3a8a' }}>
             <li style={{ marginBottom: '4px' }}>Supported formats: PDF, DOCX, PPTX, TXT, MD, Images</li>
-            <li style={{ marginBottom: '4px' }}>Maximum file size: 10MB per file</li>
+            <li style={{ marginBottom: '4px' }}>Maximum file size: 512MB per file (large files resume if the connection drops)</li>
             <li style={{ marginBottom: '4px' }}>You can upload up to 10 files at once</li>
             <li>Files are automatically processed and indexed</li>
           </ul>
@@ -150,7 +150,7 @@ const IntraMind = {
       placeholder: config.placeholder || 'Ask a question...',
       welcomeMessage: config.welcomeMessage || 'How can I help you?',
       apiUrl: config.apiUrl || 'http://localhost:8001',
-      maxFileSize: config.maxFileSize || 10 * 1024 * 1024, // 10MB default
+      maxFileSize: config.maxFileSize || 512 * 1024 * 1024, // 512MB default (resumable above 10MB)
       allowedFileTypes: config.allowedFileTypes || ['pdf', 'docx', 'pptx', 'txt', 'md'],
     };
 
@@ -18,17 +18,70 @@ export interface ChatResponse {
   queryComplexity?: 'simple' | 'complex';
 }
 
+export interface ChatStreamHandlers {
+  onStart?: (conversationId: string) => void;
+  onToken?: (text: string) => void;
+}
+
 export interface UploadRequest {
   file: File;
   collection: string;
   onProgress?: (progress: number) => void;
 }
 
+export interface BatchUploadRequest {
+  files: File[];
+  collection: string;
+  onProgress?: (progress: number) => void;
+}
+
 export interface UploadResponse {
   success: boolean;
   documentId?: string;
   chunksStored?: number;
   error?: string;
+  jobId?: string;
+  status?: UploadJobStatus;
+  /** True when identical content was already in the collection. */
+  duplicate?: boolean;
+}
+
+export interface BatchUploadItem extends UploadResponse {
+  index: number;
+  filename?: string;
+}
+
+export interface UploadSession {
+  sessionId: string;
+  filename: string;
+  collection: string;
+  size: number;
+  offset: number;
+  expiresAt?: string;
+}
+
+/** Files larger than this are sent through a resumable upload session. */
+export const RESUMABLE_UPLOAD_THRESHOLD = 10 * 1024 * 1024;
+
+/** Bytes per chunk request of a resumable upload (within the server's limit). */
+export const RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024;
+
+/** Collections requested per page (the backend allows up to 500). */
+export const COLLECTIONS_PAGE_SIZE = 200;
+
+export type UploadJobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export interface UploadJob {
+  jobId: string;
+  status: UploadJobStatus;
+  progress: number;
+  filename: string;
+  collection: string;
+  chunksStored?: number;
+  documentId?: string;
+  error?: string;
+  createdAt: string;
+  finishedAt?: string;
 }
 
 /**
@@ -78,62 +131,280 @@ export class APIClient {
   }
 
   /**
-   * Upload a document
+   * Send a chat message and stream the answer as it is generated.
+   *
+   * Reads the Server-Sent Events from /api/chat/stream. Tokens are passed to
+   * `handlers.onToken` as they arrive; the resolved ChatResponse carries the
+   * authoritative final text (which may differ from the streamed text if the
+   * answer was replaced by output safety checks), citations and metadata.
    */
-  async uploadDocument(request: UploadRequest): Promise<UploadResponse> {
-    const formData = new FormData();
-    formData.append('file', request.file);
-    formData.append('collection', request.collection);
+  async streamMessage(request: ChatRequest, handlers: ChatStreamHandlers = {}): Promise<ChatResponse> {
+    const response = await fetch(`${this.apiUrl}/api/chat/stream`, {
+      method: 'POST',
+      headers: { ...this.getHeaders(), Accept: 'text/event-stream' },
+      body: JSON.stringify(request),
+    });
+
+    if (!response.ok || !response.body) {
+      return this.handleResponse<ChatResponse>(response);
+    }
+
+    const result: ChatResponse = {
+      response: '',
+      citations: [],
+      conversationId: request.conversationId || '',
+    };
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let finished = false;
+
+    const handleFrame = (frame: string) => {
+      let event = 'message';
+      let data = '';
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      const payload = data ? JSON.parse(data) : {};
+
+      switch (event) {
+        case 'start':
+          result.conversationId = payload.conversationId;
+          handlers.onStart?.(payload.conversationId);
+          break;
+        case 'token':
+          result.response += payload.text;
+          handlers.onToken?.(payload.text);
+          break;
+        case 'citations':
+          result.citations = payload;
+          break;
+        case 'metadata':
+          result.queryComplexity = payload.queryComplexity;
+          break;
+        case 'done':
+          result.response = payload.response;
+          finished = true;
+          break;
+        case 'error':
+          throw new Error(payload.error || 'Streaming request failed');
+      }
+    };
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary: number;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const frame = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        if (frame.trim()) handleFrame(frame);
+      }
+    }
 
+    if (!finished) {
+      throw new Error('Connection closed before the response completed');
+    }
+    return result;
+  }
+
+  /**
+   * POST multipart form data with upload progress; rejects with the server's error message
+   */
+  private postForm<T>(path: string, formData: FormData, onProgress?: (progress: number) => void): Promise<T> {
     return new Promise((resolve, reject) => {
       const xhr = new XMLHttpRequest();
 
       // Track upload progress
       xhr.upload.addEventListener('progress', (e) => {
-        if (e.lengthComputable && request.onProgress) {
+        if (e.lengthComputable && onProgress) {
           const progress = (e.loaded / e.total) * 100;
-          request.onProgress(progress);
+          onProgress(progress);
         }
       });
 
       xhr.addEventListener('load', () => {
         if (xhr.status >= 200 && xhr.status < 300) {
           try {
-            const response = JSON.parse(xhr.responseText);
-            resolve(response);
+            resolve(JSON.parse(xhr.responseText));
           } catch (error) {
-            resolve({ success: false, error: 'Invalid response from server' });
+            reject(new Error('Invalid response from server'));
           }
         } else {
           try {
             const error = JSON.parse(xhr.responseText);
-            resolve({ success: false, error: error.error || 'Upload failed' });
+            reject(new Error(error.error || error.detail || 'Upload failed'));
           } catch {
-            resolve({ success: false, error: `Upload failed: ${xhr.statusText}` });
+            reject(new Error(`Upload failed: ${xhr.statusText}`));
           }
         }
       });
 
       xhr.addEventListener('error', () => {
-        resolve({ success: false, error: 'Network error during upload' });
+        reject(new Error('Network error during upload'));
       });
 
-      xhr.open('POST', `${this.apiUrl}/api/upload`);
+      xhr.open('POST', `${this.apiUrl}${path}`);
       xhr.setRequestHeader('X-API-Key', this.apiKey);
       xhr.send(formData);
     });
   }
 
   /**
-   * Get list of collections
+   * Wait for a queued upload's ingestion job, if it has not finished yet
    */
-  async getCollections(): Promise<Collection[]> {
-    const response = await fetch(`${this.apiUrl}/api/collections`, {
+  private async settleUpload<T extends UploadResponse>(response: T): Promise<T> {
+    // Ingestion runs in the background: wait for the queued job.
+    if (!response.jobId || response.status === 'succeeded' || response.status === 'failed') {
+      return response;
+    }
+    try {
+      return { ...response, ...(await this.waitForUploadJob(response.jobId)) };
+    } catch (error) {
+      return { ...response, success: false, error: error instanceof Error ? error.message : 'Upload failed' };
+    }
+  }
+
+  /**
+   * Upload a document
+   */
+  async uploadDocument(request: UploadRequest): Promise<UploadResponse> {
+    const formData = new FormData();
+    formData.append('file', request.file);
+    formData.append('collection', request.collection);
+
+    try {
+      const response = await this.postForm<UploadResponse>('/api/upload', formData, request.onProgress);
+      return this.settleUpload(response);
+    } catch (error) {
+      return { success: false, error: error instanceof Error ? error.message : 'Upload failed' };
+    }
+  }
+
+  /**
+   * Upload several documents to one collection in a single request.
+   *
+   * Files are ingested in parallel on the server; resolves with one result
+   * per file (in the order given) once every file has finished.
+   */
+  async uploadDocuments(request: BatchUploadRequest): Promise<BatchUploadItem[]> {
+    const formData = new FormData();
+    request.files.forEach((file) => formData.append('files', file));
+    formData.append('collection', request.collection);
+
+    try {
+      const response = await this.postForm<{ results: BatchUploadItem[] }>(
+        '/api/upload/batch', formData, request.onProgress
+      );
+      return Promise.all(response.results.map((item) => this.settleUpload(item)));
+    } catch (error) {
+      const message = error instanceof Error ? error.message : 'Upload failed';
+      return request.files.map((file, index) => ({ index, filename: file.name, success: false, error: message }));
+    }
+  }
+
+  /**
+   * Upload a large document in chunks through a resumable upload session.
+   *
+   * A chunk that fails (e.g. the connection drops) is retried from the
+   * offset the server reports, so only that chunk is sent again.
+   */
+  async uploadDocumentResumable(request: UploadRequest, maxRetries = 5): Promise<UploadResponse> {
+    const { file } = request;
+    const sessionsUrl = `${this.apiUrl}/api/upload/sessions`;
+
+    try {
+      const session = await this.handleResponse<UploadSession>(await fetch(sessionsUrl, {
+        method: 'POST',
+        headers: this.getHeaders(),
+        body: JSON.stringify({ filename: file.name, collection: request.collection, size: file.size }),
+      }));
+      const sessionUrl = `${sessionsUrl}/${encodeURIComponent(session.sessionId)}`;
+
+      let offset = session.offset;
+      let failures = 0;
+      while (offset < file.size) {
+        try {
+          const chunk = file.slice(offset, offset + RESUMABLE_CHUNK_SIZE);
+          const response = await fetch(`${sessionUrl}?offset=${offset}`, {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/octet-stream', 'X-API-Key': this.apiKey },
+            body: chunk,
+          });
+          if (response.status === 409 && response.headers.get('Upload-Offset')) {
+            // Out of step with the server (e.g. a retried chunk had landed).
+            offset = Number(response.headers.get('Upload-Offset'));
+            continue;
+          }
+          offset = (await this.handleResponse<UploadSession>(response)).offset;
+          failures = 0;
+          request.onProgress?.((offset / file.size) * 100);
+        } catch (error) {
+          if (++failures > maxRetries) throw error;
+          await new Promise((resolve) => setTimeout(resolve, 1000 * failures));
+          const current = await fetch(sessionUrl, { method: 'GET', headers: this.getHeaders() }).catch(() => null);
+          if (current?.ok) offset = (await current.json()).offset;
+        }
+      }
+
+      const response = await this.handleResponse<UploadResponse>(await fetch(`${sessionUrl}/complete`, {
+        method: 'POST',
+        headers: this.getHeaders(),
+      }));
+      return this.settleUpload(response);
+    } catch (error) {
+      return { success: false, error: error instanceof Error ? error.message : 'Upload failed' };
+    }
+  }
+
+  /**
+   * Get the status of a background ingestion job
+   */
+  async getUploadJob(jobId: string): Promise<UploadJob> {
+    const response = await fetch(`${this.apiUrl}/api/upload/jobs/${encodeURIComponent(jobId)}`, {
       method: 'GET',
       headers: this.getHeaders(),
     });
 
-    return this.handleResponse<Collection[]>(response);
+    return this.handleResponse<UploadJob>(response);
+  }
+
+  /**
+   * Poll an ingestion job until it succeeds or fails
+   */
+  private async waitForUploadJob(jobId: string, intervalMs = 1000): Promise<UploadResponse> {
+    for (;;) {
+      const job = await this.getUploadJob(jobId);
+      if (job.status === 'succeeded') {
+        return { success: true, documentId: job.documentId, chunksStored: job.chunksStored, jobId, status: job.status };
+      }
+      if (job.status === 'failed') {
+        return { success: false, error: job.error || 'Ingestion failed', jobId, status: job.status };
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  }
+
+  /**
+   * Get list of collections, following the backend's page cursors
+   */
+  async getCollections(): Promise<Collection[]> {
+    const collections: Collection[] = [];
+    let cursor: string | null = null;
+    do {
+      const params = new URLSearchParams({ limit: String(COLLECTIONS_PAGE_SIZE) });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${this.apiUrl}/api/collections?${params}`, {
+        method: 'GET',
+        headers: this.getHeaders(),
+      });
+      collections.push(...(await this.handleResponse<Collection[]>(response)));
+      cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+
+    return collections;
   }
 
   /**
@@ -24,9 +24,9 @@ export const ALLOWED_FILE_TYPES = {
 };
 
 /**
- * Default max file size (10MB)
+ * Default max file size (512MB; files over 10MB upload in resumable chunks)
  */
-export const DEFAULT_MAX_FILE_SIZE = 10 * 1024 * 1024; // 10MB
+export const DEFAULT_MAX_FILE_SIZE = 512 * 1024 * 1024; // 512MB
 
 /**
  * Get file extension from filename